@@ -3,10 +3,59 @@ Django admin customization.
 """
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from course import models
 
 
+class EstimatedCountPaginator(Paginator):
+    """Paginator using the planner estimate to count large tables.
+
+    Unfiltered changelists of tables above ``estimate_threshold`` rows on
+    PostgreSQL read ``pg_class.reltuples`` instead of running a full
+    ``COUNT(*)``. Filtered and small querysets are counted exactly.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def estimate(self):
+        """Return the estimated row count or None if unavailable."""
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return None
+
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [self.object_list.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Admin for tables with millions of rows."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_filter = ['updated_at']
+    ordering = ['-id']
+
+
 class UserAdmin(BaseUserAdmin):
     """Define the admin pages for users."""
     ordering = ['id']
@@ -27,6 +76,7 @@ class UserAdmin(BaseUserAdmin):
         (_('Important dates'), {'fields': ('last_login',)}),
     )
     readonly_fields = ['last_login']
+    search_fields = ['^email']
     add_fieldsets = (
         (None, {
             'classes': ('wide',),
@@ -43,6 +93,30 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class KursAdmin(LargeTableAdmin):
+    """Define the admin pages for kurses."""
+    list_display = [
+        'title',
+        'author',
+        'user',
+        'price',
+        'material_count',
+        'updated_at',
+    ]
+    list_select_related = ['user']
+    search_fields = ['^title', '^author']
+    raw_id_fields = ['user']
+    autocomplete_fields = ['materials']
+
+
+class MaterialAdmin(LargeTableAdmin):
+    """Define the admin pages for materials."""
+    list_display = ['name', 'user', 'duration', 'updated_at']
+    list_select_related = ['user']
+    search_fields = ['^name']
+    raw_id_fields = ['user']
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Kurs)
-admin.site.register(models.Material)
+admin.site.register(models.Kurs, KursAdmin)
+admin.site.register(models.Material, MaterialAdmin)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CourseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'course'
+
+    def ready(self):
+        from course import checks, signals  # noqa: F401
+
+        if settings.ENABLE_API_DOCS:
+            from course.schema import annotate_views
+            annotate_views()
@@ -0,0 +1,33 @@
+"""
+Authentication backends.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class EmailBackend(ModelBackend):
+    """Authenticate users by email in any case.
+
+    The email is looked up through the unique canonical email column, so
+    logging in is a single index lookup instead of a case insensitive
+    scan of the email column.
+    """
+
+    def authenticate(self, request, username=None, password=None,
+                     email=None, **kwargs):
+        email = email or username
+        if email is None or password is None:
+            return None
+
+        user_model = get_user_model()
+        try:
+            user = user_model._default_manager.get_by_natural_key(email)
+        except user_model.DoesNotExist:
+            # Hash the password anyway so unknown emails take as long to
+            # reject as wrong passwords.
+            user_model().set_password(password)
+            return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,122 @@
+"""
+Batch endpoint running several API requests in one round trip.
+"""
+import json
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+
+from rest_framework import generics, serializers, status
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from course.throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
+
+
+class SubRequestSerializer(serializers.Serializer):
+    """Serializer for one request of a batch."""
+    method = serializers.ChoiceField(
+        choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'],
+    )
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+
+    def validate_path(self, value):
+        """Only allow paths of the batchable APIs."""
+        path = urlsplit(value).path
+        if not path.startswith(tuple(settings.API_PATH_PREFIXES)):
+            raise serializers.ValidationError(
+                f'{path} cannot be used in a batch.'
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    """Serializer for a batch of requests."""
+    requests = SubRequestSerializer(many=True)
+    atomic = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        """Limit the number of requests in a batch."""
+        if not value:
+            raise serializers.ValidationError('No requests given.')
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f'At most {settings.BATCH_MAX_REQUESTS} requests are allowed.'
+            )
+        return value
+
+
+class BatchView(generics.GenericAPIView):
+    """Run several kurs and user API requests in one request.
+
+    Sub-requests reuse the authenticated user of the batch instead of
+    authenticating again. With ``atomic`` they run in one transaction,
+    which is rolled back and stops at the first failing request.
+    """
+    serializer_class = BatchSerializer
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sub_requests = serializer.validated_data['requests']
+
+        if not serializer.validated_data['atomic']:
+            results = [self.run(request, sub) for sub in sub_requests]
+            return Response({'results': results})
+
+        results = []
+        with transaction.atomic():
+            for sub in sub_requests:
+                results.append(self.run(request, sub))
+                if results[-1]['status'] >= 400:
+                    transaction.set_rollback(True)
+                    return Response(
+                        {'results': results},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+        return Response({'results': results})
+
+    def run(self, request, sub):
+        """Run one sub-request and return its status and body."""
+        url = urlsplit(sub['path'])
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return {'status': status.HTTP_404_NOT_FOUND, 'body': None}
+
+        body = b''
+        if 'body' in sub:
+            body = json.dumps(sub['body']).encode()
+        environ = dict(
+            request._request.META,
+            REQUEST_METHOD=sub['method'],
+            PATH_INFO=url.path,
+            QUERY_STRING=url.query,
+            CONTENT_TYPE='application/json',
+            CONTENT_LENGTH=str(len(body)),
+            HTTP_ACCEPT='application/json',
+        )
+        environ['wsgi.input'] = BytesIO(body)
+        # A key of the batch must not make its sub-requests replay it.
+        environ.pop('HTTP_IDEMPOTENCY_KEY', None)
+        sub_request = WSGIRequest(environ)
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return {
+            'status': response.status_code,
+            'body': json.loads(response.content) if response.content
+            else None,
+        }
@@ -0,0 +1,392 @@
+"""
+Micro benchmarks for request hot paths.
+"""
+import io
+import json
+import random
+import threading
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.base import BaseHandler
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path
+from django.utils import timezone
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from course import middleware, throttling
+from course.concurrency import ConcurrencyLimiter
+from course.models import Material, Progress
+from course.parsers import MessagePackParser
+from course.progress import ProgressBuffer
+from course.renderers import MessagePackRenderer
+from education import pricing
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark function under name."""
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def timeit(func, iterations):
+    """Return the mean number of microseconds spent in func."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _api_view(**attrs):
+    """Return a trivial API view with the given attributes."""
+    attrs.setdefault('authentication_classes', [])
+    attrs.setdefault('permission_classes', [])
+    attrs['get'] = lambda self, request: Response({})
+    return type('BenchmarkView', (APIView,), attrs).as_view()
+
+
+@benchmark('throttle')
+def throttle(iterations):
+    """Measure the per request cost of the token bucket throttles."""
+    request = RequestFactory().get('/api/kurs/kurses/')
+    rate = '%d/min' % (iterations * 10)
+    plain = _api_view(throttle_classes=[])
+    throttled = _api_view(throttle_classes=[
+        type('User', (throttling.UserTokenBucketThrottle,), {'rate': rate}),
+        type('IP', (throttling.IPTokenBucketThrottle,), {'rate': rate}),
+    ])
+
+    baseline = timeit(lambda: plain(request), iterations)
+    with_throttles = timeit(lambda: throttled(request), iterations)
+    return [
+        ('request without throttles', baseline, 'us'),
+        ('request with user and ip throttles', with_throttles, 'us'),
+        ('throttle overhead', with_throttles - baseline, 'us'),
+    ]
+
+
+@benchmark('pricing')
+def pricing_rules(iterations):
+    """Compare per row Decimal pricing with the batched engine."""
+    rng = random.Random(0)
+    prices = [
+        Decimal(rng.randrange(100, 10 ** 6)).scaleb(-2)
+        for _ in range(iterations)
+    ]
+    rules = [('discount', Decimal('15')), ('tax', Decimal('18'))]
+    cent = Decimal('0.01')
+
+    def per_row():
+        result = []
+        for price in prices:
+            price = (price * Decimal('0.85')).quantize(cent, ROUND_HALF_UP)
+            price = (price * Decimal('1.18')).quantize(cent, ROUND_HALF_UP)
+            result.append(price)
+        return result
+
+    cents = pricing.to_cents(prices)
+
+    def vectorized():
+        pricing.tax(pricing.discount(cents, 15), 18)
+
+    return [
+        ('per row Decimal loop', timeit(per_row, 1) / 1000, 'ms'),
+        (
+            'apply_rules with conversions',
+            timeit(lambda: pricing.apply_rules(prices, rules), 1) / 1000,
+            'ms',
+        ),
+        ('vectorized rules only', timeit(vectorized, 1) / 1000, 'ms'),
+    ]
+
+
+def _kurs_rows(count):
+    """Return kurs detail representations like the API renders them."""
+    return [
+        {
+            'id': i,
+            'author': 'Author %d' % (i % 20),
+            'title': 'Kurs title %d' % i,
+            'description': 'Sample description of the kurs number %d' % i,
+            'price': '%d.%02d' % (i % 300, i % 100),
+            'link': 'http://example.com/kurs/%d.pdf' % i,
+            'material_count': i % 12,
+            'video_duration': i * 37 % 7200,
+            'materials': [{'id': i * 3 + m, 'name': 'Material %d' % m}
+                          for m in range(3)],
+        }
+        for i in range(count)
+    ]
+
+
+@benchmark('compression')
+def compression(iterations):
+    """Measure size and CPU cost of each response encoding."""
+    payload = json.dumps(_kurs_rows(200)).encode()
+    results = [('uncompressed size', len(payload), 'B')]
+    for encoding in middleware.ENCODERS:
+        encoder = middleware.get_encoder(encoding)
+        size = len(encoder.compress(payload))
+        cost = timeit(lambda: encoder.compress(payload), iterations)
+        results.append(('%s size' % encoding, size, 'B'))
+        results.append(('%s compress' % encoding, cost, 'us'))
+
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, br')
+    precompressed = middleware.precompress(payload)
+
+    def cached_response(request):
+        response = HttpResponse(payload, content_type='application/json')
+        response.precompressed = precompressed
+        return response
+
+    def fresh_response(request):
+        return HttpResponse(payload, content_type='application/json')
+
+    fresh = middleware.CompressionMiddleware(fresh_response)
+    cached = middleware.CompressionMiddleware(cached_response)
+    results.append((
+        'middleware compressing',
+        timeit(lambda: fresh(request), iterations),
+        'us',
+    ))
+    results.append((
+        'middleware precompressed',
+        timeit(lambda: cached(request), iterations),
+        'us',
+    ))
+    return results
+
+
+@benchmark('renderers')
+def renderers(iterations):
+    """Compare JSON and MessagePack payload size and encode/decode time."""
+    rows = _kurs_rows(200)
+    for row in rows:
+        row['price'] = Decimal(row['price'])
+        row['video'] = 'http://testserver/media/course_videos/%d.mp4' % (
+            row['id'],
+        )
+    results = []
+    for name, renderer, parser in [
+        ('json', JSONRenderer(), JSONParser()),
+        ('msgpack', MessagePackRenderer(), MessagePackParser()),
+    ]:
+        body = renderer.render(rows)
+        results.append(('%s size' % name, len(body), 'B'))
+        results.append((
+            '%s render' % name,
+            timeit(lambda: renderer.render(rows), iterations),
+            'us',
+        ))
+        results.append((
+            '%s parse' % name,
+            timeit(lambda: parser.parse(io.BytesIO(body)), iterations),
+            'us',
+        ))
+    return results
+
+
+@benchmark('middleware')
+def middleware_stack(iterations):
+    """Measure the middleware cost of API and other requests.
+
+    Compares MIDDLEWARE with BROWSER_MIDDLEWARE listed inline, as every
+    request ran it before, with the BrowserMiddleware dispatch.
+    """
+    view = _api_view()
+    urlconf = type('URLConf', (), {'urlpatterns': [
+        path('api/kurs/benchmark/', view),
+        path('benchmark/', view),
+    ]})
+    inline = []
+    for name in settings.MIDDLEWARE:
+        if name == 'course.middleware.BrowserMiddleware':
+            inline += settings.BROWSER_MIDDLEWARE
+        else:
+            inline.append(name)
+
+    def handler(names):
+        with override_settings(MIDDLEWARE=names):
+            handler = BaseHandler()
+            handler.load_middleware()
+        return handler
+
+    def run(handler, url):
+        request = RequestFactory().get(url, HTTP_COOKIE='sessionid=abc')
+        request.urlconf = urlconf
+        return lambda: handler.get_response(request)
+
+    results = []
+    with override_settings(ALLOWED_HOSTS=['testserver']):
+        for label, url in [('api', '/api/kurs/benchmark/'),
+                           ('other', '/benchmark/')]:
+            for stack, names in [('inline', inline),
+                                 ('dispatch', settings.MIDDLEWARE)]:
+                results.append((
+                    '%s request, %s session middleware' % (label, stack),
+                    timeit(run(handler(names), url), iterations),
+                    'us',
+                ))
+    return results
+
+
+def _overload(limiter, requests, clients=64, capacity=8, service=0.002):
+    """Run requests on a simulated worker overloaded by clients.
+
+    Requests sleep for service seconds, stretched by the share of the
+    running requests beyond capacity, so latency grows with concurrency
+    as it does when requests queue for database connections and CPU.
+    Returns the latencies of the accepted requests, the number of shed
+    requests and the elapsed time.
+    """
+    lock = threading.Lock()
+    running = [0]
+    latencies = []
+    shed = [0]
+
+    def client():
+        while len(latencies) < requests:
+            if limiter is not None and not limiter.acquire():
+                with lock:
+                    shed[0] += 1
+                time.sleep(service)
+                continue
+            start = time.monotonic()
+            with lock:
+                running[0] += 1
+                concurrent = running[0]
+            time.sleep(service * max(1, concurrent / capacity))
+            with lock:
+                running[0] -= 1
+            latency = time.monotonic() - start
+            if limiter is not None:
+                limiter.release(latency)
+            with lock:
+                latencies.append(latency)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), shed[0], time.monotonic() - start
+
+
+@benchmark('concurrency')
+def concurrency_limit(iterations):
+    """Compare latency on an overloaded worker with and without limiting.
+
+    iterations is the number of requests to complete, 64 clients share a
+    worker with room for 8 requests at 2 ms each.
+    """
+    results = []
+    for name, limiter in [('unlimited', None),
+                          ('adaptive limit', ConcurrencyLimiter())]:
+        latencies, shed, elapsed = _overload(limiter, iterations)
+        results += [
+            (
+                '%s p50 latency' % name,
+                latencies[len(latencies) // 2] * 1000,
+                'ms',
+            ),
+            (
+                '%s p99 latency' % name,
+                latencies[int(len(latencies) * 0.99)] * 1000,
+                'ms',
+            ),
+            ('%s throughput' % name, len(latencies) / elapsed, 'req/s'),
+            ('%s shed' % name, shed / elapsed, 'req/s'),
+        ]
+        if limiter is not None:
+            results.append(('%s final limit' % name, limiter.limit, ''))
+    return results
+
+
+@benchmark('progress')
+def progress(iterations):
+    """Load test heartbeat writes, iterations is the number of heartbeats.
+
+    Runs against the configured database in a transaction that is rolled
+    back, 50 students each watching 20 materials.
+    """
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        call_command('migrate', verbosity=0)
+
+    queries = []
+
+    def count_queries(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def run(record):
+        queries.clear()
+        with connection.execute_wrapper(count_queries):
+            start = time.perf_counter()
+            record()
+            elapsed = time.perf_counter() - start
+        return iterations / elapsed, len(queries)
+
+    with transaction.atomic():
+        user_model = get_user_model()
+        user_model.objects.bulk_create([
+            user_model(
+                email='progress-%d@example.com' % i,
+                email_canonical='progress-%d@example.com' % i,
+            )
+            for i in range(50)
+        ])
+        users = user_model.objects.filter(email__startswith='progress-')
+        Material.objects.bulk_create([
+            Material(user=user, name='Material %d' % i, duration=600)
+            for user in users
+            for i in range(20)
+        ])
+        materials = list(Material.objects.filter(user__in=users))
+        heartbeats = [
+            (materials[i % len(materials)], i // len(materials) * 10)
+            for i in range(iterations)
+        ]
+
+        def per_heartbeat():
+            for material, position in heartbeats:
+                Progress.objects.update_or_create(
+                    user_id=material.user_id,
+                    material=material,
+                    defaults={
+                        'position': position,
+                        'updated_at': timezone.now(),
+                    },
+                )
+
+        def buffered():
+            progress_buffer = ProgressBuffer()
+            for material, position in heartbeats:
+                progress_buffer.add(material.user_id, material.id, position)
+            progress_buffer.flush()
+
+        naive_rate, naive_queries = run(per_heartbeat)
+        Progress.objects.all().delete()
+        buffered_rate, buffered_queries = run(buffered)
+        transaction.set_rollback(True)
+
+    return [
+        ('update_or_create per heartbeat', naive_rate, 'hb/s'),
+        ('update_or_create queries', naive_queries, 'queries'),
+        ('buffered upserts', buffered_rate, 'hb/s'),
+        ('buffered queries', buffered_queries, 'queries'),
+    ]
@@ -0,0 +1,87 @@
+"""
+Maintenance of the public course catalog read model.
+"""
+from django.db import transaction
+
+from course.models import CatalogEntry, Kurs
+
+
+def material_summary(material):
+    """Return the catalog representation of a material."""
+    return {
+        'id': material.pk,
+        'name': material.name,
+        'duration': material.duration,
+        'video': material.video.url if material.video else None,
+    }
+
+
+def refresh_catalog(kurs_ids):
+    """Rebuild the catalog entries of the given kurses.
+
+    Entries of kurses that no longer exist are dropped. Totals are computed
+    from the loaded materials so the entry never depends on the order in
+    which the kurs counters are updated. The kurs rows are locked first,
+    so concurrent refreshes of a kurs run one after the other instead of
+    both inserting its entry.
+    """
+    kurs_ids = set(kurs_ids)
+    if not kurs_ids:
+        return
+
+    with transaction.atomic():
+        kurses = list(
+            Kurs.objects.filter(pk__in=kurs_ids)
+            .select_for_update()
+            .order_by('pk')
+            .prefetch_related('materials')
+        )
+        CatalogEntry.objects.filter(kurs_id__in=kurs_ids).delete()
+        CatalogEntry.objects.bulk_create(_entries(kurses))
+
+
+def _entries(kurses):
+    """Return the catalog entries of the loaded kurses."""
+    entries = []
+    for kurs in kurses:
+        materials = sorted(kurs.materials.all(), key=lambda m: m.pk)
+        entries.append(CatalogEntry(
+            kurs_id=kurs.pk,
+            author=kurs.author,
+            title=kurs.title,
+            description=kurs.description,
+            price=kurs.price,
+            link=kurs.link,
+            material_count=len(materials),
+            video_duration=sum(m.duration for m in materials),
+            materials=[material_summary(m) for m in materials],
+        ))
+    return entries
+
+
+def kurs_ids_for_material(material):
+    """Return the ids of the kurses using a material."""
+    return list(
+        Kurs.materials.through.objects.filter(
+            material_id=material.pk,
+        ).values_list('kurs_id', flat=True)
+    )
+
+
+def catalog_chunks(chunk_size):
+    """Yield the catalog entries ordered by kurs in lists of chunk_size.
+
+    Chunks are read with keyset pagination on the kurs id, so every chunk
+    is an index range scan however deep into the catalog it is.
+    """
+    last_id = 0
+    while True:
+        chunk = list(
+            CatalogEntry.objects.filter(
+                kurs_id__gt=last_id,
+            ).order_by('kurs_id')[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].kurs_id
@@ -0,0 +1,35 @@
+"""
+Change log used by clients to sync only what changed.
+"""
+from django.db import transaction
+
+from course.models import Change, Kurs
+
+
+def record_changes(model, owners, deleted=False):
+    """Log a change of the objects in owners, a map of object id to user id.
+
+    Earlier entries of the same objects are replaced so every object keeps
+    a single entry whose id is newer than any cursor handed out before.
+    """
+    if not owners:
+        return
+
+    with transaction.atomic():
+        Change.objects.filter(model=model, object_id__in=owners).delete()
+        Change.objects.bulk_create([
+            Change(
+                model=model,
+                object_id=object_id,
+                user_id=user_id,
+                deleted=deleted,
+            )
+            for object_id, user_id in owners.items()
+        ])
+
+
+def record_kurs_changes(kurs_ids):
+    """Log an update of the given kurses."""
+    record_changes(Change.KURS, dict(
+        Kurs.objects.filter(pk__in=kurs_ids).values_list('pk', 'user_id')
+    ))
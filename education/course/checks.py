@@ -0,0 +1,26 @@
+"""
+System checks of the project configuration.
+"""
+from django.conf import settings
+from django.core import checks
+
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_idempotency_cache(app_configs, **kwargs):
+    """Fail when idempotency keys would only be known to one worker."""
+    backend = settings.CACHES.get('idempotency', {}).get('BACKEND')
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Error(
+        'The idempotency cache is local to each process, so retries sent '
+        'to another worker or after a restart are run again.',
+        hint='Set IDEMPOTENCY_CACHE_BACKEND to a shared cache such as '
+             'django.core.cache.backends.db.DatabaseCache.',
+        id='course.E001',
+    )]
@@ -0,0 +1,55 @@
+"""
+Batched deletion of orphaned and user owned data.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from course.models import Change, Kurs, Material, Progress
+
+
+def delete_in_batches(queryset, batch_size=500):
+    """Delete the rows of queryset in transactions of batch_size rows.
+
+    Keeping every transaction small bounds how long rows and the tables
+    they cascade into stay locked. The selected rows are locked and
+    deleted through queryset again, so rows that stopped matching it in
+    between are kept. Returns the number of deleted rows.
+    """
+    label = queryset.model._meta.label
+    total = 0
+    while True:
+        with transaction.atomic():
+            pks = list(
+                queryset.select_for_update(of=('self',)).order_by(
+                    'pk',
+                ).values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                return total
+            _, deleted = queryset.filter(pk__in=pks).delete()
+        total += deleted.get(label, 0)
+
+
+def orphan_materials(grace_period=3600):
+    """Return materials no kurs uses that weren't changed recently.
+
+    The grace period keeps materials a kurs is being created with.
+    """
+    cutoff = timezone.now() - timedelta(seconds=grace_period)
+    return Material.objects.filter(kurs__isnull=True, updated_at__lt=cutoff)
+
+
+def collect_orphan_materials(grace_period=3600, batch_size=500):
+    """Delete orphaned materials, their videos go once unreferenced."""
+    return delete_in_batches(orphan_materials(grace_period), batch_size)
+
+
+def delete_user(user, batch_size=500):
+    """Delete a user and everything they own in bounded transactions."""
+    delete_in_batches(Progress.objects.filter(user=user), batch_size)
+    delete_in_batches(Kurs.objects.filter(user=user), batch_size)
+    delete_in_batches(Material.objects.filter(user=user), batch_size)
+    delete_in_batches(Change.objects.filter(user=user), batch_size)
+    user.delete()
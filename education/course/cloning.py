@@ -0,0 +1,68 @@
+"""
+Server side cloning of kurses.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from course.catalog import refresh_catalog
+from course.changes import record_kurs_changes
+from course.models import Kurs
+from course.similarity import refresh_similarity_on_commit
+
+
+def clone_kurses(queryset, title=None, batch_size=500):
+    """Copy the kurses of queryset together with their materials.
+
+    Kurs rows and material links are copied with INSERT ... SELECT, so the
+    clones link the material rows of their source instead of resolving
+    the materials again, and their totals are copied as they are. The
+    catalog and change log are refreshed for the clones, and the
+    similarity index once the transaction commits.
+    Returns a map of clone id to source id.
+    """
+    source_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    if not source_ids:
+        return {}
+
+    kurs_table = connection.ops.quote_name(Kurs._meta.db_table)
+    link_table = connection.ops.quote_name(
+        Kurs.materials.through._meta.db_table,
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    clones = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for start in range(0, len(source_ids), batch_size):
+                batch = source_ids[start:start + batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'INSERT INTO {kurs_table} '
+                    f'(user_id, author, title, description, price, link, '
+                    f'material_count, video_duration, cloned_from_id, '
+                    f'updated_at) '
+                    f'SELECT user_id, author, COALESCE(%s, title), '
+                    f'description, price, link, material_count, '
+                    f'video_duration, id, %s '
+                    f'FROM {kurs_table} WHERE id IN ({placeholders}) '
+                    f'RETURNING id, cloned_from_id',
+                    [title, now, *batch],
+                )
+                batch_clones = dict(cursor.fetchall())
+                placeholders = ', '.join(['%s'] * len(batch_clones))
+                cursor.execute(
+                    f'INSERT INTO {link_table} (kurs_id, material_id) '
+                    f'SELECT clone.id, link.material_id '
+                    f'FROM {kurs_table} clone '
+                    f'JOIN {link_table} link '
+                    f'ON link.kurs_id = clone.cloned_from_id '
+                    f'WHERE clone.id IN ({placeholders})',
+                    list(batch_clones),
+                )
+                clones.update(batch_clones)
+
+        clone_ids = list(clones)
+        refresh_catalog(clone_ids)
+        record_kurs_changes(clone_ids)
+        refresh_similarity_on_commit(clone_ids)
+
+    return clones
@@ -0,0 +1,98 @@
+"""
+Adaptive limit on the requests a worker runs concurrently.
+"""
+import math
+import threading
+
+from django.conf import settings
+
+
+class ConcurrencyLimiter:
+    """Limit concurrent requests with a limit adapted to their latency.
+
+    The recent average latency of finished requests is compared with the
+    no load latency, the lowest latency of the last ``window`` requests or
+    of the window before. After each request the limit moves towards
+    ``limit * gradient + sqrt(limit)``, where the gradient is the no load
+    latency times ``tolerance`` over the recent average, capped to
+    [0.5, 1]. The limit therefore grows while requests are about as fast
+    as without load and shrinks as soon as they queue up and get slower.
+    Normal requests may only use the limit minus a reserve of
+    ``reserve`` of it, which is kept for priority requests.
+    """
+
+    def __init__(self, initial=20, min_limit=4, max_limit=200,
+                 reserve=0.1, tolerance=2.0, smoothing=0.05,
+                 short_window=10, window=10000):
+        self.lock = threading.Lock()
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.reserve = reserve
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.short_window = short_window
+        self.window = window
+        self.in_flight = 0
+        self.samples = 0
+        self.short_latency = None
+        self.window_min = math.inf
+        self.previous_min = math.inf
+
+    def acquire(self, priority=False):
+        """Start a request, returning False when it has to be shed."""
+        with self.lock:
+            limit = self.limit
+            if not priority:
+                limit -= max(1, self.limit * self.reserve)
+            if self.in_flight >= limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency):
+        """Finish a request that took latency seconds."""
+        with self.lock:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            self.update(latency, in_flight)
+
+    @property
+    def no_load_latency(self):
+        """Return the lowest latency of the current and last window."""
+        return min(self.window_min, self.previous_min)
+
+    def update(self, latency, in_flight):
+        """Adapt the limit to the latency of a finished request."""
+        # Rotating windows let the no load latency rise when requests get
+        # slower for good, for example after a deploy.
+        self.samples += 1
+        if self.samples % self.window == 0:
+            self.previous_min, self.window_min = self.window_min, math.inf
+        self.window_min = min(self.window_min, latency)
+        if self.short_latency is None:
+            self.short_latency = latency
+            return
+        self.short_latency += (
+            latency - self.short_latency
+        ) / self.short_window
+
+        gradient = max(0.5, min(1.0, (
+            self.tolerance * self.no_load_latency
+            / max(self.short_latency, 1e-9)
+        )))
+        # Fast requests while the worker is mostly idle say nothing about
+        # whether it can take more of them.
+        if gradient == 1.0 and in_flight < self.limit / 2:
+            return
+
+        target = self.limit * gradient + math.sqrt(self.limit)
+        limit = self.limit + (target - self.limit) * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+
+
+limiter = ConcurrencyLimiter(
+    initial=settings.CONCURRENCY_LIMIT_INITIAL,
+    min_limit=settings.CONCURRENCY_LIMIT_MIN,
+    max_limit=settings.CONCURRENCY_LIMIT_MAX,
+)
@@ -0,0 +1,39 @@
+"""
+Database health checks used at boot and by the health endpoints.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.utils import OperationalError
+
+
+_migrated_databases = set()
+
+
+def database_available(alias=DEFAULT_DB_ALIAS):
+    """Return whether the database accepts queries."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except OperationalError:
+        return False
+
+    return True
+
+
+def pending_migrations(alias=DEFAULT_DB_ALIAS):
+    """Return the plan of migrations not applied to the database yet."""
+    executor = MigrationExecutor(connections[alias])
+    targets = executor.loader.graph.leaf_nodes()
+    return executor.migration_plan(targets)
+
+
+def migrations_applied(alias=DEFAULT_DB_ALIAS):
+    """Return whether all migrations are applied, caching a positive answer.
+
+    Migrations are only applied at boot, so once a process has seen the
+    database up to date there is no need to load the migration graph again.
+    """
+    if alias not in _migrated_databases and not pending_migrations(alias):
+        _migrated_databases.add(alias)
+
+    return alias in _migrated_databases
@@ -0,0 +1,157 @@
+"""
+Idempotency keys for API writes.
+"""
+import functools
+import hashlib
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.http.request import RawPostDataException
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+
+IN_FLIGHT = 'in-flight'
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is in progress.'
+    default_code = 'idempotency_key_in_use'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        'This Idempotency-Key was used for a different request.'
+    )
+    default_code = 'idempotency_key_reused'
+
+
+def request_fingerprint(request):
+    """Return a digest of the method, path and body of a request.
+
+    Multipart bodies are digested from their parsed fields and files,
+    streaming the files in chunks, so video uploads are not read into
+    memory as a whole.
+    """
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.get_full_path().encode())
+    if request.content_type.startswith('multipart/'):
+        files = request.FILES
+        fields = [
+            (name, values) for name, values in request.data.lists()
+            if name not in files
+        ]
+        digest.update(repr(sorted(fields)).encode())
+        for name in sorted(files):
+            for upload in files.getlist(name):
+                digest.update(repr((name, upload.name)).encode())
+                for chunk in upload.chunks():
+                    digest.update(chunk)
+        return digest.digest()[:16]
+
+    try:
+        digest.update(request._request.body)
+    except RawPostDataException:
+        digest.update(repr(sorted(request.data.items())).encode())
+    return digest.digest()[:16]
+
+
+class IdempotencyMixin:
+    """Replay the first response of requests sent with an Idempotency-Key.
+
+    The first response of each key is stored per user in the
+    ``idempotency`` cache for ``IDEMPOTENCY_TTL`` seconds, compressed, with
+    a digest of the request. Retries get the stored response without
+    running the view again, a retry sent while the first request is
+    running gets 409 and reusing a key for another request gets 422.
+    Server errors are not stored so they can be retried.
+    """
+    idempotent_actions = ['create', 'update', 'partial_update']
+
+    @property
+    def idempotency_cache(self):
+        """Return the cache holding the stored responses."""
+        return caches['idempotency']
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        key = request.headers.get('Idempotency-Key')
+        if key is None or self.action not in self.idempotent_actions:
+            return
+        if not 0 < len(key) <= 255:
+            raise ValidationError(
+                {'Idempotency-Key': 'Must be 1 to 255 characters long.'},
+            )
+
+        # dispatch() looks the handler up after initial(), so wrapping it
+        # here covers every write action of the view.
+        method = request.method.lower()
+        setattr(self, method, functools.partial(
+            self.run_idempotent,
+            f'idempotency:{request.user.pk}:{key}',
+            getattr(self, method),
+        ))
+
+    def run_idempotent(self, cache_key, handler, request, *args, **kwargs):
+        """Return the stored response for cache_key or run the handler."""
+        cache = self.idempotency_cache
+        fingerprint = request_fingerprint(request)
+        # The key can expire between a failed add and the get, the
+        # handler only runs once this request holds the key.
+        for _ in range(3):
+            if cache.add(
+                    cache_key,
+                    (IN_FLIGHT, fingerprint),
+                    settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                break
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return self.replay(stored, fingerprint)
+        else:
+            raise IdempotencyKeyInUse()
+
+        try:
+            try:
+                response = handler(request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+            response = self.finalize_response(
+                request, response, *args, **kwargs,
+            )
+            response.render()
+        except Exception:
+            cache.delete(cache_key)
+            raise
+
+        if response.status_code >= 500:
+            cache.delete(cache_key)
+        else:
+            cache.set(cache_key, (
+                response.status_code,
+                fingerprint,
+                response.get('Content-Type'),
+                zlib.compress(response.content),
+            ), settings.IDEMPOTENCY_TTL)
+        return response
+
+    def replay(self, stored, fingerprint):
+        """Return the stored response, or raise if it cannot be replayed."""
+        if stored[1] != fingerprint:
+            raise IdempotencyKeyReused()
+        if stored[0] == IN_FLIGHT:
+            raise IdempotencyKeyInUse()
+
+        status_code, _, content_type, content = stored
+        response = HttpResponse(
+            zlib.decompress(content),
+            status=status_code,
+            content_type=content_type,
+        )
+        response['Idempotent-Replayed'] = 'true'
+        return response
@@ -0,0 +1,33 @@
+"""
+Django command to run the micro benchmarks.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from course.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    """Django command to run benchmarks."""
+    help = 'Run the registered micro benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help='Benchmarks to run, all of them by default.',
+        )
+        parser.add_argument('--iterations', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        names = options['names'] or sorted(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(
+                'Unknown benchmark: %s' % ', '.join(sorted(unknown))
+            )
+
+        for name in names:
+            self.stdout.write(self.style.SUCCESS(name))
+            for label, value, unit in BENCHMARKS[name](options['iterations']):
+                self.stdout.write(f'  {label:<40} {value:>12.2f} {unit}')
@@ -0,0 +1,47 @@
+"""
+Django command to prepare the database when a container starts.
+"""
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from course.health import pending_migrations
+
+
+class Command(BaseCommand):
+    """Django command to wait for the database and apply migrations."""
+    help = (
+        'Wait for the database, migrate it if migrations are pending and '
+        'create the database cache tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--timeout', type=float, default=60)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        database = options['database']
+        call_command(
+            'wait_for_db',
+            timeout=options['timeout'],
+            database=database,
+            stdout=self.stdout,
+        )
+
+        plan = pending_migrations(database)
+        if not plan:
+            self.stdout.write('No migrations to apply.')
+        else:
+            self.stdout.write(f'Applying {len(plan)} migrations...')
+            call_command(
+                'migrate',
+                database=database,
+                interactive=False,
+                stdout=self.stdout,
+            )
+        call_command('createcachetable', database=database)
+
+        if settings.ENABLE_API_DOCS:
+            call_command('build_schema', stdout=self.stdout)
@@ -0,0 +1,30 @@
+"""
+Django command to build the OpenAPI schema artifacts.
+"""
+from django.core.management.base import BaseCommand
+
+from course.schema import build_schema, code_fingerprint
+
+
+class Command(BaseCommand):
+    """Django command to write the schema for the current code."""
+    help = 'Write the OpenAPI schema artifacts for the current code.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild the artifacts even if they exist.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        paths = build_schema(force=options['force'])
+        if not paths:
+            self.stdout.write(
+                f'Schema {code_fingerprint()} is up to date.'
+            )
+            return
+
+        for path in paths:
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path}'))
@@ -0,0 +1,25 @@
+"""
+Django command to rebuild the related kurses index.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from course.similarity import build_similarity_index
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the kurs similarity index."""
+    help = 'Rebuild the related kurses index from shared materials.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        start = time.perf_counter()
+        count = build_similarity_index(options['chunk_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {count} similarities in {elapsed:.2f}s.'
+        ))
@@ -0,0 +1,30 @@
+"""
+Django command to delete materials no kurs uses.
+"""
+from django.core.management.base import BaseCommand
+
+from course.cleanup import collect_orphan_materials
+
+
+class Command(BaseCommand):
+    """Django command to garbage collect orphaned materials."""
+    help = 'Delete materials that are not used by any kurs, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-period',
+            type=int,
+            default=3600,
+            help='Keep materials changed within this many seconds.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        deleted = collect_orphan_materials(
+            grace_period=options['grace_period'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} orphaned materials.'
+        ))
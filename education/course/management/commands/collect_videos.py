@@ -0,0 +1,34 @@
+"""
+Django command to delete stored videos no material references.
+"""
+from django.core.management.base import BaseCommand
+
+from course.videos import collect_videos
+
+
+class Command(BaseCommand):
+    """Django command to garbage collect material videos."""
+    help = 'Delete stored videos that are not referenced by any material.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-period',
+            type=int,
+            default=3600,
+            help='Keep files modified within this many seconds.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        deleted = collect_videos(
+            grace_period=options['grace_period'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        for name in deleted:
+            self.stdout.write(name)
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(deleted)} videos.'))
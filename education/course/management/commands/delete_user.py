@@ -0,0 +1,28 @@
+"""
+Django command to delete a user with a large catalog.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from course.cleanup import delete_user
+
+
+class Command(BaseCommand):
+    """Django command to delete a user in batches."""
+    help = 'Delete a user and their kurses and materials in small batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            user = get_user_model().objects.filter_email(
+                options['email'],
+            ).get()
+        except get_user_model().DoesNotExist:
+            raise CommandError('User %s does not exist.' % options['email'])
+
+        delete_user(user, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {user.email}.'))
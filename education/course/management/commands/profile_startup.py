@@ -0,0 +1,89 @@
+"""
+Django command to profile the startup of a worker process.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+WORKER_BOOT = '''
+import json, resource, time
+start = time.perf_counter()
+from education.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+'''
+
+
+def parse_importtime(output):
+    """Parse ``-X importtime`` output into (module, self, cumulative) rows.
+
+    Times are in microseconds, rows are in import order.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except (IndexError, ValueError):
+            continue
+        rows.append((fields[2].strip(), self_us, cumulative_us))
+
+    return rows
+
+
+class Command(BaseCommand):
+    """Django command to report import time per module at worker boot."""
+    help = 'Boot a worker in a subprocess and report import times and RSS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of modules and packages to list.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', WORKER_BOOT],
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+
+        boot = json.loads(result.stdout.strip().splitlines()[-1])
+        rows = parse_importtime(result.stderr)
+        packages = defaultdict(int)
+        for module, self_us, _ in rows:
+            packages[module.split('.')[0]] += self_us
+
+        limit = options['limit']
+        self.stdout.write(self.style.SUCCESS('Slowest modules (cumulative)'))
+        for module, _, cumulative_us in sorted(
+            rows, key=lambda row: row[2], reverse=True,
+        )[:limit]:
+            self.stdout.write(f'  {cumulative_us / 1000:>9.1f} ms  {module}')
+
+        self.stdout.write(self.style.SUCCESS('Packages (self time)'))
+        for package, self_us in sorted(
+            packages.items(), key=lambda item: item[1], reverse=True,
+        )[:limit]:
+            self.stdout.write(f'  {self_us / 1000:>9.1f} ms  {package}')
+
+        self.stdout.write(self.style.SUCCESS('Worker boot'))
+        self.stdout.write(f'  {boot["seconds"] * 1000:>9.1f} ms  wall time')
+        self.stdout.write(f'  {boot["maxrss_kb"] / 1024:>9.1f} MB  max RSS')
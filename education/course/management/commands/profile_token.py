@@ -0,0 +1,23 @@
+"""
+Django command to create a token for profiling API requests.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from course.profiling import make_token
+
+
+class Command(BaseCommand):
+    """Django command to print a signed X-Profile header value."""
+    help = (
+        'Print a token that makes API requests sent with it in an X-Profile '
+        'header write a profile.'
+    )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.stdout.write(make_token())
+        self.stderr.write(
+            f'Valid for {settings.PROFILING_TOKEN_MAX_AGE} seconds, '
+            f'profiles are written to {settings.PROFILING_DIR}.'
+        )
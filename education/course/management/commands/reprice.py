@@ -0,0 +1,47 @@
+"""
+Django command to reprice the kurs catalog.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from course.models import Kurs
+from course.repricing import reprice_kurses
+from education.pricing import parse_rule
+
+
+class Command(BaseCommand):
+    """Django command to apply pricing rules to kurses."""
+    help = 'Apply pricing rules such as discount=10 or tax=18 to kurses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rule',
+            action='append',
+            dest='rules',
+            required=True,
+            help='Rule to apply as name=value, can be repeated.',
+        )
+        parser.add_argument('--user', help='Only reprice kurses of a user.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            rules = [parse_rule(rule) for rule in options['rules']]
+        except ValueError as e:
+            raise CommandError(e)
+
+        queryset = Kurs.objects.all()
+        if options['user']:
+            user_model = get_user_model()
+            try:
+                user = user_model.objects.filter_email(options['user']).get()
+            except user_model.DoesNotExist:
+                raise CommandError('User %s does not exist.' % options['user'])
+            queryset = queryset.filter(user=user)
+
+        try:
+            updated = reprice_kurses(queryset, rules, options['batch_size'])
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(f'Repriced {updated} kurses.'))
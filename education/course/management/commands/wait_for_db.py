@@ -3,25 +3,45 @@ Django command to wait for the database to be available.
 """
 import time
 
-from psycopg2 import OperationalError as Psycopg2OpError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
 
-from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from course.health import database_available
+
+
+INITIAL_DELAY = 0.1
+MAX_DELAY = 2
 
 
 class Command(BaseCommand):
     """Django command to wait for database."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Seconds to wait for the database before giving up.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
     def handle(self, *args, **options):
         """Entrypoint for command."""
         self.stdout.write('Waiting for database...')
-        db_up = False
-        while db_up is False:
-            try:
-                self.check(databases=['default'])
-                db_up = True
-            except (Psycopg2OpError, OperationalError):
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
+        deadline = time.monotonic() + options['timeout']
+        delay = INITIAL_DELAY
+        while not database_available(options['database']):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CommandError(
+                    'Database unavailable after %s seconds.'
+                    % options['timeout']
+                )
+            delay = min(delay, remaining)
+            self.stdout.write(
+                f'Database unavailable, waiting {delay:.2f} seconds...'
+            )
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_DELAY)
 
         self.stdout.write(self.style.SUCCESS('Database available!'))
@@ -0,0 +1,397 @@
+"""
+Middleware for the project.
+"""
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+
+from course import concurrency, tracing
+from course.profiling import profile_request, valid_token
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class GzipEncoder:
+    """Compress with zlib in the gzip container."""
+
+    def __init__(self, level):
+        self.level = level
+
+    def compressor(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        compressor = self.compressor()
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self, chunks):
+        compressor = self.compressor()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            yield data + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class BrotliEncoder:
+    """Compress with brotli."""
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.level)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+
+class ZstdEncoder:
+    """Compress with zstandard."""
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self, chunks):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            yield data + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        yield compressor.flush()
+
+
+ENCODERS = {'gzip': GzipEncoder}
+if brotli is not None:
+    ENCODERS['br'] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS['zstd'] = ZstdEncoder
+
+DEFAULT_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+
+
+def get_encoder(encoding):
+    """Return the encoder for encoding at the configured level."""
+    levels = getattr(settings, 'COMPRESSION_LEVELS', DEFAULT_LEVELS)
+    return ENCODERS[encoding](levels.get(encoding, DEFAULT_LEVELS[encoding]))
+
+
+def accepted_encoding(header, preferred):
+    """Return the first preferred encoding allowed by Accept-Encoding."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    for encoding in preferred:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if encoding in ENCODERS and quality > 0:
+            return encoding
+    return None
+
+
+def precompress(content, encodings=None):
+    """Return content compressed with each available encoding.
+
+    The result can be set as ``response.precompressed`` on responses served
+    repeatedly, so the middleware sends the stored bytes instead of
+    compressing them again.
+    """
+    return {
+        encoding: get_encoder(encoding).compress(content)
+        for encoding in encodings or ENCODERS
+    }
+
+
+class PrecompressedCache:
+    """Small LRU of compressed bodies keyed by strong ETag."""
+
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli, zstd or gzip.
+
+    Only responses with a compressible content type and a body of at least
+    ``COMPRESSION_MIN_SIZE`` bytes are compressed, since small bodies gain
+    little and still pay the CPU cost. Streaming responses are compressed
+    chunk by chunk. Bodies set in ``response.precompressed`` and bodies of
+    responses with a strong ETag seen before are sent without compressing
+    them again.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cache = PrecompressedCache(
+            getattr(settings, 'COMPRESSION_CACHE_SIZE', 64),
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = accepted_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''),
+            getattr(settings, 'COMPRESSION_ENCODINGS', ['br', 'zstd', 'gzip']),
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = get_encoder(encoding).stream(
+                response.streaming_content,
+            )
+            del response['Content-Length']
+        else:
+            content = self.compress(response, encoding)
+            if content is None:
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def compressible(self, response):
+        """Return whether the response should be compressed."""
+        if response.status_code != 200 or response.has_header(
+                'Content-Encoding'):
+            return False
+
+        content_type = response.get('Content-Type', '').split(';')[0]
+        types = getattr(settings, 'COMPRESSION_CONTENT_TYPES', [])
+        if not any(content_type.startswith(t) for t in types):
+            return False
+
+        if response.streaming:
+            return True
+        return len(response.content) >= getattr(
+            settings, 'COMPRESSION_MIN_SIZE', 512)
+
+    def compress(self, response, encoding):
+        """Return the compressed body, reusing precompressed bytes."""
+        precompressed = getattr(response, 'precompressed', None) or {}
+        if encoding in precompressed:
+            return precompressed[encoding]
+
+        etag = response.get('ETag')
+        key = (etag, encoding) if etag and etag.startswith('"') else None
+        if key:
+            content = self.cache.get(key)
+            if content is not None:
+                return content
+
+        content = get_encoder(encoding).compress(response.content)
+        if len(content) >= len(response.content):
+            return None
+        if key:
+            self.cache.set(key, content)
+        return content
+
+
+class ProfilingMiddleware:
+    """Profile API requests sampled at random or asked for by header.
+
+    Requests to ``API_PATH_PREFIXES`` are profiled when they carry an
+    ``X-Profile`` header signed by ``manage.py profile_token``, or at
+    random at ``PROFILING_SAMPLE_RATE``. Profiles are written to
+    ``PROFILING_DIR`` and a profile asked for by header is named in the
+    ``X-Profile-Id`` response header. Other requests only pay for a
+    header lookup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = request.META.get('HTTP_X_PROFILE')
+        if token is None and not settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        if not self.profiled(request, token):
+            return self.get_response(request)
+
+        response, name = profile_request(self.get_response, request)
+        if token is not None:
+            response['X-Profile-Id'] = name
+        return response
+
+    def profiled(self, request, token):
+        """Return whether the request should be profiled."""
+        if not request.path.startswith(tuple(settings.API_PATH_PREFIXES)):
+            return False
+        if token is not None:
+            return valid_token(token)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+class TracingMiddleware:
+    """Trace requests and their queries when a tracing exporter is set.
+
+    Each request is the root span of a trace, continuing the trace of an
+    incoming W3C ``traceparent`` header, and every query it runs is a
+    child span of the phase running it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if tracing.exporter is None:
+            return self.get_response(request)
+
+        trace_id, parent_id = tracing.parse_traceparent(
+            request.META.get('HTTP_TRACEPARENT', ''),
+        )
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(tracing.trace_queries),
+                )
+            span = stack.enter_context(tracing.span(
+                request.method,
+                kind=tracing.KIND_SERVER,
+                attributes={
+                    'http.method': request.method,
+                    'http.target': request.get_full_path(),
+                },
+                trace_id=trace_id,
+                parent_id=parent_id,
+            ))
+            response = self.get_response(request)
+            if request.resolver_match is not None:
+                route = request.resolver_match.view_name
+                span.name = f'{request.method} {route}'
+                span.set_attribute('http.route', route)
+            span.set_attribute('http.status_code', response.status_code)
+            return response
+
+
+class BrowserMiddleware:
+    """Run the ``BROWSER_MIDDLEWARE`` outside of the API paths only.
+
+    Requests under ``SESSIONLESS_PATH_PREFIXES`` authenticate with tokens,
+    so they skip loading the session, CSRF checks, the user and messages.
+    Other requests, such as the admin and the index page, go through the
+    wrapped middleware as if it were listed in ``MIDDLEWARE``. Only the
+    ``process_view`` hooks of the wrapped middleware are supported.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.SESSIONLESS_PATH_PREFIXES)
+        self.view_hooks = []
+        handler = get_response
+        for path in reversed(settings.BROWSER_MIDDLEWARE):
+            try:
+                instance = import_string(path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(instance, 'process_view'):
+                self.view_hooks.insert(0, instance.process_view)
+            handler = convert_exception_to_response(instance)
+        self.browser_response = handler
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.prefixes):
+            return self.get_response(request)
+        return self.browser_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.path_info.startswith(self.prefixes):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+
+class ConcurrencyLimitMiddleware:
+    """Shed API requests beyond the adaptive concurrency limit.
+
+    Requests under ``CONCURRENCY_PATH_PREFIXES`` count against the limit
+    of the worker kept by ``course.concurrency.limiter``, and their
+    latency adapts it. Requests beyond the limit get an immediate 503
+    with a Retry-After header instead of queueing behind slow ones.
+    Requests under ``CONCURRENCY_PRIORITY_PREFIXES``, such as getting a
+    token, may also use the share of the limit reserved for them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.CONCURRENCY_PATH_PREFIXES)
+        self.priority_prefixes = tuple(
+            settings.CONCURRENCY_PRIORITY_PREFIXES,
+        )
+
+    def __call__(self, request):
+        if not request.path_info.startswith(self.prefixes):
+            return self.get_response(request)
+
+        limiter = concurrency.limiter
+        priority = request.path_info.startswith(self.priority_prefixes)
+        if not limiter.acquire(priority):
+            response = JsonResponse(
+                {'detail': 'The server is busy, retry later.'},
+                status=503,
+            )
+            response['Retry-After'] = str(settings.CONCURRENCY_RETRY_AFTER)
+            return response
+
+        start = time.monotonic()
+        try:
+            return self.get_response(request)
+        finally:
+            limiter.release(time.monotonic() - start)
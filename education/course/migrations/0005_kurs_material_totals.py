@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:18
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_material_counts(apps, schema_editor):
+    Kurs = apps.get_model('course', 'Kurs')
+    links = Kurs.materials.through.objects.filter(
+        kurs=OuterRef('pk'),
+    ).order_by().values('kurs').annotate(count=Count('pk')).values('count')
+    Kurs.objects.update(material_count=Coalesce(Subquery(links), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0004_alter_material_video'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kurs',
+            name='material_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='kurs',
+            name='video_duration',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='material',
+            name='duration',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_material_counts,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_catalog(apps, schema_editor):
+    Kurs = apps.get_model('course', 'Kurs')
+    CatalogEntry = apps.get_model('course', 'CatalogEntry')
+    entries = []
+    for kurs in Kurs.objects.prefetch_related('materials'):
+        materials = sorted(kurs.materials.all(), key=lambda m: m.pk)
+        entries.append(CatalogEntry(
+            kurs_id=kurs.pk,
+            author=kurs.author,
+            title=kurs.title,
+            description=kurs.description,
+            price=kurs.price,
+            link=kurs.link,
+            material_count=len(materials),
+            video_duration=sum(m.duration for m in materials),
+            materials=[{
+                'id': m.pk,
+                'name': m.name,
+                'duration': m.duration,
+                'video': m.video.url if m.video else None,
+            } for m in materials],
+        ))
+    CatalogEntry.objects.bulk_create(entries, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0005_kurs_material_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('kurs', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_entry', serialize=False, to='course.kurs')),
+                ('author', models.CharField(max_length=150)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('link', models.CharField(blank=True, max_length=255)),
+                ('material_count', models.PositiveIntegerField(default=0)),
+                ('video_duration', models.PositiveIntegerField(default=0)),
+                ('materials', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_catalog, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_changes(apps, schema_editor):
+    Change = apps.get_model('course', 'Change')
+    for model_name in ('kurs', 'material'):
+        Model = apps.get_model('course', model_name)
+        Change.objects.bulk_create((
+            Change(model=model_name, object_id=pk, user_id=user_id)
+            for pk, user_id in Model.objects.values_list('pk', 'user_id')
+        ), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0006_catalogentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kurs',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='material',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('kurs', 'Kurs'), ('material', 'Material')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['user', 'id'], name='course_chan_user_id_c53e82_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='change',
+            index=models.Index(fields=['model', 'object_id'], name='course_chan_model_eebb69_idx'),
+        ),
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:25
+
+import course.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0007_change_log'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='material',
+            name='video',
+            field=models.FileField(blank=True, db_index=True, null=True, storage=course.storage.ContentAddressedStorage(), upload_to='course_videos'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+# Prefix searches in the admin filter on UPPER(column::text) LIKE 'TERM%'
+# on PostgreSQL, which can only use an expression index with the pattern
+# operator class. SQLite has no equivalent, so the indexes are skipped.
+INDEXES = [
+    ('course_kurs_title_upper_like', 'course_kurs', 'title'),
+    ('course_kurs_author_upper_like', 'course_kurs', 'author'),
+    ('course_material_name_upper_like', 'course_material', 'name'),
+    ('course_user_email_upper_like', 'course_user', 'email'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS %s ON %s '
+            '(UPPER(%s::text) text_pattern_ops)' % (name, table, column)
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in INDEXES:
+        schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS %s' % name)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('course', '0008_content_addressed_videos'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
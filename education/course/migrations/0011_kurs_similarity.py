@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0010_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KursSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('kurs', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='course.kurs')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='course.kurs')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='kurssimilarity',
+            index=models.Index(fields=['kurs', '-score'], name='course_kurs_kurs_id_ea86bf_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0011_kurs_similarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kurs',
+            name='cloned_from',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='clones', to='course.kurs'),
+        ),
+    ]
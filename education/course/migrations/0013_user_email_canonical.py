@@ -0,0 +1,30 @@
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def fill_email_canonical(apps, schema_editor):
+    User = apps.get_model('course', 'User')
+    User.objects.update(email_canonical=Lower(Trim('email')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('course', '0012_kurs_cloned_from'),
+    ]
+
+    # Emails differing only in case have to be merged before this runs,
+    # the unique canonical column rejects them.
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_canonical',
+            field=models.EmailField(editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(fill_email_canonical, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email_canonical',
+            field=models.EmailField(editable=False, max_length=255, unique=True),
+        ),
+    ]
@@ -2,6 +2,7 @@
 Database models.
 """
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -9,10 +10,25 @@ from django.contrib.auth.models import (
     PermissionsMixin,
 )
 
+from course.storage import video_storage
+
 
 class UserManager(BaseUserManager):
     """Manager for users."""
 
+    @staticmethod
+    def canonical_email(email):
+        """Return the lowercase form in which emails are compared."""
+        return email.strip().lower()
+
+    def filter_email(self, email):
+        """Return the users registered with email in any case."""
+        return self.filter(email_canonical=self.canonical_email(email))
+
+    def get_by_natural_key(self, email):
+        """Return the user of an email in any case, used to log in."""
+        return self.filter_email(email).get()
+
     def create_user(self, email, password=None, **extra_fields):
         """Create, save and return a new user."""
         if not email:
@@ -36,6 +52,11 @@ class UserManager(BaseUserManager):
 class User(AbstractBaseUser, PermissionsMixin):
     """User in the system."""
     email = models.EmailField(max_length=255, unique=True)
+    email_canonical = models.EmailField(
+        max_length=255,
+        unique=True,
+        editable=False,
+    )
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
@@ -44,6 +65,24 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = 'email'
 
+    def save(self, *args, **kwargs):
+        """Save the user, keeping the canonical email in sync."""
+        self.email_canonical = User.objects.canonical_email(self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'email_canonical'}
+        super().save(*args, **kwargs)
+
+    def validate_unique(self, exclude=None):
+        """Also reject emails registered in another case."""
+        super().validate_unique(exclude)
+        if exclude and 'email' in exclude:
+            return
+        if User.objects.filter_email(self.email).exclude(pk=self.pk).exists():
+            raise ValidationError({
+                'email': 'User with this email already exists.',
+            })
+
 
 class Kurs(models.Model):
     """Kurs object."""
@@ -57,6 +96,17 @@ class Kurs(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     link = models.CharField(max_length=255, blank=True)
     materials = models.ManyToManyField('Material')
+    material_count = models.PositiveIntegerField(default=0, editable=False)
+    video_duration = models.PositiveIntegerField(default=0, editable=False)
+    cloned_from = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='clones',
+    )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
@@ -65,11 +115,117 @@ class Kurs(models.Model):
 class Material(models.Model):
     """Material for filtering kurses."""
     name = models.CharField(max_length=255)
-    video = models.FileField(upload_to="course_videos", blank=True, null=True)
+    video = models.FileField(
+        upload_to="course_videos",
+        storage=video_storage,
+        blank=True,
+        null=True,
+        db_index=True,
+    )
+    duration = models.PositiveIntegerField(default=0)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
+
+
+class CatalogEntry(models.Model):
+    """Denormalized public view of a kurs and a summary of its materials."""
+    kurs = models.OneToOneField(
+        Kurs,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='catalog_entry',
+    )
+    author = models.CharField(max_length=150)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    link = models.CharField(max_length=255, blank=True)
+    material_count = models.PositiveIntegerField(default=0)
+    video_duration = models.PositiveIntegerField(default=0)
+    materials = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.title
+
+
+class Change(models.Model):
+    """Change log entry, its id is the cursor used by syncing clients.
+
+    Only the latest change of an object is kept, so the log grows with the
+    number of objects and tombstones rather than with the write rate.
+    """
+    KURS = 'kurs'
+    MATERIAL = 'material'
+    MODEL_CHOICES = [
+        (KURS, 'Kurs'),
+        (MATERIAL, 'Material'),
+    ]
+
+    # Tombstones are written while the owner may be deleted in the same
+    # transaction, the rows are removed when the user is gone instead.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+    )
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id']),
+            models.Index(fields=['model', 'object_id']),
+        ]
+
+
+class Progress(models.Model):
+    """Furthest position a user has watched of a material video."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+    material = models.ForeignKey(Material, on_delete=models.CASCADE)
+    position = models.PositiveIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'material'],
+                name='course_progress_user_material',
+            ),
+        ]
+
+
+class KursSimilarity(models.Model):
+    """Precomputed Jaccard similarity of the material sets of two kurses.
+
+    Only the most similar kurses of each kurs are stored.
+    """
+    kurs = models.ForeignKey(
+        Kurs,
+        on_delete=models.CASCADE,
+        related_name='similarities',
+    )
+    related = models.ForeignKey(
+        Kurs,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kurs', '-score']),
+        ]
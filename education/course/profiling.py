@@ -0,0 +1,179 @@
+"""
+Opt-in sampling profiler for single API requests.
+"""
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.utils import timezone
+from django.utils.text import slugify
+
+
+SALT = 'course.profiling'
+
+# Modules whose frames count as serializer or renderer time in the summary.
+SERIALIZER_MODULES = ('rest_framework.serializers', 'rest_framework.fields',
+                      'rest_framework.relations', 'kurs.serializers',
+                      'user.serializers')
+RENDERER_MODULES = ('rest_framework.renderers', 'course.renderers')
+
+
+def make_token():
+    """Return a token for the X-Profile header."""
+    return signing.TimestampSigner(salt=SALT).sign('profile')
+
+
+def valid_token(token):
+    """Return whether an X-Profile token is signed and not expired."""
+    try:
+        signing.TimestampSigner(salt=SALT).unsign(
+            token,
+            max_age=settings.PROFILING_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def fold(frame, root):
+    """Return the stack of frame up to the root code as a folded stack."""
+    names = []
+    while frame is not None and frame.f_code is not root:
+        names.append('%s:%s' % (
+            frame.f_globals.get('__name__', '?'),
+            frame.f_code.co_name,
+        ))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """Count the folded stacks of a thread every interval seconds."""
+
+    def __init__(self, thread_id, root, interval):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold(frame, self.root)] += 1
+            del frame
+
+    def stop(self):
+        """Stop sampling and wait for the thread."""
+        self.stopped.set()
+        self.join()
+
+
+class QueryTimer:
+    """Database execute wrapper timing the queries of a request."""
+
+    def __init__(self, keep=5):
+        self.keep = keep
+        self.count = 0
+        self.time = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.time += elapsed
+            self.slowest = sorted(
+                self.slowest + [(elapsed, sql)],
+                key=lambda query: query[0],
+                reverse=True,
+            )[:self.keep]
+
+
+def _sampled_time(stacks, modules, interval):
+    """Return the seconds sampled with a frame of one of the modules."""
+    samples = sum(
+        count for stack, count in stacks.items()
+        if any(
+            frame.startswith(module + ':')
+            for frame in stack.split(';') for module in modules
+        )
+    )
+    return samples * interval
+
+
+def _call(get_response, request):
+    """Call the rest of the chain, the root of every sampled stack."""
+    return get_response(request)
+
+
+def profile_request(get_response, request):
+    """Run a request under the sampler and write its profile.
+
+    Writes ``<name>.folded``, one ``frame;frame;... count`` line per stack
+    as read by flamegraph.pl and speedscope, and ``<name>.json`` with the
+    request, query timings and the serializer and renderer time estimated
+    from the samples. Returns the response and the artifact name.
+    """
+    interval = settings.PROFILING_INTERVAL
+    sampler = StackSampler(
+        threading.get_ident(), _call.__code__, interval,
+    )
+    timer = QueryTimer()
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        sampler.start()
+        try:
+            response = _call(get_response, request)
+        finally:
+            sampler.stop()
+    duration = time.perf_counter() - started
+
+    name = '%s-%s-%s' % (
+        timezone.now().strftime('%Y%m%dT%H%M%S%f'),
+        request.method.lower(),
+        slugify(request.path.replace('/', ' ')) or 'root',
+    )
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f'{name}.folded').write_text(''.join(
+        f'{stack} {count}\n' for stack, count in sampler.stacks.items()
+    ))
+    summary = {
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 3),
+        'interval_ms': interval * 1000,
+        'samples': sum(sampler.stacks.values()),
+        'queries': {
+            'count': timer.count,
+            'time_ms': round(timer.time * 1000, 3),
+            'slowest': [
+                {'sql': sql, 'time_ms': round(elapsed * 1000, 3)}
+                for elapsed, sql in timer.slowest
+            ],
+        },
+        'serializer_ms': round(1000 * _sampled_time(
+            sampler.stacks, SERIALIZER_MODULES, interval,
+        ), 3),
+        'renderer_ms': round(1000 * _sampled_time(
+            sampler.stacks, RENDERER_MODULES, interval,
+        ), 3),
+    }
+    (directory / f'{name}.json').write_text(json.dumps(summary, indent=2))
+    return response, name
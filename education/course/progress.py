@@ -0,0 +1,154 @@
+"""
+Buffered recording of playback progress heartbeats.
+"""
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from course.models import Material, Progress
+
+
+# Share of a video that has to be watched for the material to count as
+# completed when the client does not report it.
+COMPLETED_RATIO = 0.9
+
+
+def upsert_progress(rows, batch_size=500):
+    """Insert or advance progress rows of (user, material, position,
+    completed, updated_at), keeping the furthest position per pair."""
+    table = connection.ops.quote_name(Progress._meta.db_table)
+    greatest = 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+    adapt = connection.ops.adapt_datetimefield_value
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))
+            params = []
+            for user_id, material_id, position, completed, updated_at \
+                    in batch:
+                params += [
+                    user_id,
+                    material_id,
+                    position,
+                    completed,
+                    adapt(updated_at),
+                ]
+            cursor.execute(
+                f'INSERT INTO {table} '
+                f'(user_id, material_id, position, completed, updated_at) '
+                f'VALUES {values} '
+                f'ON CONFLICT (user_id, material_id) DO UPDATE SET '
+                f'position = {greatest}('
+                f'{table}.position, EXCLUDED.position), '
+                f'completed = {table}.completed OR EXCLUDED.completed, '
+                f'updated_at = EXCLUDED.updated_at',
+                params,
+            )
+
+
+class ProgressBuffer:
+    """Coalesce heartbeats in memory and write them in batches.
+
+    Heartbeats for the same user and material are merged into one row,
+    and the rows are flushed with a single upsert once the buffer holds
+    ``PROGRESS_FLUSH_SIZE`` pairs, or by a timer started with the first
+    buffered heartbeat after ``PROGRESS_FLUSH_INTERVAL`` seconds. Heartbeats
+    still buffered when a worker dies are lost, which costs at most that
+    interval of progress. Heartbeats have to be validated before they are
+    added, only those of deleted materials are dropped when flushing.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.timer = None
+
+    def add(self, user_id, material_id, position, completed=False):
+        """Buffer a heartbeat and flush the buffer if it is full."""
+        now = timezone.now()
+        with self.lock:
+            key = (user_id, material_id)
+            if key in self.pending:
+                old_position, old_completed, _ = self.pending[key]
+                position = max(position, old_position)
+                completed = completed or old_completed
+            self.pending[key] = (position, completed, now)
+            if self.timer is None:
+                self.timer = threading.Timer(
+                    settings.PROGRESS_FLUSH_INTERVAL,
+                    self.flush_in_thread,
+                )
+                self.timer.daemon = True
+                self.timer.start()
+            full = len(self.pending) >= settings.PROGRESS_FLUSH_SIZE
+        if full:
+            self.flush()
+
+    def take(self):
+        """Return and remove the buffered heartbeats, stopping the timer."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        return pending
+
+    def flush_in_thread(self):
+        """Flush from the timer thread, closing its database connection."""
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Write the buffered heartbeats, returning the rows written."""
+        pending = self.take()
+        if not pending:
+            return 0
+
+        durations = dict(
+            Material.objects.filter(
+                pk__in={material_id for _, material_id in pending},
+            ).values_list('pk', 'duration')
+        )
+        rows = []
+        for (user_id, material_id), values in pending.items():
+            position, completed, updated_at = values
+            if material_id not in durations:
+                continue
+            duration = durations[material_id]
+            if duration and position >= duration * COMPLETED_RATIO:
+                completed = True
+            rows.append(
+                (user_id, material_id, position, completed, updated_at),
+            )
+
+        upsert_progress(rows)
+        return len(rows)
+
+
+buffer = ProgressBuffer()
+atexit.register(buffer.flush)
+
+
+def kurs_completion(user, kurs):
+    """Return how much of the kurs materials the user has watched."""
+    totals = Progress.objects.filter(
+        user=user,
+        material__kurs=kurs,
+    ).aggregate(
+        completed=Count('id', filter=Q(completed=True)),
+        watched=Sum('position'),
+    )
+    completed = totals['completed']
+    return {
+        'material_count': kurs.material_count,
+        'completed': completed,
+        'percent': round(100 * completed / kurs.material_count, 1)
+        if kurs.material_count else 0.0,
+        'watched': totals['watched'] or 0,
+    }
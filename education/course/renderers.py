@@ -0,0 +1,46 @@
+"""
+MessagePack renderer for the API.
+"""
+import datetime
+import decimal
+import uuid
+
+import msgpack
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+
+def encode(obj):
+    """Encode the types msgpack does not know like DRF's JSON encoder.
+
+    Decimals are sent as strings so prices keep their exact value.
+    """
+    if isinstance(obj, (decimal.Decimal, uuid.UUID, Promise)):
+        return str(obj)
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Cannot encode {type(obj).__name__} to MessagePack')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render responses as MessagePack."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode, use_bin_type=True)
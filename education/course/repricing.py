@@ -0,0 +1,67 @@
+"""
+Repricing of kurses with batched pricing rules.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from course.changes import record_kurs_changes
+from course.models import CatalogEntry, Kurs
+from education import pricing
+
+
+def reprice_kurses(queryset, rules, batch_size=1000):
+    """Apply pricing rules to the kurses of queryset.
+
+    Prices are computed for the whole queryset at once and written back
+    with a single bulk_update, together with the catalog entries and the
+    change log, all in one transaction holding the locks of the kurs rows.
+    Prices are clamped at zero, and a ValueError is raised before anything
+    is written when one no longer fits the price field.
+    Returns the number of kurses whose price changed.
+    """
+    field = Kurs._meta.get_field('price')
+    max_price = (
+        Decimal(10 ** field.max_digits - 1).scaleb(-field.decimal_places)
+    )
+    with transaction.atomic():
+        # The rows stay locked from reading the prices to writing them, so
+        # concurrent price edits are not overwritten with stale results.
+        rows = list(
+            queryset.select_for_update().order_by('pk').values_list(
+                'pk', 'price',
+            )
+        )
+        if not rows:
+            return 0
+
+        pks, prices = zip(*rows)
+        new_prices = pricing.apply_rules(prices, rules, max_price=max_price)
+        changed = [
+            (pk, new) for pk, old, new in zip(pks, prices, new_prices)
+            if new != old
+        ]
+        now = timezone.now()
+        Kurs.objects.bulk_update(
+            [
+                Kurs(pk=pk, price=price, updated_at=now)
+                for pk, price in changed
+            ],
+            ['price', 'updated_at'],
+            batch_size=batch_size,
+        )
+        CatalogEntry.objects.bulk_update(
+            [
+                CatalogEntry(kurs_id=pk, price=price, updated_at=now)
+                for pk, price in changed
+            ],
+            ['price', 'updated_at'],
+            batch_size=batch_size,
+        )
+        for start in range(0, len(changed), batch_size):
+            record_kurs_changes(
+                [pk for pk, _ in changed[start:start + batch_size]],
+            )
+
+    return len(changed)
@@ -0,0 +1,180 @@
+"""
+Prebuilt OpenAPI schema artifacts.
+"""
+import functools
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from drf_spectacular import __version__ as spectacular_version
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.utils import (
+    OpenApiParameter,
+    extend_schema,
+    extend_schema_view,
+)
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+from course.middleware import precompress
+
+
+RENDERERS = {
+    'yaml': OpenApiYamlRenderer,
+    'json': OpenApiJsonRenderer,
+}
+
+
+class Schema:
+    """A rendered schema with its ETag and precompressed bodies."""
+
+    def __init__(self, content):
+        self.content = content
+        self.etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+        self.precompressed = precompress(content)
+
+
+def annotate_views():
+    """Attach the schema hints to the API views.
+
+    Called when the app is ready if API docs are enabled, before the URLs
+    copy the action options, so workers without docs never import
+    drf-spectacular.
+    """
+    from kurs import serializers
+    from kurs.views import ChangesView, KursViewSet
+
+    extend_schema_view(
+        clone=extend_schema(responses=serializers.KursDetailSerializer),
+        clone_many=extend_schema(operation_id='kurs_kurses_clone_many'),
+        progress=extend_schema(
+            methods=['POST'],
+            request=serializers.HeartbeatSerializer,
+            responses={202: None},
+        ),
+    )(KursViewSet)
+    extend_schema_view(
+        get=extend_schema(
+            parameters=[
+                OpenApiParameter(
+                    'since', int,
+                    description='Cursor of the last page, 0 to start.',
+                ),
+                OpenApiParameter(
+                    'limit', int,
+                    description='Number of changes per page, at least 1.',
+                ),
+            ],
+            responses=serializers.ChangesSerializer,
+        ),
+    )(ChangesView)
+
+
+def code_fingerprint():
+    """Return a hash of the project sources the schema is built from."""
+    digest = hashlib.sha256(spectacular_version.encode())
+    for path in sorted(Path(settings.BASE_DIR).rglob('*.py')):
+        digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def artifact_path(fingerprint, fmt):
+    """Return the path of the schema artifact for a code fingerprint."""
+    return Path(settings.SCHEMA_DIR) / f'openapi-{fingerprint}.{fmt}'
+
+
+def render_schemas():
+    """Generate the schema and render it in every format."""
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return {
+        fmt: renderer().render(schema, renderer_context={})
+        for fmt, renderer in RENDERERS.items()
+    }
+
+
+def build_schema(force=False):
+    """Write the schema artifacts for the current code.
+
+    Returns the paths written, which is empty when the artifacts for the
+    current fingerprint already exist.
+    """
+    fingerprint = code_fingerprint()
+    paths = {fmt: artifact_path(fingerprint, fmt) for fmt in RENDERERS}
+    if not force and all(path.exists() for path in paths.values()):
+        return []
+
+    Path(settings.SCHEMA_DIR).mkdir(parents=True, exist_ok=True)
+    for fmt, content in render_schemas().items():
+        write_atomic(paths[fmt], content)
+    return list(paths.values())
+
+
+def write_atomic(path, content):
+    """Write content to path so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint_cached():
+    """Return the code fingerprint computed once per process."""
+    return code_fingerprint()
+
+
+@functools.lru_cache(maxsize=None)
+def load_schema(fmt):
+    """Return the schema for the current code, building it if needed."""
+    path = artifact_path(code_fingerprint_cached(), fmt)
+    try:
+        return Schema(path.read_bytes())
+    except FileNotFoundError:
+        pass
+
+    try:
+        build_schema()
+        return Schema(path.read_bytes())
+    except OSError:
+        # A read only checkout still serves the schema from memory.
+        return Schema(render_schemas()[fmt])
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """Serve the prebuilt schema from memory.
+
+    Requests for a translated schema with ``?lang=`` are still generated
+    on the fly.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('lang'):
+            return super().get(request, *args, **kwargs)
+
+        schema = load_schema(request.accepted_renderer.format)
+        etags = [
+            etag[2:] if etag.startswith('W/') else etag
+            for etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        ]
+        if schema.etag in etags or '*' in etags:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                schema.content,
+                content_type='%s; charset=utf-8' % (
+                    request.accepted_renderer.media_type
+                ),
+            )
+            response.precompressed = schema.precompressed
+        response['ETag'] = schema.etag
+        return response
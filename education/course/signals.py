@@ -0,0 +1,177 @@
+"""
+Signal handlers keeping denormalized data in sync.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from course.catalog import kurs_ids_for_material, refresh_catalog
+from course.changes import record_changes, record_kurs_changes
+from course.models import Change, Kurs, Material
+from course.similarity import refresh_similarity_on_commit
+from course.videos import release_video
+
+
+def _adjust_material_totals(links, sign):
+    """Add or subtract the given kurs/material links from kurs totals."""
+    totals = links.order_by().values('kurs_id').annotate(
+        count=Count('pk'),
+        duration=Sum('material__duration'),
+    )
+    for row in totals:
+        Kurs.objects.filter(pk=row['kurs_id']).update(
+            material_count=F('material_count') + sign * row['count'],
+            video_duration=F('video_duration') + sign * (row['duration'] or 0),
+        )
+
+
+def adjust_material_duration(material, old_duration):
+    """Apply a change of a material duration to the kurses using it."""
+    delta = material.duration - old_duration
+    if delta:
+        Kurs.objects.filter(materials=material).update(
+            video_duration=F('video_duration') + delta,
+        )
+
+
+@receiver(m2m_changed, sender=Kurs.materials.through)
+def update_material_totals(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Keep kurs material counters in sync with the materials relation."""
+    if action not in ('post_add', 'pre_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        links = sender.objects.filter(material_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(kurs_id__in=pk_set)
+    else:
+        links = sender.objects.filter(kurs_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(material_id__in=pk_set)
+
+    _adjust_material_totals(links, 1 if action == 'post_add' else -1)
+
+
+@receiver(pre_delete, sender=Material)
+def remove_material_totals(sender, instance, **kwargs):
+    """Subtract a deleted material from the kurses using it."""
+    links = Kurs.materials.through.objects.filter(material_id=instance.pk)
+    _adjust_material_totals(links, -1)
+
+
+@receiver(m2m_changed, sender=Kurs.materials.through)
+def collect_kurs_ids(sender, instance, action, reverse, **kwargs):
+    """Remember the kurses using a material before it's unlinked."""
+    if reverse and action == 'pre_clear':
+        instance._kurs_ids = kurs_ids_for_material(instance)
+
+
+@receiver(pre_delete, sender=Material)
+def collect_kurs_ids_for_deleted_material(sender, instance, **kwargs):
+    """Remember the kurses using a material before it's deleted."""
+    instance._kurs_ids = kurs_ids_for_material(instance)
+
+
+def _changed_kurs_ids(instance, action, reverse, pk_set):
+    """Return the ids of kurses affected by a materials relation change."""
+    if not reverse:
+        return [instance.pk]
+    elif action == 'post_clear':
+        return getattr(instance, '_kurs_ids', [])
+
+    return pk_set
+
+
+@receiver(post_save, sender=Kurs)
+def update_catalog_for_kurs(sender, instance, **kwargs):
+    """Refresh the catalog entry of a saved kurs."""
+    refresh_catalog([instance.pk])
+
+
+@receiver(m2m_changed, sender=Kurs.materials.through)
+def update_catalog_for_materials(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    """Refresh the catalog entries of kurses whose materials changed."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        refresh_catalog(_changed_kurs_ids(instance, action, reverse, pk_set))
+
+
+@receiver(post_save, sender=Material)
+def update_catalog_for_material(sender, instance, created, **kwargs):
+    """Refresh the catalog entries of kurses using a changed material."""
+    if not created:
+        refresh_catalog(kurs_ids_for_material(instance))
+
+
+@receiver(post_delete, sender=Material)
+def update_catalog_for_deleted_material(sender, instance, **kwargs):
+    """Refresh the catalog entries of kurses that used a deleted material."""
+    refresh_catalog(getattr(instance, '_kurs_ids', []))
+
+
+@receiver(post_save, sender=Kurs)
+@receiver(post_save, sender=Material)
+def log_saved(sender, instance, created, **kwargs):
+    """Log an update of a kurs or material."""
+    model = Change.KURS if sender is Kurs else Change.MATERIAL
+    record_changes(model, {instance.pk: instance.user_id})
+    if sender is Material and not created:
+        record_kurs_changes(kurs_ids_for_material(instance))
+
+
+@receiver(post_delete, sender=Kurs)
+@receiver(post_delete, sender=Material)
+def log_deleted(sender, instance, **kwargs):
+    """Log a tombstone for a deleted kurs or material."""
+    model = Change.KURS if sender is Kurs else Change.MATERIAL
+    record_changes(model, {instance.pk: instance.user_id}, deleted=True)
+    if sender is Material:
+        record_kurs_changes(getattr(instance, '_kurs_ids', []))
+
+
+@receiver(m2m_changed, sender=Kurs.materials.through)
+def log_materials_changed(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    """Log an update of kurses whose materials changed."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        record_kurs_changes(
+            _changed_kurs_ids(instance, action, reverse, pk_set),
+        )
+
+
+@receiver(post_delete, sender=get_user_model())
+def clear_change_log(sender, instance, **kwargs):
+    """Drop the change log of a deleted user."""
+    Change.objects.filter(user_id=instance.pk).delete()
+
+
+@receiver(post_delete, sender=Material)
+def release_deleted_video(sender, instance, **kwargs):
+    """Delete the video of a deleted material once it's unreferenced."""
+    if instance.video:
+        name = instance.video.name
+        transaction.on_commit(lambda: release_video(name))
+
+
+@receiver(m2m_changed, sender=Kurs.materials.through)
+def update_similarity_for_materials(sender, instance, action, reverse,
+                                    pk_set, **kwargs):
+    """Rescore related kurses of kurses whose materials changed."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        refresh_similarity_on_commit(
+            _changed_kurs_ids(instance, action, reverse, pk_set),
+        )
+
+
+@receiver(post_delete, sender=Material)
+def update_similarity_for_deleted_material(sender, instance, **kwargs):
+    """Rescore related kurses of kurses that used a deleted material."""
+    refresh_similarity_on_commit(getattr(instance, '_kurs_ids', []))
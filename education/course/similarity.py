@@ -0,0 +1,218 @@
+"""
+Related kurses from the Jaccard similarity of their material sets.
+"""
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+
+from course.models import Kurs, KursSimilarity
+
+
+Link = Kurs.materials.through
+
+_scheduled = threading.local()
+
+
+def _matrix(kurs_ids, material_ids, links):
+    """Return a binary kurs x material matrix of the (kurs, material) links.
+
+    kurs_ids and material_ids are sorted arrays giving the row and column
+    order.
+    """
+    # scipy.sparse takes ~0.3 s to import, keep it out of worker startup.
+    from scipy import sparse
+
+    rows = np.searchsorted(kurs_ids, links[:, 0])
+    columns = np.searchsorted(material_ids, links[:, 1])
+    return sparse.csr_matrix(
+        (np.ones(len(links), dtype=np.int32), (rows, columns)),
+        shape=(len(kurs_ids), len(material_ids)),
+    )
+
+
+def _links(queryset):
+    """Return the links of the queryset as an array of (kurs, material)."""
+    return np.array(
+        list(queryset.values_list('kurs_id', 'material_id')),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+
+def jaccard_pairs(row_links, column_links, column_sizes):
+    """Return the Jaccard index of every row kurs with each column kurs.
+
+    column_links only needs the links of the materials used by the row
+    kurses, column_sizes maps every column kurs to its number of
+    materials. Returns (kurs_ids, related_ids, scores) arrays of the pairs
+    sharing materials, ordered by kurs and descending score.
+    """
+    if not len(row_links) or not len(column_links):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float64)
+
+    row_ids = np.unique(row_links[:, 0])
+    column_ids = np.unique(column_links[:, 0])
+    material_ids = np.unique(
+        np.concatenate([row_links[:, 1], column_links[:, 1]]),
+    )
+    rows = _matrix(row_ids, material_ids, row_links)
+    columns = _matrix(column_ids, material_ids, column_links)
+
+    shared = (rows @ columns.T).tocoo()
+    kurs = row_ids[shared.row]
+    related = column_ids[shared.col]
+    keep = kurs != related
+    kurs, related, shared_count = kurs[keep], related[keep], shared.data[keep]
+
+    row_sizes = np.asarray(rows.sum(axis=1)).ravel()
+    sizes = np.array([column_sizes[pk] for pk in column_ids])
+    union = (
+        row_sizes[shared.row[keep]] + sizes[shared.col[keep]] - shared_count
+    )
+    scores = shared_count / union
+
+    order = np.lexsort((related, -scores, kurs))
+    return kurs[order], related[order], scores[order]
+
+
+def top_related(row_links, column_links, column_sizes, top_n):
+    """Return the top_n most similar kurses of each kurs in row_links."""
+    kurs, related, scores = jaccard_pairs(
+        row_links, column_links, column_sizes,
+    )
+    starts = np.searchsorted(kurs, kurs)
+    top = np.arange(len(kurs)) - starts < top_n
+    return kurs[top], related[top], scores[top]
+
+
+def _replace(existing, rows, batch_size=1000):
+    """Replace the existing similarities with (kurs, related, score) rows.
+
+    Rows are inserted with multi row INSERTs rather than bulk_create, which
+    spends most of a full rebuild building model instances.
+    """
+    table = connection.ops.quote_name(KursSimilarity._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        existing.delete()
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            values = ', '.join(['(%s, %s, %s)'] * len(batch))
+            cursor.execute(
+                f'INSERT INTO {table} (kurs_id, related_id, score) '
+                f'VALUES {values}',
+                [value for row in batch for value in row],
+            )
+
+
+def _rows(kurs, related, scores):
+    """Return similarity arrays as a list of (kurs, related, score)."""
+    return list(zip(kurs.tolist(), related.tolist(), scores.tolist()))
+
+
+def build_similarity_index(chunk_size=2000):
+    """Rebuild the similarity index of all kurses.
+
+    The links are loaded once and the kurses are scored in chunks, which
+    bounds the size of the intermediate sparse product.
+    """
+    top_n = settings.SIMILARITY_TOP_N
+    links = _links(Link.objects.all())
+    kurs_ids, sizes = np.unique(links[:, 0], return_counts=True)
+    column_sizes = dict(zip(kurs_ids.tolist(), sizes.tolist()))
+
+    rows = []
+    for start in range(0, len(kurs_ids), chunk_size):
+        chunk = kurs_ids[start:start + chunk_size]
+        row_links = links[np.isin(links[:, 0], chunk)]
+        rows += _rows(*top_related(row_links, links, column_sizes, top_n))
+
+    _replace(KursSimilarity.objects.all(), rows)
+    return len(rows)
+
+
+def refresh_similarity(kurs_ids):
+    """Update the index after the materials of kurs_ids changed.
+
+    The changed kurses are rescored against every kurs sharing a material
+    with them. Their neighbours only merge the new scores into their stored
+    top kurses, so a neighbour that drops a changed kurs is not refilled
+    from kurses outside its stored list until the next full rebuild.
+    """
+    changed = set(kurs_ids)
+    if not changed:
+        return
+
+    top_n = settings.SIMILARITY_TOP_N
+    materials = Link.objects.filter(kurs_id__in=changed).values(
+        'material_id',
+    )
+    row_links = _links(Link.objects.filter(kurs_id__in=changed))
+    column_links = _links(Link.objects.filter(material_id__in=materials))
+    column_sizes = dict(
+        Link.objects.filter(
+            kurs_id__in=np.unique(column_links[:, 0]).tolist(),
+        ).values('kurs_id').annotate(
+            count=Count('pk'),
+        ).values_list('kurs_id', 'count')
+    )
+    kurs, related, scores = jaccard_pairs(
+        row_links, column_links, column_sizes,
+    )
+    starts = np.searchsorted(kurs, kurs)
+    top = np.arange(len(kurs)) - starts < top_n
+    rows = _rows(kurs[top], related[top], scores[top])
+
+    neighbours = set(related.tolist()) | set(
+        KursSimilarity.objects.filter(related_id__in=changed).values_list(
+            'kurs_id', flat=True,
+        )
+    )
+    neighbours -= changed
+    stored = {}
+    candidates = {}
+    for neighbour, other, score in KursSimilarity.objects.filter(
+            kurs_id__in=neighbours,
+    ).values_list('kurs_id', 'related_id', 'score'):
+        stored.setdefault(neighbour, []).append((-score, other))
+        if other not in changed:
+            candidates.setdefault(neighbour, []).append((-score, other))
+    for other, neighbour, score in _rows(kurs, related, scores):
+        if neighbour not in changed:
+            candidates.setdefault(neighbour, []).append((-score, other))
+
+    # Only rewrite the neighbours whose top kurses actually changed.
+    rewritten = set(changed)
+    for neighbour in neighbours:
+        top = sorted(candidates.get(neighbour, []))[:top_n]
+        if top != sorted(stored.get(neighbour, [])):
+            rewritten.add(neighbour)
+            rows += [(neighbour, other, -score) for score, other in top]
+
+    _replace(KursSimilarity.objects.filter(kurs_id__in=rewritten), rows)
+
+
+def refresh_similarity_on_commit(kurs_ids):
+    """Refresh the index for kurs_ids once the transaction commits.
+
+    Keeps the rescoring out of the writing transaction, and the kurses
+    scheduled by one transaction are refreshed together by the first of
+    its callbacks. Kurses of a rolled back transaction may be refreshed
+    with the next one, which only rescores them again.
+    """
+    kurs_ids = set(kurs_ids)
+    if not kurs_ids:
+        return
+
+    if not hasattr(_scheduled, 'kurs_ids'):
+        _scheduled.kurs_ids = set()
+    _scheduled.kurs_ids |= kurs_ids
+    transaction.on_commit(_refresh_scheduled)
+
+
+def _refresh_scheduled():
+    kurs_ids, _scheduled.kurs_ids = _scheduled.kurs_ids, set()
+    if kurs_ids:
+        refresh_similarity(kurs_ids)
@@ -0,0 +1,79 @@
+"""
+Storage backends for uploaded files.
+"""
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.utils.deconstruct import deconstructible
+
+from course.tracing import span
+
+
+def lock_content(name):
+    """Lock a content addressed name until the transaction ends.
+
+    Saving a file that is already stored and deleting an unreferenced
+    file both take the lock, so a file is never deleted between an upload
+    reusing it and the commit of the row referencing it. The lock key is
+    hashed from the whole name, as files stored before content addressing
+    keep their upload names. Only PostgreSQL has the advisory locks this
+    takes.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    key = int.from_bytes(
+        hashlib.sha256(name.encode()).digest()[:8], 'big', signed=True,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage keeping a single copy of identical files.
+
+    A file uploaded as ``<dir>/<name><ext>`` is stored as
+    ``<dir>/<aa>/<sha256><ext>``. The digest is computed by streaming the
+    upload in chunks, and when a file with the same digest is already
+    stored the upload is not written at all. Save files inside the
+    transaction that saves the row referencing them, which holds the
+    lock_content() lock of the file until it commits.
+    """
+    chunk_size = 64 * 1024
+
+    def content_name(self, name, content):
+        """Return the content addressed name of a file."""
+        digest = hashlib.sha256()
+        for chunk in content.chunks(self.chunk_size):
+            digest.update(chunk)
+        digest = digest.hexdigest()
+
+        directory, filename = posixpath.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + ext)
+
+    def _save(self, name, content):
+        with span('storage.save', attributes={'storage.name': name}) as s:
+            name = self.content_name(name, content)
+            lock_content(name)
+            if self.exists(name):
+                return name
+
+            name = super()._save(name, content)
+            if s is not None:
+                s.set_attribute('storage.size', content.size)
+            return name
+
+    def _open(self, name, mode='rb'):
+        with span('storage.open', attributes={'storage.name': name}):
+            return super()._open(name, mode)
+
+    def delete(self, name):
+        with span('storage.delete', attributes={'storage.name': name}):
+            super().delete(name)
+
+
+video_storage = ContentAddressedStorage()
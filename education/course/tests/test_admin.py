@@ -1,10 +1,16 @@
 """
 Tests for the Django admin modifications.
 """
+from decimal import Decimal
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
-from django.test import Client
+from django.test import Client, tag
+
+from course.admin import EstimatedCountPaginator
+from course.models import Kurs, Material
 
 
 class AdminSiteTests(TestCase):
@@ -45,3 +51,71 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def create_kurs(self, **params):
+        defaults = {
+            'user': self.user,
+            'author': 'Author',
+            'title': 'Kurs',
+            'price': Decimal('5.00'),
+        }
+        defaults.update(params)
+        return Kurs.objects.create(**defaults)
+
+    def test_kurs_changelist_search(self):
+        """Test kurses are searched by title prefix."""
+        self.create_kurs(title='Python basics')
+        self.create_kurs(title='Advanced Python')
+        url = reverse('admin:course_kurs_changelist')
+
+        res = self.client.get(url, {'q': 'python'})
+
+        self.assertContains(res, 'Python basics')
+        self.assertNotContains(res, 'Advanced Python')
+
+    def test_kurs_change_page_autocompletes_materials(self):
+        """Test materials are not all loaded into the kurs form."""
+        kurs = self.create_kurs()
+        material = Material.objects.create(user=self.user, name='Linked')
+        kurs.materials.add(material)
+        Material.objects.create(user=self.user, name='Unrelated material')
+        url = reverse('admin:course_kurs_change', args=[kurs.id])
+
+        res = self.client.get(url)
+
+        self.assertContains(res, 'admin-autocomplete')
+        self.assertContains(res, 'Linked')
+        self.assertNotContains(res, 'Unrelated material')
+
+    def test_material_changelist(self):
+        """Test the material changelist works."""
+        Material.objects.create(user=self.user, name='Intro video')
+        url = reverse('admin:course_material_changelist')
+
+        res = self.client.get(url, {'q': 'intro'})
+
+        self.assertContains(res, 'Intro video')
+
+    def test_paginator_counts_filtered_exactly(self):
+        """Test filtered querysets are not estimated."""
+        self.create_kurs(title='Python basics')
+        self.create_kurs(title='Django')
+        paginator = EstimatedCountPaginator(
+            Kurs.objects.filter(title='Django').order_by('id'),
+            100,
+        )
+
+        self.assertIsNone(paginator.estimate())
+        self.assertEqual(paginator.count, 1)
+
+    @tag('postgres')
+    def test_paginator_estimates_large_tables(self):
+        """Test unfiltered querysets use the planner estimate."""
+        for i in range(3):
+            self.create_kurs(title=f'Kurs {i}')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE course_kurs')
+        paginator = EstimatedCountPaginator(Kurs.objects.order_by('id'), 100)
+        paginator.estimate_threshold = 0
+
+        self.assertEqual(paginator.estimate(), 3)
@@ -0,0 +1,141 @@
+"""
+Tests for the batch API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from course.models import Kurs, Material
+
+
+BATCH_URL = reverse('api-batch')
+
+
+class BatchApiTests(TestCase):
+    """Test running requests in a batch."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            name='Test User',
+        )
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def create_kurs(self):
+        return Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title='Kurs',
+            price=Decimal('5.00'),
+        )
+
+    def test_auth_required(self):
+        """Test auth is required to call the batch API."""
+        res = APIClient().post(BATCH_URL, {'requests': []}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_batch_page_load(self):
+        """Test several reads are answered in one response."""
+        kurs = self.create_kurs()
+        Material.objects.create(user=self.user, name='Intro')
+        payload = {'requests': [
+            {'method': 'GET', 'path': '/api/user/me/'},
+            {'method': 'GET', 'path': f'/api/kurs/kurses/{kurs.id}/'},
+            {'method': 'GET', 'path': '/api/kurs/materials/'},
+            {'method': 'GET', 'path': '/api/kurs/kurses/0/'},
+        ]}
+
+        res = self.client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.data['results']
+        self.assertEqual(
+            [r['status'] for r in results],
+            [200, 200, 200, 404],
+        )
+        self.assertEqual(results[0]['body']['email'], self.user.email)
+        self.assertEqual(results[1]['body']['id'], kurs.id)
+        self.assertEqual(results[2]['body'][0]['name'], 'Intro')
+
+    def test_batch_authenticates_once(self):
+        """Test the token is looked up once for the whole batch."""
+        payload = {'requests': [
+            {'method': 'GET', 'path': '/api/user/me/'},
+            {'method': 'GET', 'path': '/api/user/me/'},
+        ]}
+
+        with self.assertNumQueries(1):
+            res = self.client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_batch_write(self):
+        """Test writes are run with the request body."""
+        payload = {'requests': [{
+            'method': 'POST',
+            'path': '/api/kurs/kurses/',
+            'body': {'author': 'Ann', 'title': 'New', 'price': '2.50'},
+        }]}
+
+        res = self.client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(res.data['results'][0]['status'], 201)
+        self.assertTrue(Kurs.objects.filter(title='New').exists())
+
+    def test_atomic_batch_rolled_back(self):
+        """Test an atomic batch is rolled back on the first failure."""
+        payload = {'atomic': True, 'requests': [
+            {
+                'method': 'POST',
+                'path': '/api/kurs/kurses/',
+                'body': {'author': 'Ann', 'title': 'New', 'price': '2.50'},
+            },
+            {
+                'method': 'POST',
+                'path': '/api/kurs/kurses/',
+                'body': {'title': 'Missing author'},
+            },
+            {'method': 'GET', 'path': '/api/user/me/'},
+        ]}
+
+        res = self.client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [r['status'] for r in res.data['results']],
+            [201, 400],
+        )
+        self.assertFalse(Kurs.objects.exists())
+
+    def test_path_outside_api_rejected(self):
+        """Test only API paths can be batched."""
+        payload = {'requests': [{'method': 'GET', 'path': '/api/batch/'}]}
+
+        res = self.client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BATCH_MAX_REQUESTS=1)
+    def test_batch_size_limited(self):
+        """Test batches above the limit are rejected."""
+        payload = {'requests': [
+            {'method': 'GET', 'path': '/api/user/me/'},
+            {'method': 'GET', 'path': '/api/user/me/'},
+        ]}
+
+        res = self.client.post(BATCH_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
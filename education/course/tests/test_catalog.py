@@ -0,0 +1,110 @@
+"""
+Tests for the catalog read model.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+
+from course.catalog import refresh_catalog
+from course.models import CatalogEntry, Kurs, Material
+
+
+class CatalogTests(TestCase):
+    """Test catalog entries follow kurs and material writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def setUp(self):
+        self.kurs = Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title='Kurs',
+            price=Decimal('5.00'),
+        )
+        self.material = Material.objects.create(
+            user=self.user, name='Intro', duration=60,
+        )
+
+    def entry(self):
+        return CatalogEntry.objects.get(kurs=self.kurs)
+
+    def test_entry_created_with_kurs(self):
+        """Test saving a kurs creates its catalog entry."""
+        entry = self.entry()
+
+        self.assertEqual(entry.title, 'Kurs')
+        self.assertEqual(entry.price, Decimal('5.00'))
+        self.assertEqual(entry.materials, [])
+
+    def test_entry_follows_kurs_update(self):
+        """Test kurs changes are copied to the catalog."""
+        self.kurs.title = 'Renamed'
+        self.kurs.save()
+
+        self.assertEqual(self.entry().title, 'Renamed')
+
+    def test_entry_follows_materials(self):
+        """Test material links are summarized in the catalog."""
+        self.kurs.materials.add(self.material)
+
+        entry = self.entry()
+        self.assertEqual(entry.material_count, 1)
+        self.assertEqual(entry.video_duration, 60)
+        self.assertEqual(entry.materials, [{
+            'id': self.material.id,
+            'name': 'Intro',
+            'duration': 60,
+            'video': None,
+        }])
+
+        self.material.kurs_set.clear()
+        self.assertEqual(self.entry().materials, [])
+
+    def test_entry_follows_material_changes(self):
+        """Test renaming and deleting a material updates the catalog."""
+        self.kurs.materials.add(self.material)
+
+        self.material.name = 'Welcome'
+        self.material.save()
+        self.assertEqual(self.entry().materials[0]['name'], 'Welcome')
+
+        self.material.delete()
+        self.assertEqual(self.entry().material_count, 0)
+
+    def test_entry_deleted_with_kurs(self):
+        """Test deleting a kurs removes its catalog entry."""
+        self.kurs.delete()
+
+        self.assertFalse(CatalogEntry.objects.exists())
+
+    def test_refresh_missing_kurs(self):
+        """Test refreshing an unknown kurs drops its entry."""
+        CatalogEntry.objects.all().delete()
+
+        refresh_catalog([self.kurs.id, 0])
+
+        self.assertEqual(CatalogEntry.objects.count(), 1)
+
+    @tag('postgres')
+    def test_refresh_locks_kurses(self):
+        """Test the kurs rows are locked before their entries are replaced."""
+        with CaptureQueriesContext(connection) as queries:
+            refresh_catalog([self.kurs.id])
+
+        statements = [query['sql'] for query in queries]
+        locking = next(
+            i for i, sql in enumerate(statements) if 'FOR UPDATE' in sql
+        )
+        deleting = next(
+            i for i, sql in enumerate(statements)
+            if sql.startswith('DELETE') and 'course_catalogentry' in sql
+        )
+        self.assertLess(locking, deleting)
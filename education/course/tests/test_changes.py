@@ -0,0 +1,77 @@
+"""
+Tests for the change log.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from course.models import Change, Kurs, Material
+
+
+class ChangeLogTests(TestCase):
+    """Test writes are recorded in the change log."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.kurs = Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title='Kurs',
+            price=Decimal('5.00'),
+        )
+        self.material = Material.objects.create(user=self.user, name='Intro')
+
+    def change(self, obj):
+        model = Change.KURS if isinstance(obj, Kurs) else Change.MATERIAL
+        return Change.objects.get(model=model, object_id=obj.pk)
+
+    def test_single_entry_per_object(self):
+        """Test saving again replaces the entry with a newer one."""
+        first = self.change(self.kurs)
+
+        self.kurs.save()
+
+        latest = self.change(self.kurs)
+        self.assertGreater(latest.id, first.id)
+        self.assertFalse(latest.deleted)
+        self.assertEqual(latest.user, self.user)
+
+    def test_tombstone_on_delete(self):
+        """Test deleting an object leaves a tombstone."""
+        kurs_id = self.kurs.id
+
+        self.kurs.delete()
+
+        change = Change.objects.get(model=Change.KURS, object_id=kurs_id)
+        self.assertTrue(change.deleted)
+
+    def test_materials_relation_updates_kurs(self):
+        """Test changing the materials of a kurs logs the kurs."""
+        before = self.change(self.kurs).id
+
+        self.material.kurs_set.add(self.kurs)
+
+        self.assertGreater(self.change(self.kurs).id, before)
+
+    def test_material_change_updates_kurses(self):
+        """Test renaming or deleting a material logs its kurses."""
+        self.kurs.materials.add(self.material)
+        before = self.change(self.kurs).id
+
+        self.material.name = 'Welcome'
+        self.material.save()
+        renamed = self.change(self.kurs).id
+        self.material.delete()
+
+        self.assertGreater(renamed, before)
+        self.assertGreater(self.change(self.kurs).id, renamed)
+
+    def test_deleting_user_clears_log(self):
+        """Test the change log of a deleted user is removed."""
+        self.user.delete()
+
+        self.assertFalse(Change.objects.exists())
@@ -0,0 +1,31 @@
+"""
+Tests for the project system checks.
+"""
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from course.checks import check_idempotency_cache
+
+
+LOCMEM_CACHES = dict(settings.CACHES, idempotency={
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+})
+
+
+class IdempotencyCacheCheckTests(SimpleTestCase):
+    """Test checking the idempotency cache is shared."""
+
+    def test_shared_cache(self):
+        """Test the default database cache passes."""
+        with override_settings(DEBUG=False):
+            self.assertEqual(check_idempotency_cache(None), [])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_process_local_cache(self):
+        """Test a local memory cache fails unless debugging."""
+        with override_settings(DEBUG=False):
+            errors = check_idempotency_cache(None)
+        self.assertEqual([e.id for e in errors], ['course.E001'])
+
+        with override_settings(DEBUG=True):
+            self.assertEqual(check_idempotency_cache(None), [])
@@ -0,0 +1,121 @@
+"""
+Tests for batched deletes and orphan collection.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from course.cleanup import delete_in_batches, orphan_materials
+from course.models import CatalogEntry, Change, Kurs, Material, Progress
+
+
+class CleanupTests(TestCase):
+    """Test deleting data in batches."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def create_kurs(self, **params):
+        return Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title='Kurs',
+            price=Decimal('5.00'),
+            **params,
+        )
+
+    def age(self, material, seconds=7200):
+        """Make a material look unchanged for a while."""
+        Material.objects.filter(pk=material.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=seconds),
+        )
+
+    def test_delete_in_batches(self):
+        """Test all rows are deleted across several batches."""
+        for _ in range(5):
+            self.create_kurs()
+
+        deleted = delete_in_batches(Kurs.objects.all(), batch_size=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertFalse(Kurs.objects.exists())
+
+    def test_relinked_orphan_kept(self):
+        """Test an orphan linked again before its batch is deleted is kept."""
+        orphan = Material.objects.create(user=self.user, name='Orphan')
+        self.age(orphan)
+        kurs = self.create_kurs()
+        relinked = []
+
+        def relink(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            if not relinked and sql.startswith('SELECT'):
+                relinked.append(sql)
+                kurs.materials.add(orphan)
+            return result
+
+        with connection.execute_wrapper(relink):
+            deleted = delete_in_batches(orphan_materials())
+
+        self.assertEqual(deleted, 0)
+        self.assertTrue(Material.objects.filter(pk=orphan.pk).exists())
+
+    def test_orphan_materials(self):
+        """Test only old materials without a kurs are orphans."""
+        used = Material.objects.create(user=self.user, name='Used')
+        self.create_kurs().materials.add(used)
+        orphan = Material.objects.create(user=self.user, name='Orphan')
+        recent = Material.objects.create(user=self.user, name='Recent')
+        self.age(used)
+        self.age(orphan)
+
+        self.assertEqual(list(orphan_materials()), [orphan])
+        self.assertNotIn(recent, orphan_materials())
+
+    def test_collect_orphans_command(self):
+        """Test the command deletes orphaned materials."""
+        orphan = Material.objects.create(user=self.user, name='Orphan')
+        self.age(orphan)
+        out = StringIO()
+
+        call_command('collect_orphans', batch_size=1, stdout=out)
+
+        self.assertIn('Deleted 1 orphaned materials.', out.getvalue())
+        self.assertFalse(Material.objects.exists())
+
+    def test_delete_user_command(self):
+        """Test deleting a user and their catalog in batches."""
+        material = Material.objects.create(user=self.user, name='Intro')
+        for _ in range(3):
+            self.create_kurs().materials.add(material)
+        Progress.objects.create(
+            user=self.user,
+            material=material,
+            updated_at=timezone.now(),
+        )
+
+        call_command(
+            'delete_user', 'User@Example.com', batch_size=2, stdout=StringIO(),
+        )
+
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(Kurs.objects.exists())
+        self.assertFalse(Material.objects.exists())
+        self.assertFalse(CatalogEntry.objects.exists())
+        self.assertFalse(Change.objects.exists())
+        self.assertFalse(Progress.objects.exists())
+
+    def test_delete_unknown_user(self):
+        """Test deleting an unknown user raises an error."""
+        with self.assertRaises(CommandError):
+            call_command('delete_user', 'missing@example.com')
@@ -0,0 +1,100 @@
+"""
+Tests for cloning kurses.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from course.cloning import clone_kurses
+from course.models import CatalogEntry, Change, Kurs, KursSimilarity, Material
+
+
+class CloningTests(TestCase):
+    """Test copying kurses with their materials."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def create_kurs(self, title='Kurs', materials=()):
+        kurs = Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title=title,
+            description='Description',
+            price=Decimal('9.99'),
+        )
+        kurs.materials.add(*materials)
+        return kurs
+
+    def test_clone_copies_kurs_and_links(self):
+        """Test clones link the materials of their source."""
+        intro = Material.objects.create(
+            user=self.user, name='Intro', duration=60,
+        )
+        outro = Material.objects.create(
+            user=self.user, name='Outro', duration=30,
+        )
+        kurs = self.create_kurs(materials=[intro, outro])
+
+        clones = clone_kurses(Kurs.objects.filter(pk=kurs.pk))
+
+        clone = Kurs.objects.get(pk=next(iter(clones)))
+        self.assertEqual(clones, {clone.pk: kurs.pk})
+        self.assertEqual(clone.cloned_from, kurs)
+        self.assertEqual(clone.user, self.user)
+        self.assertEqual(clone.title, kurs.title)
+        self.assertEqual(clone.price, Decimal('9.99'))
+        self.assertEqual(clone.material_count, 2)
+        self.assertEqual(clone.video_duration, 90)
+        self.assertEqual(set(clone.materials.all()), {intro, outro})
+        self.assertEqual(Material.objects.count(), 2)
+
+    def test_clone_in_batches_with_title(self):
+        """Test every kurs is cloned once across batches."""
+        material = Material.objects.create(user=self.user, name='Shared')
+        kurses = [self.create_kurs(materials=[material]) for _ in range(5)]
+
+        clones = clone_kurses(
+            Kurs.objects.filter(pk__in=[k.pk for k in kurses]),
+            title='Next term',
+            batch_size=2,
+        )
+
+        self.assertEqual(sorted(clones.values()), [k.pk for k in kurses])
+        copies = Kurs.objects.filter(pk__in=clones)
+        self.assertEqual({k.title for k in copies}, {'Next term'})
+        self.assertEqual(
+            Kurs.materials.through.objects.filter(kurs_id__in=clones).count(),
+            5,
+        )
+
+    def test_clone_refreshes_read_models(self):
+        """Test clones get catalog entries, changes and similarities."""
+        material = Material.objects.create(user=self.user, name='Shared')
+        kurs = self.create_kurs(materials=[material])
+        Change.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clones = clone_kurses(Kurs.objects.filter(pk=kurs.pk))
+            self.assertFalse(KursSimilarity.objects.exists())
+
+        clone_id = next(iter(clones))
+        entry = CatalogEntry.objects.get(kurs_id=clone_id)
+        self.assertEqual(entry.material_count, 1)
+        self.assertEqual(entry.materials[0]['name'], 'Shared')
+        self.assertEqual(
+            list(Change.objects.values_list('object_id', flat=True)),
+            [clone_id],
+        )
+        similarity = KursSimilarity.objects.get(kurs_id=clone_id)
+        self.assertEqual(similarity.related_id, kurs.pk)
+        self.assertEqual(similarity.score, 1.0)
+
+    def test_clone_empty_queryset(self):
+        """Test cloning nothing writes nothing."""
+        self.assertEqual(clone_kurses(Kurs.objects.none()), {})
+        self.assertFalse(Kurs.objects.exists())
@@ -1,34 +1,144 @@
 """
 Test custom Django management commands.
 """
+from io import StringIO
 from unittest.mock import patch
 
-from psycopg2 import OperationalError as Psycopg2OpError
-
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
-from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from course.management.commands.profile_startup import parse_importtime
 
 
-@patch('course.management.commands.wait_for_db.Command.check')
+@patch('course.management.commands.wait_for_db.database_available')
 class CommandTests(SimpleTestCase):
     """Test commands."""
 
-    def test_wait_for_db_ready(self, patched_check):
+    def test_wait_for_db_ready(self, patched_available):
         """Test waiting for database if database ready."""
-        patched_check.return_value = True
+        patched_available.return_value = True
 
-        call_command('wait_for_db')
+        call_command('wait_for_db', stdout=StringIO())
 
-        patched_check.assert_called_once_with(databases=['default'])
+        patched_available.assert_called_once_with('default')
 
     @patch('time.sleep')
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
-        """Test waiting for database when getting OperationalError."""
-        patched_check.side_effect = [Psycopg2OpError] * 2 + \
-            [OperationalError] * 3 + [True]
+    def test_wait_for_db_delay(self, patched_sleep, patched_available):
+        """Test waiting for database backs off exponentially."""
+        patched_available.side_effect = [False] * 6 + [True]
+
+        call_command('wait_for_db', stdout=StringIO())
+
+        self.assertEqual(patched_available.call_count, 7)
+        self.assertEqual(
+            [c.args[0] for c in patched_sleep.call_args_list],
+            [0.1, 0.2, 0.4, 0.8, 1.6, 2],
+        )
+
+    @patch('time.sleep')
+    def test_wait_for_db_timeout(self, patched_sleep, patched_available):
+        """Test an error is raised when the database stays unavailable."""
+        patched_available.return_value = False
+
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=0, stdout=StringIO())
+
+        patched_sleep.assert_not_called()
+
+
+@patch('course.management.commands.boot.pending_migrations')
+@patch('course.management.commands.wait_for_db.database_available')
+class BootCommandTests(SimpleTestCase):
+    """Test the boot command."""
+
+    @patch('course.management.commands.boot.call_command')
+    def test_boot_migrates_pending(self, patched_call, patched_available,
+                                   patched_pending):
+        """Test pending migrations are applied."""
+        patched_pending.return_value = [('migration', False)]
+
+        call_command('boot', stdout=StringIO())
+
+        self.assertEqual(
+            [c.args[0] for c in patched_call.call_args_list],
+            ['wait_for_db', 'migrate', 'createcachetable', 'build_schema'],
+        )
+
+    @patch('course.management.commands.boot.call_command')
+    def test_boot_skips_migrate(self, patched_call, patched_available,
+                                patched_pending):
+        """Test migrate is skipped when the database is up to date."""
+        patched_pending.return_value = []
+
+        call_command('boot', stdout=StringIO())
+
+        self.assertEqual(
+            [c.args[0] for c in patched_call.call_args_list],
+            ['wait_for_db', 'createcachetable', 'build_schema'],
+        )
+
+    @override_settings(ENABLE_API_DOCS=False)
+    @patch('course.management.commands.boot.call_command')
+    def test_boot_without_docs(self, patched_call, patched_available,
+                               patched_pending):
+        """Test the schema is not built when API docs are disabled."""
+        patched_pending.return_value = []
+
+        call_command('boot', stdout=StringIO())
+
+        self.assertEqual(
+            [c.args[0] for c in patched_call.call_args_list],
+            ['wait_for_db', 'createcachetable'],
+        )
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+    """Test the benchmark command."""
+
+    def test_benchmark_throttle(self):
+        """Test running the throttle benchmark."""
+        out = StringIO()
+
+        call_command('benchmark', 'throttle', iterations=10, stdout=out)
+
+        self.assertIn('throttle overhead', out.getvalue())
+
+    def test_unknown_benchmark_error(self):
+        """Test an unknown benchmark name raises an error."""
+        with self.assertRaises(CommandError):
+            call_command('benchmark', 'missing', iterations=1)
+
+
+class ProgressBenchmarkTests(TestCase):
+    """Test the progress benchmark, which writes to the database."""
+
+    def test_benchmark_progress(self):
+        """Test running the progress benchmark."""
+        out = StringIO()
+
+        call_command('benchmark', 'progress', iterations=20, stdout=out)
+
+        self.assertIn('buffered upserts', out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class ProfileStartupTests(SimpleTestCase):
+    """Test the startup profiling command."""
+
+    def test_parse_importtime(self):
+        """Test parsing the interpreter import time report."""
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     json.decoder\n'
+            'import time:        80 |        200 |   json\n'
+            'unrelated line\n'
+        )
 
-        call_command('wait_for_db')
+        rows = parse_importtime(output)
 
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
+        self.assertEqual(rows, [
+            ('json.decoder', 120, 120),
+            ('json', 80, 200),
+        ])
@@ -0,0 +1,126 @@
+"""
+Tests for the adaptive concurrency limit.
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from course import concurrency
+from course.concurrency import ConcurrencyLimiter
+
+
+class ConcurrencyLimiterTests(SimpleTestCase):
+    """Test adapting the concurrency limit."""
+
+    def test_limit_and_priority_reserve(self):
+        """Test normal requests leave the reserve to priority requests."""
+        limiter = ConcurrencyLimiter(initial=4)
+
+        self.assertEqual(
+            [limiter.acquire() for _ in range(4)],
+            [True, True, True, False],
+        )
+        self.assertTrue(limiter.acquire(priority=True))
+        self.assertFalse(limiter.acquire(priority=True))
+        limiter.release(0.01)
+        limiter.release(0.01)
+        self.assertTrue(limiter.acquire())
+
+    def saturate(self, limiter, latency, count):
+        """Finish count requests of latency while the limit is in use."""
+        for _ in range(count):
+            limiter.update(latency, int(limiter.limit))
+
+    def test_limit_grows_while_latency_holds(self):
+        """Test the limit grows while requests stay fast."""
+        limiter = ConcurrencyLimiter(initial=10, max_limit=50)
+
+        self.saturate(limiter, 0.01, 200)
+
+        self.assertEqual(limiter.limit, 50)
+
+    def test_limit_shrinks_when_latency_rises(self):
+        """Test the limit shrinks when requests queue up."""
+        limiter = ConcurrencyLimiter(initial=40, min_limit=4)
+        self.saturate(limiter, 0.01, 10)
+
+        self.saturate(limiter, 0.1, 200)
+
+        self.assertLess(limiter.limit, 8)
+
+    def test_idle_worker_does_not_grow(self):
+        """Test fast requests on a mostly idle worker keep the limit."""
+        limiter = ConcurrencyLimiter(initial=20)
+
+        for _ in range(100):
+            limiter.update(0.01, 1)
+
+        self.assertEqual(limiter.limit, 20)
+
+    def test_no_load_latency_window(self):
+        """Test the no load latency follows a lasting change."""
+        limiter = ConcurrencyLimiter(window=10)
+
+        for _ in range(10):
+            limiter.update(0.01, 0)
+        for _ in range(20):
+            limiter.update(0.05, 0)
+
+        self.assertEqual(limiter.no_load_latency, 0.05)
+
+
+class ConcurrencyLimitMiddlewareTests(TestCase):
+    """Test shedding API requests beyond the limit."""
+
+    def setUp(self):
+        self.limiter = ConcurrencyLimiter(initial=4)
+        patcher = mock.patch.object(concurrency, 'limiter', self.limiter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_request_within_limit(self):
+        """Test requests within the limit are served and measured."""
+        res = self.client.get(reverse('kurs:kurs-list'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.limiter.in_flight, 0)
+        self.assertIsNotNone(self.limiter.short_latency)
+
+    def test_shed_beyond_limit(self):
+        """Test requests beyond the limit get a 503 with Retry-After."""
+        self.limiter.in_flight = 3
+
+        res = self.client.get(reverse('kurs:kurs-list'))
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res['Retry-After'], '1')
+        self.assertEqual(self.limiter.in_flight, 3)
+
+    def test_token_request_uses_reserve(self):
+        """Test getting a token may use the reserved share of the limit."""
+        self.limiter.in_flight = 3
+
+        res = self.client.post(reverse('user:token'), {
+            'email': 'user@example.com',
+            'password': 'testpass123',
+        })
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_other_paths_not_limited(self):
+        """Test requests outside the API are not counted."""
+        self.limiter.in_flight = 4
+
+        res = self.client.get(reverse('health'))
+
+        self.assertEqual(res.status_code, 200)
@@ -0,0 +1,68 @@
+"""
+Tests for the health checks and endpoints.
+"""
+from unittest.mock import patch
+
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from course import health
+
+
+HEALTH_URL = reverse('health')
+READY_URL = reverse('ready')
+
+
+class HealthCheckTests(TestCase):
+    """Test the database health checks."""
+
+    def test_database_available(self):
+        """Test the database is reported available."""
+        self.assertTrue(health.database_available())
+
+    @patch('course.health.connections')
+    def test_database_unavailable(self, patched_connections):
+        """Test connection errors report the database unavailable."""
+        cursor = patched_connections.__getitem__.return_value.cursor
+        cursor.side_effect = OperationalError
+
+        self.assertFalse(health.database_available())
+
+    def test_no_pending_migrations(self):
+        """Test the test database has all migrations applied."""
+        self.assertEqual(health.pending_migrations(), [])
+
+
+class HealthEndpointTests(SimpleTestCase):
+    """Test the health endpoints."""
+
+    def test_health(self):
+        """Test the liveness endpoint."""
+        res = self.client.get(HEALTH_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+    @patch('course.views.migrations_applied', return_value=True)
+    @patch('course.views.database_available', return_value=True)
+    def test_ready(self, patched_available, patched_migrated):
+        """Test the readiness endpoint when the database is ready."""
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+    @patch('course.views.database_available', return_value=False)
+    def test_not_ready_without_database(self, patched_available):
+        """Test the readiness endpoint when the database is down."""
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 503)
+
+    @patch('course.views.migrations_applied', return_value=False)
+    @patch('course.views.database_available', return_value=True)
+    def test_not_ready_with_pending_migrations(self, patched_available,
+                                               patched_migrated):
+        """Test the readiness endpoint when migrations are pending."""
+        res = self.client.get(READY_URL)
+
+        self.assertEqual(res.status_code, 503)
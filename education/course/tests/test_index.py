@@ -0,0 +1,112 @@
+"""
+Tests for the streamed index page.
+"""
+import importlib.util
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from course.models import Kurs, Material
+
+
+INDEX_URL = reverse('index')
+
+
+class IndexTests(TestCase):
+    """Test the index page streams the catalog."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def create_kurs(self, title, **params):
+        return Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title=title,
+            price=Decimal('5.00'),
+            **params,
+        )
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_index_is_streamed(self):
+        """Test the index page is a streaming HTML response."""
+        res = self.client.get(INDEX_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'text/html; charset=utf-8')
+        content = self.content(res)
+        self.assertTrue(content.lstrip().startswith('<!DOCTYPE html>'))
+        self.assertTrue(content.rstrip().endswith('</html>'))
+        self.assertNotIn('<!-- kurses -->', content)
+
+    @override_settings(INDEX_CHUNK_SIZE=2)
+    def test_kurses_listed_in_order_across_chunks(self):
+        """Test every kurs is listed once, in order, over several chunks."""
+        titles = [f'Kurs {i}' for i in range(5)]
+        for title in titles:
+            self.create_kurs(title)
+
+        with self.assertNumQueries(4):
+            content = self.content(self.client.get(INDEX_URL))
+
+        positions = [content.index(f'<h2>{title}</h2>') for title in titles]
+        self.assertEqual(positions, sorted(positions))
+        for title in titles:
+            self.assertEqual(content.count(f'<h2>{title}</h2>'), 1)
+
+    def test_only_materials_with_video_are_embedded(self):
+        """Test materials without a video are left out of the page."""
+        kurs = self.create_kurs('Kurs', description='<b>About</b>')
+        with_video = Material.objects.create(
+            user=self.user,
+            name='Video',
+            video=SimpleUploadedFile('intro.mp4', b'video'),
+        )
+        kurs.materials.add(
+            with_video,
+            Material.objects.create(user=self.user, name='Text'),
+        )
+
+        content = self.content(self.client.get(INDEX_URL))
+
+        self.assertEqual(content.count('<video'), 1)
+        self.assertIn(f'src="{with_video.video.url}"', content)
+        self.assertIn('&lt;b&gt;About&lt;/b&gt;', content)
+
+    def test_index_rendered_with_jinja2(self):
+        """Test the Jinja2 engine renders the page like the Django one."""
+        if importlib.util.find_spec('jinja2') is None:
+            self.skipTest('Jinja2 is not installed')
+        kurs = self.create_kurs('Kurs <1>')
+        kurs.materials.add(
+            Material.objects.create(
+                user=self.user,
+                name='Video',
+                video=SimpleUploadedFile('intro.mp4', b'video'),
+            ),
+            Material.objects.create(user=self.user, name='Text'),
+        )
+        django_content = self.content(self.client.get(INDEX_URL))
+
+        with override_settings(
+            PUBLIC_TEMPLATE_ENGINE='jinja2',
+            TEMPLATES=settings.TEMPLATES + [{
+                'BACKEND': 'django.template.backends.jinja2.Jinja2',
+                'DIRS': [settings.BASE_DIR / 'course' / 'templates'],
+            }],
+        ):
+            content = self.content(self.client.get(INDEX_URL))
+
+        self.assertIn('<h2>Kurs &lt;1&gt;</h2>', content)
+        self.assertEqual(content.split(), django_content.split())
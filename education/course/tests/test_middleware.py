@@ -0,0 +1,206 @@
+"""
+Tests for the project middleware.
+"""
+import gzip
+
+import brotli
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from course.middleware import (
+    BrowserMiddleware,
+    CompressionMiddleware,
+    accepted_encoding,
+    precompress,
+)
+
+
+PAYLOAD = b'{"title": "Sample kurs title"}' * 100
+
+
+def json_response(request):
+    return HttpResponse(PAYLOAD, content_type='application/json')
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test compressing responses."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def request(self, encoding):
+        return self.factory.get('/', HTTP_ACCEPT_ENCODING=encoding)
+
+    def test_accepted_encoding(self):
+        """Test the preferred encoding allowed by the client is chosen."""
+        preferred = ['br', 'gzip']
+
+        self.assertEqual(accepted_encoding('gzip, br', preferred), 'br')
+        self.assertEqual(accepted_encoding('gzip, br;q=0', preferred), 'gzip')
+        self.assertEqual(accepted_encoding('*', preferred), 'br')
+        self.assertIsNone(accepted_encoding('identity', preferred))
+        self.assertIsNone(accepted_encoding('', preferred))
+
+    def test_compress_brotli(self):
+        """Test JSON responses are compressed with brotli."""
+        res = CompressionMiddleware(json_response)(self.request('gzip, br'))
+
+        self.assertEqual(res['Content-Encoding'], 'br')
+        self.assertEqual(res['Vary'], 'Accept-Encoding')
+        self.assertEqual(res['Content-Length'], str(len(res.content)))
+        self.assertEqual(brotli.decompress(res.content), PAYLOAD)
+
+    def test_compress_gzip(self):
+        """Test gzip is used when brotli is not accepted."""
+        res = CompressionMiddleware(json_response)(self.request('gzip'))
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(res.content), PAYLOAD)
+
+    @override_settings(COMPRESSION_MIN_SIZE=len(PAYLOAD) + 1)
+    def test_small_response_not_compressed(self):
+        """Test bodies below the size threshold are sent as is."""
+        res = CompressionMiddleware(json_response)(self.request('gzip'))
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertEqual(res.content, PAYLOAD)
+
+    def test_content_type_not_compressed(self):
+        """Test content types outside the list, like HTML, are sent as is."""
+        for content_type in ['image/png', 'text/html; charset=utf-8']:
+            def get_response(request):
+                return HttpResponse(PAYLOAD, content_type=content_type)
+
+            res = CompressionMiddleware(get_response)(self.request('gzip'))
+
+            self.assertFalse(res.has_header('Content-Encoding'))
+
+    def test_streaming_response(self):
+        """Test streaming responses are compressed chunk by chunk."""
+        def get_response(request):
+            return StreamingHttpResponse(
+                iter([PAYLOAD, PAYLOAD]),
+                content_type='application/json',
+            )
+
+        res = CompressionMiddleware(get_response)(self.request('gzip'))
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        content = b''.join(res.streaming_content)
+        self.assertEqual(gzip.decompress(content), PAYLOAD * 2)
+
+    def test_precompressed_response(self):
+        """Test precompressed bodies are sent without compressing again."""
+        precompressed = {'gzip': gzip.compress(PAYLOAD)}
+
+        def get_response(request):
+            response = json_response(request)
+            response.precompressed = precompressed
+            return response
+
+        res = CompressionMiddleware(get_response)(self.request('gzip'))
+
+        self.assertEqual(res.content, precompressed['gzip'])
+
+    def test_etag_cache(self):
+        """Test bodies with a strong ETag are compressed once."""
+        def get_response(request):
+            response = json_response(request)
+            response['ETag'] = '"abc"'
+            return response
+
+        middleware = CompressionMiddleware(get_response)
+        res = middleware(self.request('gzip'))
+        middleware.cache.items[('"abc"', 'gzip')] = b'cached'
+        cached = middleware(self.request('gzip'))
+
+        self.assertEqual(res['ETag'], 'W/"abc"')
+        self.assertEqual(cached.content, b'cached')
+
+    def test_precompress(self):
+        """Test precompress returns bodies for each encoding."""
+        res = precompress(PAYLOAD, ['gzip', 'br'])
+
+        self.assertEqual(gzip.decompress(res['gzip']), PAYLOAD)
+        self.assertEqual(brotli.decompress(res['br']), PAYLOAD)
+
+
+class BrowserMiddlewareTests(TestCase):
+    """Test running the session and CSRF middleware outside the API."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.token = Token.objects.create(user=self.user)
+
+    def test_api_request_skips_browser_middleware(self):
+        """Test API requests get no session, user or messages."""
+        seen = []
+
+        def view(request):
+            seen.append(request)
+            return HttpResponse()
+
+        middleware = BrowserMiddleware(view)
+        request = RequestFactory().get('/api/kurs/kurses/')
+        self.assertIsNone(middleware.process_view(request, view, (), {}))
+        middleware(request)
+
+        for attribute in ('session', 'user', '_messages'):
+            self.assertFalse(hasattr(seen[0], attribute))
+
+    def test_other_request_runs_browser_middleware(self):
+        """Test other requests get a session, a user and messages."""
+        seen = []
+
+        def view(request):
+            seen.append(request)
+            return HttpResponse()
+
+        middleware = BrowserMiddleware(view)
+        middleware(RequestFactory().get('/index'))
+
+        for attribute in ('session', 'user', '_messages'):
+            self.assertTrue(hasattr(seen[0], attribute))
+
+    def test_csrf_enforced_outside_api(self):
+        """Test CSRF is still checked for the admin and not for the API."""
+        client = Client(enforce_csrf_checks=True)
+
+        admin_res = client.post(reverse('admin:login'), {
+            'username': 'user@example.com',
+            'password': 'testpass123',
+        })
+        api_res = client.post(
+            reverse('kurs:kurs-list'),
+            {'author': 'Author', 'title': 'Kurs', 'price': '5.00'},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}',
+        )
+
+        self.assertEqual(admin_res.status_code, 403)
+        self.assertEqual(api_res.status_code, 201)
+        self.assertNotIn('sessionid', api_res.cookies)
+
+    def test_browsable_api(self):
+        """Test the browsable API renders without the session middleware."""
+        res = self.client.get(
+            reverse('kurs:kurs-list'),
+            HTTP_ACCEPT='text/html',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}',
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, 'Kurs List')
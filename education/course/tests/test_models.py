@@ -4,6 +4,7 @@ Tests for models.
 from decimal import Decimal
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from course import models
 from django.core.files.uploadedfile import SimpleUploadedFile
 
@@ -40,6 +41,25 @@ class ModelTests(TestCase):
             user = get_user_model().objects.create_user(email, 'sample123')
             self.assertEqual(user.email, expected)
 
+    def test_email_lookup_ignores_case(self):
+        """Test users are found by their email in any case."""
+        user = create_user(email='Test@Example.com')
+
+        self.assertEqual(user.email_canonical, 'test@example.com')
+        with self.assertNumQueries(1):
+            found = get_user_model().objects.get_by_natural_key(
+                'TEST@example.COM',
+            )
+        self.assertEqual(found, user)
+
+    def test_email_unique_ignores_case(self):
+        """Test emails differing only in case are rejected."""
+        create_user(email='test@example.com')
+        user = get_user_model()(email='TEST@example.com')
+
+        with self.assertRaises(ValidationError):
+            user.validate_unique()
+
     def test_new_user_without_email_raises_error(self):
         """Test that creating a user without an email raises a ValueError."""
         with self.assertRaises(ValueError):
@@ -0,0 +1,131 @@
+"""
+Tests for profiling API requests.
+"""
+import json
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from course.profiling import StackSampler, make_token
+
+
+KURSES_URL = reverse('kurs:kurs-list')
+
+
+def busy_leaf(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def busy_root(seconds):
+    busy_leaf(seconds)
+
+
+class StackSamplerTests(TestCase):
+    """Test sampling the stack of a thread."""
+
+    def test_samples_are_folded_from_root(self):
+        """Test stacks start at the root code and end at the leaf."""
+        sampler = StackSampler(
+            threading.get_ident(), busy_root.__code__, 0.001,
+        )
+        sampler.start()
+        try:
+            busy_root(0.05)
+        finally:
+            sampler.stop()
+
+        self.assertIn(
+            f'{__name__}:busy_leaf',
+            [stack.split(';')[-1] for stack in sampler.stacks],
+        )
+        for stack in sampler.stacks:
+            self.assertFalse(stack.startswith(f'{__name__}:busy_root'))
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """Test the profiling middleware."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings = override_settings(
+            PROFILING_DIR=self.directory.name,
+            PROFILING_INTERVAL=0.001,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def profiles(self):
+        return sorted(p.name for p in Path(self.directory.name).iterdir())
+
+    def test_unprofiled_request(self):
+        """Test requests without a token or sampling are not profiled."""
+        res = self.client.get(KURSES_URL)
+
+        self.assertNotIn('X-Profile-Id', res)
+        self.assertEqual(self.profiles(), [])
+
+    def test_profile_with_token(self):
+        """Test a signed X-Profile header writes a profile."""
+        res = self.client.get(KURSES_URL, HTTP_X_PROFILE=make_token())
+
+        name = res['X-Profile-Id']
+        self.assertEqual(self.profiles(), [f'{name}.folded', f'{name}.json'])
+        summary = json.loads(
+            (Path(self.directory.name) / f'{name}.json').read_text(),
+        )
+        self.assertEqual(summary['method'], 'GET')
+        self.assertEqual(summary['path'], KURSES_URL)
+        self.assertEqual(summary['status'], 200)
+        self.assertGreater(summary['queries']['count'], 0)
+        self.assertEqual(
+            len(summary['queries']['slowest']),
+            min(summary['queries']['count'], 5),
+        )
+
+    def test_invalid_token(self):
+        """Test unsigned X-Profile headers are ignored."""
+        res = self.client.get(KURSES_URL, HTTP_X_PROFILE='profile:forged')
+
+        self.assertNotIn('X-Profile-Id', res)
+        self.assertEqual(self.profiles(), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_request(self):
+        """Test sampled API requests are profiled without a header."""
+        res = self.client.get(KURSES_URL)
+        self.client.get(reverse('health'))
+
+        self.assertNotIn('X-Profile-Id', res)
+        profiles = self.profiles()
+        self.assertEqual(len(profiles), 2)
+        self.assertTrue(profiles[0].endswith('-get-api-kurs-kurses.folded'))
+
+    def test_profile_token_command(self):
+        """Test the command prints a valid token."""
+        out = StringIO()
+
+        call_command('profile_token', stdout=out, stderr=StringIO())
+
+        res = self.client.get(
+            KURSES_URL,
+            HTTP_X_PROFILE=out.getvalue().strip(),
+        )
+        self.assertIn('X-Profile-Id', res)
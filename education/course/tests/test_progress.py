@@ -0,0 +1,117 @@
+"""
+Tests for buffered playback progress.
+"""
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from course.models import Kurs, Material, Progress
+from course.progress import ProgressBuffer, kurs_completion
+
+
+@override_settings(PROGRESS_FLUSH_SIZE=100, PROGRESS_FLUSH_INTERVAL=60)
+class ProgressBufferTests(TestCase):
+    """Test buffering and flushing heartbeats."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.material = Material.objects.create(
+            user=self.user,
+            name='Intro',
+            duration=100,
+        )
+        self.buffer = ProgressBuffer()
+        self.addCleanup(self.buffer.take)
+
+    def test_heartbeats_coalesced(self):
+        """Test heartbeats of a material are written as one row."""
+        for position in [10, 30, 20]:
+            self.buffer.add(self.user.id, self.material.id, position)
+
+        with self.assertNumQueries(4):
+            written = self.buffer.flush()
+
+        self.assertEqual(written, 1)
+        progress = Progress.objects.get()
+        self.assertEqual(progress.position, 30)
+        self.assertFalse(progress.completed)
+
+    def test_position_never_moves_back(self):
+        """Test a later flush keeps the furthest position."""
+        self.buffer.add(self.user.id, self.material.id, 50)
+        self.buffer.flush()
+        self.buffer.add(self.user.id, self.material.id, 5)
+        self.buffer.flush()
+
+        self.assertEqual(Progress.objects.get().position, 50)
+
+    def test_completed_near_the_end(self):
+        """Test watching most of the video completes the material."""
+        self.buffer.add(self.user.id, self.material.id, 95)
+        self.buffer.flush()
+
+        self.assertTrue(Progress.objects.get().completed)
+
+    def test_deleted_material_ignored(self):
+        """Test heartbeats of materials deleted meanwhile are dropped."""
+        other_user = get_user_model().objects.create_user(
+            'other@example.com',
+            'testpass123',
+        )
+        self.buffer.add(other_user.id, self.material.id, 10)
+        self.buffer.add(self.user.id, 0, 10)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(Progress.objects.get().user, other_user)
+
+    @override_settings(PROGRESS_FLUSH_INTERVAL=0.01)
+    def test_flush_on_timer(self):
+        """Test buffered heartbeats are flushed without further heartbeats."""
+        flushed = threading.Event()
+
+        with mock.patch.object(self.buffer, 'flush', side_effect=flushed.set):
+            self.buffer.add(self.user.id, self.material.id, 10)
+
+            self.assertTrue(flushed.wait(5))
+
+    @override_settings(PROGRESS_FLUSH_SIZE=2)
+    def test_flush_when_full(self):
+        """Test the buffer is flushed once enough pairs are pending."""
+        other = Material.objects.create(user=self.user, name='Other')
+
+        self.buffer.add(self.user.id, self.material.id, 10)
+        self.assertFalse(Progress.objects.exists())
+        self.buffer.add(self.user.id, other.id, 10)
+
+        self.assertEqual(Progress.objects.count(), 2)
+        self.assertEqual(self.buffer.pending, {})
+
+    def test_kurs_completion(self):
+        """Test completion is aggregated over the kurs materials."""
+        kurs = Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title='Kurs',
+            price=Decimal('5.00'),
+        )
+        other = Material.objects.create(user=self.user, name='Other')
+        kurs.materials.add(self.material, other)
+        kurs.refresh_from_db()
+        self.buffer.add(self.user.id, self.material.id, 100)
+        self.buffer.add(self.user.id, other.id, 20, completed=False)
+        self.buffer.flush()
+
+        res = kurs_completion(self.user, kurs)
+
+        self.assertEqual(res, {
+            'material_count': 2,
+            'completed': 1,
+            'percent': 50.0,
+            'watched': 120,
+        })
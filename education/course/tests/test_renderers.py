@@ -0,0 +1,55 @@
+"""
+Tests for the MessagePack renderer and parser.
+"""
+import datetime
+from decimal import Decimal
+from io import BytesIO
+
+import msgpack
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+
+from course.parsers import MessagePackParser
+from course.renderers import MessagePackRenderer
+
+
+class MessagePackTests(SimpleTestCase):
+    """Test encoding and decoding MessagePack."""
+
+    def test_render_types(self):
+        """Test decimals and datetimes are encoded like JSON."""
+        data = {
+            'price': Decimal('5.25'),
+            'updated_at': datetime.datetime(
+                2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc,
+            ),
+            'day': datetime.date(2024, 1, 2),
+            'video': None,
+        }
+
+        res = msgpack.unpackb(MessagePackRenderer().render(data))
+
+        self.assertEqual(res, {
+            'price': '5.25',
+            'updated_at': '2024-01-02T03:04:05Z',
+            'day': '2024-01-02',
+            'video': None,
+        })
+
+    def test_render_none(self):
+        """Test empty responses render no bytes."""
+        self.assertEqual(MessagePackRenderer().render(None), b'')
+
+    def test_parse(self):
+        """Test request bodies are decoded."""
+        stream = BytesIO(msgpack.packb({'title': 'Kurs', 'materials': []}))
+
+        res = MessagePackParser().parse(stream)
+
+        self.assertEqual(res, {'title': 'Kurs', 'materials': []})
+
+    def test_parse_error(self):
+        """Test invalid bodies raise a parse error."""
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(BytesIO(b'\xc1'))
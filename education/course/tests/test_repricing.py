@@ -0,0 +1,98 @@
+"""
+Tests for repricing kurses.
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+
+from course.models import CatalogEntry, Change, Kurs
+from course.repricing import reprice_kurses
+
+
+class RepricingTests(TestCase):
+    """Test applying pricing rules to kurses."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def create_kurs(self, price, user=None):
+        return Kurs.objects.create(
+            user=user or self.user,
+            author='Author',
+            title='Kurs',
+            price=price,
+        )
+
+    def test_reprice_updates_catalog_and_change_log(self):
+        """Test repriced kurses are refreshed in the read models."""
+        kurs = self.create_kurs(Decimal('20.00'))
+        self.create_kurs(Decimal('0.00'))
+        Change.objects.all().delete()
+
+        updated = reprice_kurses(
+            Kurs.objects.all(),
+            [('discount', Decimal('25'))],
+        )
+
+        self.assertEqual(updated, 1)
+        kurs.refresh_from_db()
+        self.assertEqual(kurs.price, Decimal('15.00'))
+        entry = CatalogEntry.objects.get(kurs=kurs)
+        self.assertEqual(entry.price, Decimal('15.00'))
+        changes = Change.objects.filter(model=Change.KURS)
+        self.assertEqual([c.object_id for c in changes], [kurs.id])
+
+    @tag('postgres')
+    def test_reprice_locks_kurses(self):
+        """Test prices are read under row locks in the writing transaction."""
+        self.create_kurs(Decimal('20.00'))
+
+        with CaptureQueriesContext(connection) as queries:
+            reprice_kurses(Kurs.objects.all(), [('tax', Decimal('10'))])
+
+        statements = [query['sql'] for query in queries]
+        locking = next(
+            i for i, sql in enumerate(statements) if 'FOR UPDATE' in sql
+        )
+        updating = next(
+            i for i, sql in enumerate(statements)
+            if sql.startswith('UPDATE') and 'course_kurs' in sql
+        )
+        self.assertLess(locking, updating)
+
+    def test_reprice_command_for_user(self):
+        """Test the command only reprices kurses of the given user."""
+        other_user = get_user_model().objects.create_user(
+            'other@example.com',
+            'testpass123',
+        )
+        kurs = self.create_kurs(Decimal('10.00'))
+        other_kurs = self.create_kurs(Decimal('10.00'), user=other_user)
+        out = StringIO()
+
+        call_command(
+            'reprice',
+            '--rule', 'tax=18',
+            '--user', 'User@Example.com',
+            stdout=out,
+        )
+
+        kurs.refresh_from_db()
+        other_kurs.refresh_from_db()
+        self.assertEqual(kurs.price, Decimal('11.80'))
+        self.assertEqual(other_kurs.price, Decimal('10.00'))
+        self.assertIn('Repriced 1 kurses', out.getvalue())
+
+    def test_reprice_command_invalid_rule(self):
+        """Test the command rejects unknown rules."""
+        with self.assertRaises(CommandError):
+            call_command('reprice', '--rule', 'bonus=5')
@@ -0,0 +1,147 @@
+"""
+Tests for the prebuilt OpenAPI schema.
+"""
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from course import schema
+
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class SchemaTests(SimpleTestCase):
+    """Test building and serving the schema."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(SCHEMA_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        schema.load_schema.cache_clear()
+        self.addCleanup(schema.load_schema.cache_clear)
+
+    def test_build_schema_command(self):
+        """Test the artifacts are written once per code fingerprint."""
+        out = StringIO()
+
+        call_command('build_schema', stdout=out)
+        call_command('build_schema', stdout=out)
+
+        fingerprint = schema.code_fingerprint()
+        path = schema.artifact_path(fingerprint, 'json')
+        self.assertIn('openapi', json.loads(path.read_bytes()))
+        self.assertEqual(out.getvalue().count('Wrote'), 2)
+        self.assertIn(f'Schema {fingerprint} is up to date.', out.getvalue())
+        self.assertEqual(
+            sorted(p.name for p in path.parent.iterdir()),
+            [f'openapi-{fingerprint}.json', f'openapi-{fingerprint}.yaml'],
+        )
+
+    def test_failed_write_keeps_artifact(self):
+        """Test an interrupted write leaves the old artifact in place."""
+        path = Path(self.directory) / 'openapi-test.json'
+        schema.write_atomic(path, b'old')
+
+        with mock.patch('course.schema.os.replace', side_effect=OSError):
+            with self.assertRaises(OSError):
+                schema.write_atomic(path, b'new')
+
+        self.assertEqual(path.read_bytes(), b'old')
+        self.assertEqual(list(path.parent.iterdir()), [path])
+
+    def test_serve_schema(self):
+        """Test the schema is served with an ETag."""
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith(
+            'application/vnd.oai.openapi',
+        ))
+        self.assertIn(b'openapi:', res.content)
+        self.assertEqual(res['ETag'], schema.load_schema('yaml').etag)
+
+    def test_changes_documented(self):
+        """Test the sync endpoint has its parameters and response schema."""
+        document = json.loads(schema.render_schemas()['json'])
+
+        operation = document['paths']['/api/kurs/changes/']['get']
+        self.assertLessEqual(
+            {'since', 'limit'},
+            {parameter['name'] for parameter in operation['parameters']},
+        )
+        self.assertEqual(
+            operation['responses']['200']['content']['application/json'],
+            {'schema': {'$ref': '#/components/schemas/Changes'}},
+        )
+        self.assertEqual(
+            set(document['components']['schemas']['Changes']['properties']),
+            {'cursor', 'more', 'kurses', 'materials'},
+        )
+
+    def test_serve_json_schema(self):
+        """Test the JSON schema is selected with the format parameter."""
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('paths', res.json())
+
+    def test_schema_not_modified(self):
+        """Test a matching If-None-Match returns 304."""
+        etag = self.client.get(SCHEMA_URL)['ETag']
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH='W/' + etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b'')
+
+    def test_schema_precompressed(self):
+        """Test compressed responses use the precompressed body."""
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            res.content,
+            schema.load_schema('yaml').precompressed['gzip'],
+        )
+        self.assertEqual(
+            gzip.decompress(res.content),
+            schema.load_schema('yaml').content,
+        )
+
+
+class WithoutDocsTests(SimpleTestCase):
+    """Test workers without API docs."""
+
+    def test_spectacular_not_imported(self):
+        """Test drf-spectacular is not imported when docs are disabled."""
+        script = (
+            'import sys\n'
+            'from education.wsgi import application\n'
+            'from django.urls import get_resolver\n'
+            'get_resolver().url_patterns\n'
+            'print(any(m.startswith("drf_spectacular") '
+            'for m in sys.modules))\n'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            env=dict(os.environ, ENABLE_API_DOCS='0', DB_ENGINE='sqlite'),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        self.assertEqual(result.stdout.strip(), 'False')
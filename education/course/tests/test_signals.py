@@ -0,0 +1,76 @@
+"""
+Tests for the denormalized data signal handlers.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from course.models import Kurs, Material
+
+
+class MaterialTotalsTests(TestCase):
+    """Test kurs material counters."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.kurs = Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title='Kurs',
+            price=Decimal('5.00'),
+        )
+        self.intro = Material.objects.create(
+            user=self.user, name='Intro', duration=60,
+        )
+        self.outro = Material.objects.create(
+            user=self.user, name='Outro', duration=30,
+        )
+
+    def assertTotals(self, count, duration):
+        self.kurs.refresh_from_db()
+        self.assertEqual(self.kurs.material_count, count)
+        self.assertEqual(self.kurs.video_duration, duration)
+
+    def test_add_materials(self):
+        """Test adding materials increments the totals."""
+        self.kurs.materials.add(self.intro, self.outro)
+        self.kurs.materials.add(self.intro)
+
+        self.assertTotals(2, 90)
+
+    def test_remove_materials(self):
+        """Test removing materials decrements the totals."""
+        self.kurs.materials.add(self.intro, self.outro)
+
+        self.kurs.materials.remove(self.intro)
+        self.kurs.materials.remove(self.intro)
+
+        self.assertTotals(1, 30)
+
+    def test_clear_materials(self):
+        """Test clearing materials resets the totals."""
+        self.kurs.materials.add(self.intro, self.outro)
+
+        self.kurs.materials.clear()
+
+        self.assertTotals(0, 0)
+
+    def test_reverse_relation(self):
+        """Test changes from the material side update the totals."""
+        self.intro.kurs_set.add(self.kurs)
+        self.assertTotals(1, 60)
+
+        self.intro.kurs_set.clear()
+        self.assertTotals(0, 0)
+
+    def test_delete_material(self):
+        """Test deleting a material removes it from the totals."""
+        self.kurs.materials.add(self.intro, self.outro)
+
+        self.outro.delete()
+
+        self.assertTotals(1, 60)
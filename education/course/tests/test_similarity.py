@@ -0,0 +1,160 @@
+"""
+Tests for the related kurses index.
+"""
+import random
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from course.models import Kurs, KursSimilarity, Material
+from course.similarity import build_similarity_index, top_related
+
+
+class TopRelatedTests(SimpleTestCase):
+    """Test scoring kurses with sparse matrices."""
+
+    def test_matches_pairwise_jaccard(self):
+        """Test scores equal the Jaccard index of the material sets."""
+        rng = random.Random(0)
+        sets = {
+            kurs: set(rng.sample(range(30), rng.randint(1, 8)))
+            for kurs in range(1, 40)
+        }
+        links = np.array(
+            [(k, m) for k, materials in sets.items() for m in materials],
+        )
+        sizes = {k: len(materials) for k, materials in sets.items()}
+
+        kurs, related, scores = top_related(links, links, sizes, 5)
+
+        expected = {}
+        for k, materials in sets.items():
+            pairs = [
+                (-len(materials & other) / len(materials | other), r)
+                for r, other in sets.items()
+                if r != k and materials & other
+            ]
+            expected[k] = [(r, -s) for s, r in sorted(pairs)[:5]]
+        res = {}
+        for k, r, s in zip(kurs.tolist(), related.tolist(), scores.tolist()):
+            res.setdefault(k, []).append((r, s))
+        self.assertEqual(res.keys(), {k for k in expected if expected[k]})
+        for k, rows in res.items():
+            self.assertEqual([r for r, _ in rows], [r for r, _ in expected[k]])
+            np.testing.assert_allclose(
+                [s for _, s in rows],
+                [s for _, s in expected[k]],
+            )
+
+
+class SimilarityIndexTests(TestCase):
+    """Test building and refreshing the index."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        self.materials = [
+            Material.objects.create(user=self.user, name=f'Material {i}')
+            for i in range(4)
+        ]
+
+    def create_kurs(self, *materials):
+        kurs = Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title='Kurs',
+            price=Decimal('5.00'),
+        )
+        kurs.materials.add(*materials)
+        return kurs
+
+    def similarities(self):
+        return sorted(
+            KursSimilarity.objects.values_list('kurs', 'related', 'score'),
+        )
+
+    def test_build_command(self):
+        """Test the command stores the similarity of both kurses."""
+        a, b, c = self.materials[:3]
+        first = self.create_kurs(a, b)
+        second = self.create_kurs(b, c)
+        self.create_kurs(self.materials[3])
+        KursSimilarity.objects.all().delete()
+        out = StringIO()
+
+        call_command('build_similarity', stdout=out)
+
+        self.assertEqual(self.similarities(), [
+            (first.id, second.id, 1 / 3),
+            (second.id, first.id, 1 / 3),
+        ])
+        self.assertIn('Stored 2 similarities', out.getvalue())
+
+    def test_refresh_matches_rebuild(self):
+        """Test material changes refresh the index like a rebuild."""
+        a, b, c, d = self.materials
+        first = self.create_kurs(a, b)
+        second = self.create_kurs(b, c)
+        third = self.create_kurs(c, d)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.materials.add(c)
+            second.materials.remove(b)
+            d.kurs_set.add(first)
+        incremental = self.similarities()
+        build_similarity_index()
+
+        self.assertEqual(incremental, self.similarities())
+        self.assertIn(
+            (first.id, third.id, 2 / 4),
+            incremental,
+        )
+
+    def test_deleted_material_refreshes(self):
+        """Test deleting a shared material drops the similarity."""
+        a, b = self.materials[:2]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_kurs(a, b)
+            self.create_kurs(b)
+        self.assertEqual(len(self.similarities()), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            b.delete()
+
+        self.assertEqual(self.similarities(), [])
+
+    def test_refresh_deferred_to_commit(self):
+        """Test material changes are rescored together after the commit."""
+        a, b = self.materials[:2]
+
+        with mock.patch('course.similarity.refresh_similarity') as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                first = self.create_kurs(a)
+                second = self.create_kurs(b)
+                first.materials.add(b)
+                refresh.assert_not_called()
+
+        refresh.assert_called_once_with({first.id, second.id})
+
+    @override_settings(SIMILARITY_TOP_N=1)
+    def test_top_n(self):
+        """Test only the most similar kurses are kept."""
+        a, b, c = self.materials[:3]
+        first = self.create_kurs(a, b)
+        closest = self.create_kurs(a, b, c)
+        self.create_kurs(a, c)
+
+        build_similarity_index()
+
+        self.assertEqual(
+            list(first.similarities.values_list('related', flat=True)),
+            [closest.id],
+        )
@@ -0,0 +1,129 @@
+"""
+Tests for content addressed video storage.
+"""
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, tag
+
+from course.models import Material
+from course.storage import lock_content, video_storage
+from course.videos import collect_videos, release_video, video_references
+
+
+def upload(content, name='video.mp4'):
+    """Return an uploaded video file."""
+    return SimpleUploadedFile(name, content, content_type='video/mp4')
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Test storing material videos by content."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+
+    def create_material(self, content, name='video.mp4'):
+        return Material.objects.create(
+            user=self.user,
+            name='Material',
+            video=upload(content, name),
+        )
+
+    def test_identical_uploads_share_a_file(self):
+        """Test the same content is stored once."""
+        first = self.create_material(b'lecture', 'first.MP4')
+        second = self.create_material(b'lecture', 'second.mp4')
+
+        self.assertEqual(first.video.name, second.video.name)
+        self.assertRegex(
+            first.video.name,
+            r'^course_videos/[0-9a-f]{2}/[0-9a-f]{64}\.mp4$',
+        )
+        self.assertEqual(video_references([first.video.name]), {
+            first.video.name: 2,
+        })
+        with second.video.open() as f:
+            self.assertEqual(f.read(), b'lecture')
+
+    def test_different_uploads_stored_separately(self):
+        """Test different content gets different names."""
+        first = self.create_material(b'lecture one')
+        second = self.create_material(b'lecture two')
+
+        self.assertNotEqual(first.video.name, second.video.name)
+
+    def test_video_deleted_with_last_reference(self):
+        """Test a video is removed once no material uses it."""
+        first = self.create_material(b'shared')
+        second = self.create_material(b'shared')
+        name = first.video.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(video_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(video_storage.exists(name))
+
+    def test_collect_unreferenced_videos(self):
+        """Test garbage collection keeps only referenced videos."""
+        kept = self.create_material(b'kept').video.name
+        orphan = video_storage.save('course_videos/orphan.mp4', upload(b'x'))
+
+        self.assertNotIn(orphan, collect_videos(grace_period=3600))
+        collected = collect_videos(grace_period=-1, dry_run=True)
+        self.assertIn(orphan, collected)
+        self.assertNotIn(kept, collected)
+        self.assertTrue(video_storage.exists(orphan))
+
+        out = StringIO()
+        call_command('collect_videos', grace_period=-1, stdout=out)
+
+        self.assertIn(orphan, out.getvalue())
+        self.assertFalse(video_storage.exists(orphan))
+        self.assertTrue(video_storage.exists(kept))
+
+    def test_release_keeps_reused_video(self):
+        """Test releasing a video a new material reuses keeps the file."""
+        name = self.create_material(b'reused').video.name
+        Material.objects.filter(video=name).delete()
+        self.create_material(b'reused')
+
+        self.assertFalse(release_video(name))
+        self.assertTrue(video_storage.exists(name))
+
+    @tag('postgres')
+    def test_saving_locks_the_content(self):
+        """Test storing a video holds its lock until the transaction ends."""
+        self.create_material(b'locked')
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' "
+                "AND pid = pg_backend_pid()"
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_lock_names_stored_before_content_addressing(self):
+        """Test names that aren't digests get a lock key too."""
+        with mock.patch('course.storage.connection') as patched:
+            patched.vendor = 'postgresql'
+            for name in ['course_videos/video1_1boiBQS.mp4', 'video.mp4']:
+                lock_content(name)
+
+        keys = [
+            c.args[1][0]
+            for c in patched.cursor().__enter__().execute.call_args_list
+        ]
+        self.assertEqual(len(set(keys)), 2)
+        for key in keys:
+            self.assertTrue(-2 ** 63 <= key < 2 ** 63)
@@ -0,0 +1,73 @@
+"""
+Tests for the API throttles.
+"""
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase
+
+from rest_framework.request import Request
+
+from course import throttling
+
+
+class IPThrottle(throttling.IPTokenBucketThrottle):
+    rate = '3/min'
+
+
+class UserThrottle(throttling.UserTokenBucketThrottle):
+    rate = '1/min'
+
+
+class TokenBucketThrottleTests(SimpleTestCase):
+    """Test the token bucket throttles."""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.request = Request(RequestFactory().get('/api/kurs/kurses/'))
+
+    def allow(self, now):
+        """Run the throttle at the given time."""
+        throttle = IPThrottle()
+        throttle.timer = lambda: now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_burst_allowed_up_to_capacity(self):
+        """Test requests are allowed until the bucket is empty."""
+        results = [self.allow(1000)[0] for _ in range(4)]
+
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_bucket_refills_over_time(self):
+        """Test tokens are refilled at the configured rate."""
+        for _ in range(3):
+            self.allow(1000)
+
+        allowed, throttle = self.allow(1010)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 10)
+
+        allowed, _ = self.allow(1020)
+        self.assertTrue(allowed)
+
+    def test_buckets_are_per_ip(self):
+        """Test each client address has its own bucket."""
+        for _ in range(3):
+            self.allow(1000)
+        self.request = Request(RequestFactory().get(
+            '/api/kurs/kurses/',
+            REMOTE_ADDR='10.0.0.2',
+        ))
+
+        allowed, _ = self.allow(1000)
+
+        self.assertTrue(allowed)
+
+    def test_user_throttle_keyed_by_user(self):
+        """Test the user throttle uses the user id as key."""
+        self.request.user = type(
+            'User', (), {'pk': 7, 'is_authenticated': True},
+        )()
+        throttle = UserThrottle()
+
+        self.assertTrue(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.key, 'throttle_user_7')
+        self.assertFalse(throttle.allow_request(self.request, None))
@@ -0,0 +1,176 @@
+"""
+Tests for tracing request phases.
+"""
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from course import tracing
+from course.models import Kurs, Material
+from course.storage import ContentAddressedStorage
+
+
+KURSES_URL = reverse('kurs:kurs-list')
+
+
+class SpanTests(TestCase):
+    """Test recording and exporting spans."""
+
+    def setUp(self):
+        self.exporter = tracing.InMemoryExporter()
+        self.addCleanup(tracing.set_exporter, tracing.set_exporter(
+            self.exporter,
+        ))
+
+    def test_nested_spans(self):
+        """Test child spans share the trace and are exported with the root."""
+        with tracing.span('root') as root:
+            with tracing.span('child', attributes={'n': 1}) as child:
+                self.assertIs(tracing.current_span(), child)
+            self.assertEqual(self.exporter.spans, [])
+
+        self.assertEqual(self.exporter.names(), ['child', 'root'])
+        self.assertEqual(child.trace_id, root.trace_id)
+        self.assertEqual(child.parent_id, root.span_id)
+        self.assertIsNone(tracing.current_span())
+
+    def test_error_status(self):
+        """Test spans record the exception ending them."""
+        with self.assertRaises(ValueError):
+            with tracing.span('failing'):
+                raise ValueError('boom')
+
+        self.assertEqual(
+            self.exporter.spans[0].to_otlp()['status'],
+            {'code': tracing.STATUS_ERROR, 'message': 'ValueError: boom'},
+        )
+
+    def test_disabled(self):
+        """Test spans are not recorded without an exporter."""
+        tracing.set_exporter(None)
+
+        with tracing.span('root') as root:
+            pass
+
+        self.assertIsNone(root)
+        self.assertIsNone(tracing.current_span())
+
+    def test_json_lines_exporter(self):
+        """Test traces are written as OTLP JSON lines."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'traces.jsonl'
+            tracing.set_exporter(tracing.JsonLinesExporter(path, 'test'))
+            with tracing.span('root', attributes={'ok': True, 'n': 2}):
+                with tracing.span('child'):
+                    pass
+
+            lines = path.read_text().splitlines()
+
+        self.assertEqual(len(lines), 1)
+        resource_spans = json.loads(lines[0])['resourceSpans'][0]
+        self.assertEqual(
+            resource_spans['resource']['attributes'],
+            [{'key': 'service.name', 'value': {'stringValue': 'test'}}],
+        )
+        child, root = resource_spans['scopeSpans'][0]['spans']
+        self.assertEqual(child['parentSpanId'], root['spanId'])
+        self.assertNotIn('parentSpanId', root)
+        self.assertEqual(root['attributes'], [
+            {'key': 'ok', 'value': {'boolValue': True}},
+            {'key': 'n', 'value': {'intValue': '2'}},
+        ])
+
+    def test_parse_traceparent(self):
+        """Test W3C traceparent headers are parsed."""
+        trace_id, parent_id = 'a' * 32, 'b' * 16
+
+        self.assertEqual(
+            tracing.parse_traceparent(f'00-{trace_id}-{parent_id}-01'),
+            (trace_id, parent_id),
+        )
+        self.assertEqual(tracing.parse_traceparent('bad'), (None, None))
+
+    def test_storage_spans(self):
+        """Test video storage operations are traced."""
+        with tempfile.TemporaryDirectory() as directory:
+            storage = ContentAddressedStorage(location=directory)
+            name = storage.save('videos/a.mp4', ContentFile(b'video'))
+            storage.open(name).close()
+            storage.delete(name)
+
+        self.assertEqual(
+            self.exporter.names(),
+            ['storage.save', 'storage.open', 'storage.delete'],
+        )
+        self.assertEqual(self.exporter.spans[0].attributes['storage.size'], 5)
+
+
+class TracingMiddlewareTests(TestCase):
+    """Test tracing API requests."""
+
+    def setUp(self):
+        self.exporter = tracing.InMemoryExporter()
+        self.addCleanup(tracing.set_exporter, tracing.set_exporter(
+            self.exporter,
+        ))
+        self.user = get_user_model().objects.create_user(
+            'user@example.com',
+            'testpass123',
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_request_phases(self):
+        """Test a request is traced with its phases and queries."""
+        kurs = Kurs.objects.create(
+            user=self.user, author='Author', title='Kurs', price=5,
+        )
+        kurs.materials.add(Material.objects.create(user=self.user, name='A'))
+        trace_id, parent_id = 'a' * 32, 'b' * 16
+
+        self.client.get(
+            KURSES_URL,
+            HTTP_TRACEPARENT=f'00-{trace_id}-{parent_id}-01',
+        )
+
+        spans = {span.name: span for span in self.exporter.spans}
+        root = spans['GET kurs:kurs-list']
+        self.assertEqual(root.trace_id, trace_id)
+        self.assertEqual(root.parent_id, parent_id)
+        self.assertEqual(root.kind, tracing.KIND_SERVER)
+        self.assertEqual(root.attributes['http.status_code'], 200)
+        view = spans['view']
+        self.assertEqual(view.parent_id, root.span_id)
+        self.assertEqual(view.attributes['view.action'], 'list')
+        for name in ('authenticate', 'serialize', 'render'):
+            self.assertEqual(spans[name].parent_id, view.span_id)
+        self.assertEqual(spans['serialize'].attributes, {
+            'serializer': 'KursSerializer',
+            'many': True,
+        })
+        queries = [s for s in self.exporter.spans if s.name == 'db.query']
+        self.assertTrue(any(
+            q.parent_id == spans['authenticate'].span_id for q in queries
+        ))
+        self.assertTrue(any(
+            q.parent_id == spans['serialize'].span_id for q in queries
+        ))
+
+    def test_create_phases(self):
+        """Test validation and saving of a kurs are traced."""
+        payload = {'author': 'Author', 'title': 'Kurs', 'price': '5.00'}
+
+        self.client.post(KURSES_URL, payload, format='json')
+
+        names = self.exporter.names()
+        for name in ('validate', 'save', 'serialize', 'render'):
+            self.assertIn(name, names)
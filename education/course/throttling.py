@@ -0,0 +1,60 @@
+"""
+Token bucket throttles for the API.
+"""
+from django.core.cache import caches
+
+from rest_framework import throttling
+
+
+class TokenBucketMixin:
+    """Throttle requests with a token bucket kept in the throttle cache.
+
+    Each key holds a ``(tokens, timestamp)`` pair. The bucket holds at most
+    ``num_requests`` tokens and refills at ``num_requests / duration``
+    tokens per second, so short bursts are allowed while the long term
+    rate stays bounded. The cache alias is configured in ``CACHES`` and can
+    point at a file based backend to share buckets between workers.
+    """
+
+    @property
+    def cache(self):
+        """Return the cache holding the buckets."""
+        return caches['throttle']
+
+    def allow_request(self, request, view):
+        """Take a token from the bucket or reject the request."""
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        tokens, stamp = self.cache.get(self.key, (self.num_requests, self.now))
+        refill = (self.now - stamp) * self.num_requests / self.duration
+        self.tokens = min(self.num_requests, tokens + refill)
+        if self.tokens < 1:
+            return self.throttle_failure()
+
+        self.cache.set(self.key, (self.tokens - 1, self.now), self.duration)
+        return True
+
+    def wait(self):
+        """Return the seconds until the next token is available."""
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class UserTokenBucketThrottle(TokenBucketMixin, throttling.UserRateThrottle):
+    """Limit requests per authenticated user, falling back to the IP."""
+
+
+class IPTokenBucketThrottle(TokenBucketMixin, throttling.SimpleRateThrottle):
+    """Limit requests per client IP address."""
+    scope = 'ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
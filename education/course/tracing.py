@@ -0,0 +1,277 @@
+"""
+Tracing of request phases as OpenTelemetry compatible spans.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import serializers
+
+
+# Span kinds and status codes as numbered by the OTLP protocol.
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+STATUS_ERROR = 2
+
+_current = contextvars.ContextVar('course_tracing_span', default=None)
+
+
+class Span:
+    """A timed operation of a trace.
+
+    Finished spans are collected by the trace of their root span and
+    handed to the exporter when the root span ends.
+    """
+
+    def __init__(self, name, parent=None, kind=KIND_INTERNAL,
+                 attributes=None, trace_id=None, parent_id=None):
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.span_id = os.urandom(8).hex()
+        self.error = None
+        if parent is not None:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.finished = parent.finished
+        else:
+            self.trace_id = trace_id or os.urandom(16).hex()
+            self.parent_id = parent_id
+            self.finished = []
+        self.start = time.time_ns()
+        self.end = None
+
+    @property
+    def duration(self):
+        """Return the duration of the span in seconds."""
+        return (self.end - self.start) / 1e9
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_otlp(self):
+        """Return the span in the OTLP JSON encoding."""
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': _otlp_attributes(self.attributes),
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.error is not None:
+            span['status'] = {'code': STATUS_ERROR, 'message': self.error}
+        return span
+
+
+def _otlp_value(value):
+    """Return an attribute value in the OTLP JSON encoding."""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [
+        {'key': key, 'value': _otlp_value(value)}
+        for key, value in attributes.items()
+    ]
+
+
+class InMemoryExporter:
+    """Keep finished spans in memory, for tests."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans += spans
+
+    def names(self):
+        """Return the names of the exported spans."""
+        return [span.name for span in self.spans]
+
+
+class JsonLinesExporter:
+    """Append each trace to a file as one line of OTLP JSON.
+
+    This is the format the OpenTelemetry collector file exporter writes
+    and its otlpjsonfile receiver reads, so the file can be shipped to a
+    collector as it is.
+    """
+
+    def __init__(self, path, service_name):
+        self.path = path
+        self.resource = {
+            'attributes': _otlp_attributes({'service.name': service_name}),
+        }
+        self.lock = threading.Lock()
+
+    def export(self, spans):
+        line = json.dumps({
+            'resourceSpans': [{
+                'resource': self.resource,
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [span.to_otlp() for span in spans],
+                }],
+            }],
+        })
+        with self.lock, open(self.path, 'a') as f:
+            f.write(line + '\n')
+
+
+exporter = None
+if settings.TRACING_FILE:
+    exporter = JsonLinesExporter(
+        settings.TRACING_FILE,
+        settings.TRACING_SERVICE_NAME,
+    )
+
+
+def set_exporter(new_exporter):
+    """Replace the exporter, None disables tracing. Returns the old one."""
+    global exporter
+    old, exporter = exporter, new_exporter
+    return old
+
+
+def current_span():
+    """Return the active span, if any."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def _span(name, kind, attributes, trace_id, parent_id):
+    parent = _current.get()
+    span = Span(
+        name,
+        parent=parent,
+        kind=kind,
+        attributes=attributes,
+        trace_id=trace_id,
+        parent_id=parent_id,
+    )
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        _current.reset(token)
+        span.end = time.time_ns()
+        span.finished.append(span)
+        if parent is None and exporter is not None:
+            exporter.export(span.finished)
+
+
+def span(name, kind=KIND_INTERNAL, attributes=None, trace_id=None,
+         parent_id=None):
+    """Return a context manager timing a span of the current trace.
+
+    trace_id and parent_id continue a trace started elsewhere when there
+    is no active span. Without an exporter this is a no-op.
+    """
+    if exporter is None:
+        return contextlib.nullcontext()
+    return _span(name, kind, attributes, trace_id, parent_id)
+
+
+def parse_traceparent(header):
+    """Return the trace and parent span ids of a W3C traceparent header."""
+    parts = header.split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None, None
+    return parts[1], parts[2]
+
+
+def trace_queries(execute, sql, params, many, context):
+    """Database execute wrapper recording each query as a span."""
+    connection = context['connection']
+    with span('db.query', KIND_CLIENT, {
+        'db.system': connection.vendor,
+        'db.statement': sql,
+        'db.executemany': many,
+    }):
+        return execute(sql, params, many, context)
+
+
+class TracedListSerializer(serializers.ListSerializer):
+    """List serializer tracing the serialization of all its items."""
+
+    @property
+    def data(self):
+        with span('serialize', attributes={
+            'serializer': type(self.child).__name__,
+            'many': True,
+        }):
+            return super().data
+
+
+class TracingSerializerMixin:
+    """Trace validation, saving and serialization of a serializer.
+
+    Set ``list_serializer_class = TracedListSerializer`` in the Meta of
+    the serializer so lists are traced as one span.
+    """
+
+    def is_valid(self, *args, **kwargs):
+        with span('validate', attributes={
+            'serializer': type(self).__name__,
+        }):
+            return super().is_valid(*args, **kwargs)
+
+    def save(self, **kwargs):
+        with span('save', attributes={'serializer': type(self).__name__}):
+            return super().save(**kwargs)
+
+    @property
+    def data(self):
+        with span('serialize', attributes={
+            'serializer': type(self).__name__,
+            'many': False,
+        }):
+            return super().data
+
+
+class TracingMixin:
+    """Trace authentication, the view and rendering of an API view."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with span('view', attributes={'view': type(self).__name__}) as s:
+            response = super().dispatch(request, *args, **kwargs)
+            if s is not None and getattr(self, 'action', None):
+                s.set_attribute('view.action', self.action)
+            return response
+
+    def perform_authentication(self, request):
+        with span('authenticate'):
+            super().perform_authentication(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs,
+        )
+        if hasattr(response, 'render') and not response.is_rendered:
+            with span('render', attributes={
+                'renderer': type(response.accepted_renderer).__name__,
+            }):
+                response.render()
+        return response
@@ -6,4 +6,6 @@ from course import views
 
 urlpatterns = [
     path('index', views.index, name="index"),
+    path('health/', views.health, name="health"),
+    path('ready/', views.ready, name="ready"),
 ]
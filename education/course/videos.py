@@ -0,0 +1,85 @@
+"""
+Reference counting and garbage collection of stored material videos.
+"""
+import os
+import time
+
+from django.db import transaction
+from django.db.models import Count
+
+from course.models import Material
+from course.storage import lock_content, video_storage
+
+
+VIDEO_DIRECTORY = 'course_videos'
+
+
+def video_references(names):
+    """Return the number of materials referencing each of the names."""
+    counts = dict.fromkeys(names, 0)
+    counts.update(
+        Material.objects.filter(video__in=names).order_by().values(
+            'video',
+        ).annotate(count=Count('pk')).values_list('video', 'count')
+    )
+    return counts
+
+
+def release_video(name):
+    """Delete a stored video once no material references it.
+
+    The references are counted under the lock_content() lock, so an
+    upload reusing the video either commits its material first or stores
+    the video again after it's deleted. Returns whether it was deleted.
+    """
+    if not name:
+        return False
+    with transaction.atomic():
+        lock_content(name)
+        if video_references([name])[name]:
+            return False
+        video_storage.delete(name)
+    return True
+
+
+def stored_videos(directory=VIDEO_DIRECTORY):
+    """Yield the names of all files stored under directory."""
+    directories, files = video_storage.listdir(directory)
+    for filename in files:
+        yield f'{directory}/{filename}'
+    for subdirectory in directories:
+        yield from stored_videos(f'{directory}/{subdirectory}')
+
+
+def collect_videos(grace_period=3600, batch_size=1000, dry_run=False):
+    """Delete stored videos that no material references.
+
+    Files modified within the grace period are kept, so uploads whose
+    material isn't committed yet survive. Returns the deleted names.
+    """
+    if not video_storage.exists(VIDEO_DIRECTORY):
+        return []
+
+    cutoff = time.time() - grace_period
+    deleted = []
+    batch = []
+    for name in stored_videos():
+        batch.append(name)
+        if len(batch) >= batch_size:
+            deleted += _collect_batch(batch, cutoff, dry_run)
+            batch = []
+    deleted += _collect_batch(batch, cutoff, dry_run)
+
+    return deleted
+
+
+def _collect_batch(names, cutoff, dry_run):
+    """Delete the unreferenced names older than cutoff."""
+    unreferenced = [
+        name for name, count in video_references(names).items()
+        if not count and os.path.getmtime(video_storage.path(name)) < cutoff
+    ]
+    if dry_run:
+        return unreferenced
+
+    return [name for name in unreferenced if release_video(name)]
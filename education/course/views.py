@@ -4,15 +4,55 @@ from django.http.response import  (
     Http404,
     HttpResponseNotFound,
 )
-from django.shortcuts import render
-from course.models import Material
-from course.models import Kurs
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from course.catalog import catalog_chunks
+from course.health import database_available, migrations_applied
 
 from django.urls import reverse
 
+
+KURSES_MARKER = '<!-- kurses -->'
+
+
 def index(request):
-    context = {
-        "kurses": Kurs.objects.all(),
-        "materials": Material.objects.all(),
-    }
-    return render(request, "index.html", context)
+    """Stream the public catalog page.
+
+    The layout is rendered once and split at the kurses marker, and the
+    kurses are rendered in between in chunks of ``INDEX_CHUNK_SIZE``
+    catalog entries, so the page starts before the catalog is read.
+    """
+    engine = settings.PUBLIC_TEMPLATE_ENGINE
+    head, tail = render_to_string(
+        'index.html',
+        request=request,
+        using=engine,
+    ).split(KURSES_MARKER, 1)
+    kurs_list = get_template('course/kurs_list.html', using=engine)
+
+    def content():
+        yield head
+        for chunk in catalog_chunks(settings.INDEX_CHUNK_SIZE):
+            yield kurs_list.render({'kurses': chunk})
+        yield tail
+
+    return StreamingHttpResponse(
+        content(),
+        content_type='text/html; charset=utf-8',
+    )
+
+
+def health(request):
+    """Liveness probe, answers as long as the process serves requests."""
+    return JsonResponse({'status': 'ok'})
+
+
+def ready(request):
+    """Readiness probe, checks the database is reachable and migrated."""
+    if not database_available():
+        return JsonResponse({'status': 'database unavailable'}, status=503)
+    if not migrations_applied():
+        return JsonResponse({'status': 'migrations pending'}, status=503)
+
+    return JsonResponse({'status': 'ok'})
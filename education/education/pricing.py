@@ -0,0 +1,120 @@
+"""
+Batched pricing functions.
+
+Prices are converted to integer cents and whole columns are processed with
+NumPy. Every rule rounds to whole cents with ``ROUND_HALF_UP``, giving the
+same results as applying the rule to each ``Decimal`` price and quantizing
+it to two decimal places.
+"""
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+
+
+INT64_LIMIT = 2 ** 62
+HUNDRED = Decimal(100)
+
+
+def to_cents(prices):
+    """Return the Decimal prices as an array of cents."""
+    return np.fromiter(
+        (int(price * HUNDRED) for price in prices),
+        dtype=np.int64,
+    )
+
+
+def from_cents(cents):
+    """Return an array of cents as a list of Decimal prices."""
+    return [Decimal(c).scaleb(-2) for c in cents.tolist()]
+
+
+def multiply(cents, factor):
+    """Multiply cents by a Decimal factor, rounding half up to cents."""
+    numerator, denominator = Decimal(factor).as_integer_ratio()
+    if cents.size and int(np.abs(cents).max()) * abs(numerator) \
+            >= INT64_LIMIT:
+        # Fall back to Python integers rather than overflow int64.
+        cents = cents.astype(object)
+
+    product = cents * numerator
+    magnitude = np.abs(product)
+    quotient = magnitude // denominator
+    quotient += 2 * (magnitude % denominator) >= denominator
+    return np.where(product < 0, -quotient, quotient)
+
+
+def discount(cents, percent):
+    """Take percent off the prices."""
+    return multiply(cents, 1 - Decimal(percent) / 100)
+
+
+def tax(cents, percent):
+    """Add percent of tax to the prices."""
+    return multiply(cents, 1 + Decimal(percent) / 100)
+
+
+def convert(cents, rate):
+    """Convert the prices to another currency at rate."""
+    return multiply(cents, rate)
+
+
+def fixed(cents, amount):
+    """Take a fixed amount off the prices, never going below zero."""
+    return np.maximum(cents - int(Decimal(amount).scaleb(2)), 0)
+
+
+RULES = {
+    'discount': discount,
+    'tax': tax,
+    'convert': convert,
+    'fixed': fixed,
+}
+
+# Largest value of each rule and decimal places of any rule value, which
+# keep the integer ratio of every factor small.
+LIMITS = {
+    'discount': Decimal(100),
+    'tax': Decimal(1000),
+    'convert': Decimal(10 ** 6),
+    'fixed': Decimal(10 ** 8),
+}
+MAX_PLACES = 6
+
+
+def parse_rule(rule):
+    """Parse a rule written as ``name=value``."""
+    name, _, value = rule.partition('=')
+    if name not in RULES:
+        raise ValueError(f'Unknown pricing rule: {name}')
+    try:
+        value = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f'Invalid value for {name}: {value}')
+    if not value.is_finite() or value < 0:
+        raise ValueError(f'Invalid value for {name}: {value}')
+    if value > LIMITS[name]:
+        raise ValueError(f'{name} must be at most {LIMITS[name]}')
+    if value.normalize().as_tuple().exponent < -MAX_PLACES:
+        raise ValueError(
+            f'{name} must have at most {MAX_PLACES} decimal places',
+        )
+
+    return name, value
+
+
+def apply_rules(prices, rules, max_price=None):
+    """Apply the (name, value) rules in order to the Decimal prices.
+
+    With max_price the results are clamped at zero, and a ValueError is
+    raised when any of them is above max_price.
+    """
+    cents = to_cents(prices)
+    for name, value in rules:
+        cents = RULES[name](cents, value)
+
+    if max_price is not None and cents.size:
+        cents = np.maximum(cents, 0)
+        if int(cents.max()) > int(max_price * HUNDRED):
+            raise ValueError(f'Prices would exceed {max_price}')
+
+    return from_cents(cents)
@@ -0,0 +1,68 @@
+"""
+Test runner for the education project.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Discover runner tuned for a fast test suite.
+
+    Passwords are hashed with MD5 and uploads go to a throwaway media root.
+    Tests tagged ``postgres`` are skipped when running against SQLite, and
+    the wall time of every run is reported and, when ``TEST_TIMINGS_FILE``
+    is set, appended to that file as a JSON line.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if connection.vendor != 'postgresql':
+            self.exclude_tags.add('postgres')
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.media_root = tempfile.mkdtemp(prefix='education-test-media-')
+        self.test_settings = override_settings(
+            PASSWORD_HASHERS=[
+                'django.contrib.auth.hashers.MD5PasswordHasher',
+            ],
+            MEDIA_ROOT=self.media_root,
+        )
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
+
+    def run_suite(self, suite, **kwargs):
+        self.result = super().run_suite(suite, **kwargs)
+        return self.result
+
+    def run_tests(self, *args, **kwargs):
+        start = time.perf_counter()
+        failures = super().run_tests(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        sys.stderr.write('Test suite wall time: %.2fs\n' % elapsed)
+        timings_file = os.environ.get('TEST_TIMINGS_FILE')
+        if timings_file:
+            with open(timings_file, 'a') as f:
+                f.write(json.dumps({
+                    'timestamp': time.time(),
+                    'seconds': round(elapsed, 3),
+                    'tests': self.result.testsRun,
+                    'failures': failures,
+                    'parallel': self.parallel,
+                    'database': connection.vendor,
+                }) + '\n')
+
+        return failures
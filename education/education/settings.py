@@ -23,15 +23,21 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-q08fs!1^bp@(q11w2-&7*q_^*li!k&ya9xd2w2!tb+0b$5b4oo'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('DEBUG', '1') == '1'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host
+]
+
+# Optional components. API-only workers can turn these off to boot faster
+# and use less memory.
+ENABLE_ADMIN = os.environ.get('ENABLE_ADMIN', '1') == '1'
+ENABLE_API_DOCS = os.environ.get('ENABLE_API_DOCS', '1') == '1'
 
 
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -39,31 +45,51 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
-    'drf_spectacular',
     'course',
     'user',
     'kurs',
 ]
 
+if ENABLE_ADMIN:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
+
+if ENABLE_API_DOCS:
+    INSTALLED_APPS.append('drf_spectacular')
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'course.middleware.TracingMiddleware',
+    'course.middleware.ConcurrencyLimitMiddleware',
+    'course.middleware.CompressionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'course.middleware.BrowserMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'course.middleware.ProfilingMiddleware',
+]
+
+# Middleware run by course.middleware.BrowserMiddleware for requests
+# outside SESSIONLESS_PATH_PREFIXES, which authenticate with tokens.
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# The admin checks for the session, auth and messages middleware in
+# MIDDLEWARE, they are in BROWSER_MIDDLEWARE instead.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'education.urls'
 
+# Templates are parsed once per process by the cached loader, which the
+# development server resets when a template changes.
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [
             BASE_DIR / "templates"
             ],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -71,10 +97,28 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# Engine rendering the public pages, 'jinja2' needs Jinja2 installed. The
+# page templates are written in the syntax both engines share.
+PUBLIC_TEMPLATE_ENGINE = os.environ.get('PUBLIC_TEMPLATE_ENGINE', 'django')
+if PUBLIC_TEMPLATE_ENGINE == 'jinja2':
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [BASE_DIR / 'course' / 'templates'],
+    })
+
+# Catalog entries rendered per chunk of the streamed index page.
+INDEX_CHUNK_SIZE = int(os.environ.get('INDEX_CHUNK_SIZE', 200))
+
 WSGI_APPLICATION = 'education.wsgi.application'
 
 
@@ -91,6 +135,66 @@ DATABASES = {
     }
 }
 
+if os.environ.get('DB_ENGINE') == 'sqlite':
+    # In-memory SQLite for running tests that don't depend on PostgreSQL.
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+
+TEST_RUNNER = 'education.runner.TestRunner'
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'throttle': {
+        'BACKEND': os.environ.get(
+            'THROTTLE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('THROTTLE_CACHE_LOCATION', 'throttle'),
+    },
+    # Shared by all workers and kept across restarts, so retries are
+    # replayed wherever they land. The boot command creates the table.
+    'idempotency': {
+        'BACKEND': os.environ.get(
+            'IDEMPOTENCY_CACHE_BACKEND',
+            'django.core.cache.backends.db.DatabaseCache',
+        ),
+        'LOCATION': os.environ.get(
+            'IDEMPOTENCY_CACHE_LOCATION', 'idempotency_cache',
+        ),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Responses of requests with an Idempotency-Key are replayed for this many
+# seconds, a key is locked while its first request runs for at most the
+# lock timeout.
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 24 * 60 * 60))
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+
+# Response compression
+
+COMPRESSION_ENCODINGS = os.environ.get(
+    'COMPRESSION_ENCODINGS', 'br,zstd,gzip',
+).split(',')
+COMPRESSION_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 512))
+# HTML pages are left out, they show user input next to CSRF tokens and
+# compressing them would expose the tokens to BREACH.
+COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'application/msgpack',
+    'application/vnd.oai.openapi',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -137,6 +241,80 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'course.User'
 
+AUTHENTICATION_BACKENDS = ['course.backends.EmailBackend']
+
 REST_FRAMEWORK = {
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'course.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'course.parsers.MessagePackParser',
+    ],
+    'TEST_REQUEST_RENDERER_CLASSES': [
+        'rest_framework.renderers.MultiPartRenderer',
+        'rest_framework.renderers.JSONRenderer',
+        'course.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'user': os.environ.get('THROTTLE_USER_RATE', '600/min'),
+        'ip': os.environ.get('THROTTLE_IP_RATE', '1200/min'),
+    },
 }
+
+# Prefixes of the API routes, which can also be called through the batch
+# endpoint at api/batch/.
+API_PATH_PREFIXES = ['/api/kurs/', '/api/user/']
+SESSIONLESS_PATH_PREFIXES = API_PATH_PREFIXES + ['/api/batch/']
+
+# API requests a worker runs at once are capped by an adaptive limit kept
+# between the min and max, requests beyond it are answered with a 503.
+# Priority requests may use a reserved share of the limit.
+CONCURRENCY_PATH_PREFIXES = SESSIONLESS_PATH_PREFIXES
+CONCURRENCY_PRIORITY_PREFIXES = ['/api/user/token/']
+CONCURRENCY_LIMIT_INITIAL = int(
+    os.environ.get('CONCURRENCY_LIMIT_INITIAL', 20),
+)
+CONCURRENCY_LIMIT_MIN = int(os.environ.get('CONCURRENCY_LIMIT_MIN', 4))
+CONCURRENCY_LIMIT_MAX = int(os.environ.get('CONCURRENCY_LIMIT_MAX', 200))
+CONCURRENCY_RETRY_AFTER = 1
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+
+# Change log entries are only synced once they are this many seconds old,
+# so a transaction still writing lower ids can commit before a client's
+# cursor moves past them.
+CHANGES_SETTLE_SECONDS = float(os.environ.get('CHANGES_SETTLE_SECONDS', 5))
+
+# Playback progress heartbeats are buffered per worker and written once
+# this many user/material pairs are pending or the oldest is this old.
+PROGRESS_FLUSH_SIZE = int(os.environ.get('PROGRESS_FLUSH_SIZE', 500))
+PROGRESS_FLUSH_INTERVAL = float(
+    os.environ.get('PROGRESS_FLUSH_INTERVAL', 5),
+)
+
+# API requests are profiled at this rate, or when they carry an X-Profile
+# header from `manage.py profile_token`, sampling the stack every interval
+# seconds. Profiles are written to PROFILING_DIR.
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+PROFILING_INTERVAL = float(os.environ.get('PROFILING_INTERVAL', 0.005))
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+PROFILING_DIR = os.environ.get('PROFILING_DIR', BASE_DIR / 'profiles')
+
+# Requests are traced as OpenTelemetry spans appended to TRACING_FILE as
+# OTLP JSON lines, tracing is off when it is not set.
+TRACING_FILE = os.environ.get('TRACING_FILE')
+TRACING_SERVICE_NAME = os.environ.get('TRACING_SERVICE_NAME', 'education')
+
+# Number of related kurses kept per kurs in the similarity index.
+SIMILARITY_TOP_N = int(os.environ.get('SIMILARITY_TOP_N', 20))
+
+if ENABLE_API_DOCS:
+    REST_FRAMEWORK['DEFAULT_SCHEMA_CLASS'] = (
+        'drf_spectacular.openapi.AutoSchema'
+    )
+
+SCHEMA_DIR = os.environ.get('SCHEMA_DIR', BASE_DIR / 'schema')
@@ -1,8 +1,14 @@
 """
 Sample test
 """
+import random
+from decimal import ROUND_HALF_UP, Decimal
+from unittest import skipIf
+
+from django.db import connection
 from django.test import SimpleTestCase
-from education import calc
+from education import calc, pricing
+from education.runner import TestRunner
 
 
 class calcTests(SimpleTestCase):
@@ -16,3 +22,94 @@ class calcTests(SimpleTestCase):
         """Test substracting numbers"""
         res = calc.substract(5, 6)
         self.assertEqual(res, 1)
+
+
+class TestRunnerTests(SimpleTestCase):
+    """ Test the project test runner """
+    @skipIf(connection.vendor == 'postgresql', 'Runs on SQLite only.')
+    def test_postgres_tests_excluded_on_sqlite(self):
+        """Test postgres tagged tests are skipped on other databases"""
+        runner = TestRunner()
+        self.assertIn('postgres', runner.exclude_tags)
+
+
+class PricingTests(SimpleTestCase):
+    """ Test the batched pricing functions """
+    def scalar(self, price, factor):
+        return (price * factor).quantize(Decimal('0.01'), ROUND_HALF_UP)
+
+    def test_rules_match_decimal_rounding(self):
+        """Test batched rules round like quantized Decimal arithmetic"""
+        rng = random.Random(0)
+        prices = [
+            Decimal(rng.randrange(-10 ** 6, 10 ** 6)).scaleb(-2)
+            for _ in range(1000)
+        ]
+        rules = [
+            ('discount', Decimal('12.5')),
+            ('tax', Decimal('18')),
+            ('convert', Decimal('0.913')),
+        ]
+
+        res = pricing.apply_rules(prices, rules)
+
+        expected = []
+        for price in prices:
+            price = self.scalar(price, Decimal('0.875'))
+            price = self.scalar(price, Decimal('1.18'))
+            expected.append(self.scalar(price, Decimal('0.913')))
+        self.assertEqual(res, expected)
+
+    def test_half_cents_round_up(self):
+        """Test half cents are rounded away from zero"""
+        res = pricing.apply_rules(
+            [Decimal('0.05'), Decimal('-0.05')],
+            [('discount', Decimal('50'))],
+        )
+
+        self.assertEqual(res, [Decimal('0.03'), Decimal('-0.03')])
+
+    def test_large_prices_do_not_overflow(self):
+        """Test products beyond int64 fall back to exact integers"""
+        price = Decimal('12345678901234567.89')
+
+        res = pricing.apply_rules([price], [('convert', Decimal('1000.5'))])
+
+        self.assertEqual(res, [self.scalar(price, Decimal('1000.5'))])
+
+    def test_fixed_never_below_zero(self):
+        """Test fixed amounts do not make prices negative"""
+        res = pricing.apply_rules(
+            [Decimal('3.00'), Decimal('10.00')],
+            [('fixed', Decimal('5'))],
+        )
+
+        self.assertEqual(res, [Decimal('0.00'), Decimal('5.00')])
+
+    def test_parse_rule(self):
+        """Test parsing rules and rejecting invalid ones"""
+        self.assertEqual(
+            pricing.parse_rule('tax=18'),
+            ('tax', Decimal('18')),
+        )
+        for rule in ['bonus=5', 'tax=abc', 'tax=-1', 'tax=NaN',
+                     'discount=150', 'tax=1001', 'convert=1E-19',
+                     'convert=1E+7', 'fixed=1E+30']:
+            with self.assertRaises(ValueError):
+                pricing.parse_rule(rule)
+
+    def test_max_price(self):
+        """Test a max price clamps at zero and rejects larger prices"""
+        res = pricing.apply_rules(
+            [Decimal('-1.00'), Decimal('10.00')],
+            [('tax', Decimal('10'))],
+            max_price=Decimal('11.00'),
+        )
+        self.assertEqual(res, [Decimal('0.00'), Decimal('11.00')])
+
+        with self.assertRaises(ValueError):
+            pricing.apply_rules(
+                [Decimal('10.00')],
+                [('tax', Decimal('10.1'))],
+                max_price=Decimal('11.00'),
+            )
@@ -14,24 +14,34 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
-
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 
+from course.batch import BatchView
+
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('', include("course.urls")),
-    path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
-    path(
-        'api/docs/',
-        SpectacularSwaggerView.as_view(url_name='api-schema'),
-        name='api-docs',
-    ),
     path('api/user/', include('user.urls')),
     path('api/kurs/', include('kurs.urls')),
+    path('api/batch/', BatchView.as_view(), name='api-batch'),
     # path('', include('user.urls')),
 ]
+
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if settings.ENABLE_API_DOCS:
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    from course.schema import CachedSchemaView
+
+    urlpatterns += [
+        path('api/schema/', CachedSchemaView.as_view(), name='api-schema'),
+        path(
+            'api/docs/',
+            SpectacularSwaggerView.as_view(url_name='api-schema'),
+            name='api-docs',
+        ),
+    ]
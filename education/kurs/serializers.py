@@ -1,38 +1,70 @@
 """
 Serializers for kurs APIs
 """
+from django.db import transaction
 from rest_framework import serializers
 
 from course.models import (
+    CatalogEntry,
     Kurs,
     Material,
 )
+from course.signals import adjust_material_duration
+from course.tracing import TracedListSerializer, TracingSerializerMixin
+from course.videos import release_video
+from education.pricing import parse_rule
 
-class MaterialSerializer(serializers.ModelSerializer):
+class MaterialSerializer(TracingSerializerMixin,
+                         serializers.ModelSerializer):
     """Serializer for materials."""
 
     class Meta:
         model = Material
-        fields = ['id', 'name', 'video']
+        fields = ['id', 'name', 'video', 'duration']
         read_only_fields = ['id']
+        list_serializer_class = TracedListSerializer
 
-class KursSerializer(serializers.ModelSerializer):
+    @transaction.atomic
+    def create(self, validated_data):
+        """Create a material in the transaction storing its video."""
+        return super().create(validated_data)
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """Update material and the totals of kurses using it."""
+        old_duration = instance.duration
+        old_video = instance.video.name
+        material = super().update(instance, validated_data)
+        adjust_material_duration(material, old_duration)
+        if old_video and old_video != material.video.name:
+            transaction.on_commit(lambda: release_video(old_video))
+
+        return material
+
+class KursSerializer(TracingSerializerMixin, serializers.ModelSerializer):
     """Serializer for kurses."""
     materials = MaterialSerializer(many=True, required=False)
     class Meta:
         model = Kurs
-        fields = ['id', 'author', 'title', 'description', 'price', 'link', 'materials']
-        read_only_fields = ['id']
+        fields = [
+            'id', 'author', 'title', 'description', 'price', 'link',
+            'materials', 'material_count', 'video_duration',
+        ]
+        read_only_fields = ['id', 'material_count', 'video_duration']
+        list_serializer_class = TracedListSerializer
 
     def _get_or_create_materials(self, materials, kurs):
         """Handle getting or creating materials as needed."""
         auth_user = self.context['request'].user
+        material_objs = []
         for material in materials:
             material_obj, created = Material.objects.get_or_create(
                 user=auth_user,
                 **material,
             )
-            kurs.materials.add(material_obj)
+            material_objs.append(material_obj)
+        kurs.materials.add(*material_objs)
+        kurs.refresh_from_db(fields=['material_count', 'video_duration'])
 
     def create(self, validated_data):
         """Create a kurs."""
@@ -45,14 +77,14 @@ class KursSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """Update kurs."""
         materials = validated_data.pop('materials', None)
-        if materials is not None:
-            instance.materials.clear()
-            self._get_or_create_materials(materials, instance)
-
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
         instance.save()
+        if materials is not None:
+            instance.materials.clear()
+            self._get_or_create_materials(materials, instance)
+
         return instance
 
 
@@ -60,7 +92,99 @@ class KursDetailSerializer(KursSerializer):
     """Serializer for kurs detail view."""
 
     class Meta(KursSerializer.Meta):
-        fields = KursSerializer.Meta.fields + ['description']
+        fields = KursSerializer.Meta.fields + ['description', 'cloned_from']
+
+
+class AuthorStatsSerializer(serializers.Serializer):
+    """Serializer for kurs price statistics of an author."""
+    author = serializers.CharField()
+    count = serializers.IntegerField()
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    avg_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class RepriceSerializer(serializers.Serializer):
+    """Serializer for pricing rules applied to kurses."""
+    rules = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+    )
+
+    def validate_rules(self, value):
+        """Parse rules written as name=value."""
+        try:
+            return [parse_rule(rule) for rule in value]
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class CloneSerializer(serializers.Serializer):
+    """Serializer for cloning a kurs."""
+    title = serializers.CharField(max_length=255, required=False)
+
+
+class BulkCloneSerializer(serializers.Serializer):
+    """Serializer for cloning several kurses."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000,
+    )
+
+
+class HeartbeatSerializer(serializers.Serializer):
+    """Serializer for a playback progress heartbeat."""
+    material = serializers.IntegerField(min_value=1)
+    position = serializers.IntegerField(min_value=0, max_value=2 ** 31 - 1)
+    completed = serializers.BooleanField(default=False)
+
+
+class CompletionSerializer(serializers.Serializer):
+    """Serializer for the completion of a kurs."""
+    material_count = serializers.IntegerField()
+    completed = serializers.IntegerField()
+    percent = serializers.FloatField()
+    watched = serializers.IntegerField()
+
+
+class CatalogEntrySerializer(serializers.ModelSerializer):
+    """Serializer for public catalog entries."""
+    id = serializers.IntegerField(source='kurs_id', read_only=True)
+
+    class Meta:
+        model = CatalogEntry
+        fields = [
+            'id', 'author', 'title', 'description', 'price', 'link',
+            'material_count', 'video_duration', 'materials', 'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class RelatedKursSerializer(CatalogEntrySerializer):
+    """Serializer for catalog entries of related kurses."""
+    score = serializers.FloatField(read_only=True)
+
+    class Meta(CatalogEntrySerializer.Meta):
+        fields = CatalogEntrySerializer.Meta.fields + ['score']
+        read_only_fields = fields
+
+
+class KursChangesSerializer(serializers.Serializer):
+    """Serializer for the changed and deleted kurses of a sync page."""
+    updated = KursDetailSerializer(many=True)
+    deleted = serializers.ListField(child=serializers.IntegerField())
+
 
+class MaterialChangesSerializer(serializers.Serializer):
+    """Serializer for the changed and deleted materials of a sync page."""
+    updated = MaterialSerializer(many=True)
+    deleted = serializers.ListField(child=serializers.IntegerField())
 
 
+class ChangesSerializer(serializers.Serializer):
+    """Serializer for a page of the delta sync."""
+    cursor = serializers.IntegerField()
+    more = serializers.BooleanField()
+    kurses = KursChangesSerializer()
+    materials = MaterialChangesSerializer()
@@ -0,0 +1,98 @@
+"""
+Tests for the public catalog API.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from course.models import Kurs, Material
+from kurs.views import CatalogPagination
+
+
+CATALOG_URL = reverse('kurs:catalog-list')
+
+
+def detail_url(kurs_id):
+    """Create and return a catalog detail URL."""
+    return reverse('kurs:catalog-detail', args=[kurs_id])
+
+
+def create_kurs(user, **params):
+    """Create and return a sample kurs."""
+    defaults = {
+        'author': 'Sample author name',
+        'title': 'Sample kurs title',
+        'price': Decimal('5.25'),
+    }
+    defaults.update(params)
+
+    return Kurs.objects.create(user=user, **defaults)
+
+
+class PublicCatalogApiTests(TestCase):
+    """Test anonymous catalog requests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        cls.other_user = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_list_all_kurses(self):
+        """Test the catalog lists kurses of every user, newest first."""
+        first = create_kurs(user=self.user, title='First')
+        second = create_kurs(user=self.other_user, title='Second')
+
+        res = self.client.get(CATALOG_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [entry['id'] for entry in res.data['results']],
+            [second.id, first.id],
+        )
+
+    @patch.object(CatalogPagination, 'page_size', 2)
+    def test_catalog_paginated(self):
+        """Test the catalog is paginated with a cursor."""
+        for i in range(3):
+            create_kurs(user=self.user, title=f'Kurs {i}')
+
+        res = self.client.get(CATALOG_URL)
+        self.assertEqual(len(res.data['results']), 2)
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNone(res.data['next'])
+
+    def test_catalog_detail(self):
+        """Test retrieving a catalog entry with its materials."""
+        kurs = create_kurs(user=self.user)
+        material = Material.objects.create(user=self.user, name='Intro')
+        kurs.materials.add(material)
+
+        res = self.client.get(detail_url(kurs.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], kurs.title)
+        self.assertEqual(res.data['material_count'], 1)
+        self.assertEqual(res.data['materials'][0]['name'], 'Intro')
+
+    def test_catalog_read_only(self):
+        """Test the catalog can't be written to."""
+        res = self.client.post(CATALOG_URL, {'title': 'New'})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,151 @@
+"""
+Tests for the delta sync API.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from course.models import Change, Kurs, Material
+
+
+CHANGES_URL = reverse('kurs:changes')
+
+
+def create_kurs(user, **params):
+    """Create and return a sample kurs."""
+    defaults = {
+        'author': 'Sample author name',
+        'title': 'Sample kurs title',
+        'price': Decimal('5.25'),
+    }
+    defaults.update(params)
+
+    return Kurs.objects.create(user=user, **defaults)
+
+
+class PublicChangesApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def test_auth_required(self):
+        """Test auth is required to sync."""
+        res = APIClient().get(CHANGES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(CHANGES_SETTLE_SECONDS=0)
+class PrivateChangesApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_initial_sync(self):
+        """Test syncing from scratch returns every object."""
+        kurs = create_kurs(user=self.user)
+        material = Material.objects.create(user=self.user, name='Intro')
+        kurs.materials.add(material)
+        other_user = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        create_kurs(user=other_user)
+
+        res = self.client.get(CHANGES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data['more'])
+        self.assertEqual(
+            [k['id'] for k in res.data['kurses']['updated']],
+            [kurs.id],
+        )
+        self.assertEqual(
+            [m['id'] for m in res.data['materials']['updated']],
+            [material.id],
+        )
+
+    def test_sync_since_cursor(self):
+        """Test only changes after the cursor are returned."""
+        kurs = create_kurs(user=self.user, title='Kept')
+        removed = create_kurs(user=self.user, title='Removed')
+        cursor = self.client.get(CHANGES_URL).data['cursor']
+
+        kurs.title = 'Renamed'
+        kurs.save()
+        removed_id = removed.id
+        removed.delete()
+        res = self.client.get(CHANGES_URL, {'since': cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertGreater(res.data['cursor'], cursor)
+        self.assertEqual(
+            [k['title'] for k in res.data['kurses']['updated']],
+            ['Renamed'],
+        )
+        self.assertEqual(res.data['kurses']['deleted'], [removed_id])
+
+        res = self.client.get(CHANGES_URL, {'since': res.data['cursor']})
+        self.assertEqual(res.data['kurses']['updated'], [])
+
+    def test_sync_in_pages(self):
+        """Test a limit splits the changes in pages."""
+        for i in range(3):
+            create_kurs(user=self.user, title=f'Kurs {i}')
+
+        res = self.client.get(CHANGES_URL, {'limit': 2})
+        self.assertTrue(res.data['more'])
+        self.assertEqual(len(res.data['kurses']['updated']), 2)
+
+        res = self.client.get(
+            CHANGES_URL,
+            {'since': res.data['cursor'], 'limit': 2},
+        )
+        self.assertFalse(res.data['more'])
+        self.assertEqual(len(res.data['kurses']['updated']), 1)
+
+    def test_invalid_cursor(self):
+        """Test an invalid cursor returns an error."""
+        res = self.client.get(CHANGES_URL, {'since': 'abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_limit(self):
+        """Test a limit below one returns an error."""
+        res = self.client.get(CHANGES_URL, {'limit': 0})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_recent_changes_held_back(self):
+        """Test the cursor stops before changes that have not settled."""
+        settled = create_kurs(user=self.user, title='Settled')
+        Change.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        create_kurs(user=self.user, title='Recent')
+
+        with override_settings(CHANGES_SETTLE_SECONDS=60):
+            res = self.client.get(CHANGES_URL)
+
+        self.assertFalse(res.data['more'])
+        self.assertEqual(
+            [k['id'] for k in res.data['kurses']['updated']],
+            [settled.id],
+        )
+        res = self.client.get(CHANGES_URL, {'since': res.data['cursor']})
+        self.assertEqual(
+            [k['title'] for k in res.data['kurses']['updated']],
+            ['Recent'],
+        )
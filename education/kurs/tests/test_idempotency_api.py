@@ -0,0 +1,161 @@
+"""
+Tests for idempotency keys on the kurs APIs.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from course.idempotency import IN_FLIGHT
+from course.models import Kurs, Material
+
+
+KURSES_URL = reverse('kurs:kurs-list')
+
+
+class IdempotencyApiTests(TestCase):
+    """Test replaying writes sent with an Idempotency-Key."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+
+    def setUp(self):
+        caches['idempotency'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payload = {
+            'author': 'Ann',
+            'title': 'Kurs',
+            'price': '5.00',
+            'materials': [{'name': 'Intro'}],
+        }
+
+    def post(self, payload, key='key-1'):
+        return self.client.post(
+            KURSES_URL, payload, format='json', HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replayed(self):
+        """Test a retry returns the first response without creating."""
+        first = self.post(self.payload)
+        retry = self.post(self.payload)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Kurs.objects.count(), 1)
+        self.assertEqual(Material.objects.count(), 1)
+
+    def test_without_key_not_replayed(self):
+        """Test requests without a key are all run."""
+        self.client.post(KURSES_URL, self.payload, format='json')
+        self.client.post(KURSES_URL, self.payload, format='json')
+
+        self.assertEqual(Kurs.objects.count(), 2)
+
+    def test_key_reused_for_other_request(self):
+        """Test reusing a key with another body is rejected."""
+        self.post(self.payload)
+
+        res = self.post(dict(self.payload, title='Other'))
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Kurs.objects.count(), 1)
+
+    def test_key_scoped_to_user(self):
+        """Test users do not share idempotency keys."""
+        other_user = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123',
+        )
+        self.post(self.payload)
+        self.client.force_authenticate(other_user)
+
+        res = self.post(self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Kurs.objects.count(), 2)
+
+    @patch('course.idempotency.request_fingerprint', return_value=b'digest')
+    def test_key_in_flight(self, patched_fingerprint):
+        """Test a retry of a running request gets a conflict."""
+        caches['idempotency'].set(
+            f'idempotency:{self.user.pk}:key-1',
+            (IN_FLIGHT, b'digest'),
+        )
+
+        res = self.post(self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Kurs.objects.exists())
+
+    def test_validation_errors_replayed(self):
+        """Test client errors are stored like successful responses."""
+        payload = {'title': 'Missing author'}
+        first = self.post(payload)
+        retry = self.post(payload)
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+    def test_update_replayed(self):
+        """Test material updates honour the key."""
+        material = Material.objects.create(user=self.user, name='Intro')
+        url = reverse('kurs:material-detail', args=[material.id])
+
+        for _ in range(2):
+            res = self.client.patch(
+                url, {'name': 'Renamed'}, format='json',
+                HTTP_IDEMPOTENCY_KEY='key-2',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Idempotent-Replayed'], 'true')
+
+    def test_video_upload_fingerprinted(self):
+        """Test multipart retries are matched on their fields and files."""
+        material = Material.objects.create(user=self.user, name='Intro')
+        url = reverse('kurs:material-detail', args=[material.id])
+
+        def upload(content):
+            return self.client.patch(
+                url,
+                {'name': 'Video', 'video': SimpleUploadedFile(
+                    'intro.mp4', content, content_type='video/mp4',
+                )},
+                format='multipart',
+                HTTP_IDEMPOTENCY_KEY='key-3',
+            )
+
+        self.assertEqual(upload(b'lecture').status_code, status.HTTP_200_OK)
+        self.assertEqual(upload(b'lecture')['Idempotent-Replayed'], 'true')
+        self.assertEqual(
+            upload(b'other lecture').status_code,
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+    @patch('course.idempotency.request_fingerprint', return_value=b'digest')
+    def test_key_vanishing_not_run_unlocked(self, patched_fingerprint):
+        """Test a key that is held but can't be read is not run again."""
+        cache = caches['idempotency']
+        cache.set(
+            f'idempotency:{self.user.pk}:key-1',
+            (IN_FLIGHT, b'digest'),
+        )
+
+        with patch.object(type(cache), 'get', return_value=None):
+            res = self.post(self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Kurs.objects.exists())
@@ -3,6 +3,8 @@ Tests for recipe APIs.
 """
 from decimal import Decimal
 
+import msgpack
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
@@ -16,6 +18,9 @@ from kurs.serializers import KursSerializer, KursDetailSerializer
 
 
 KURSES_URl = reverse('kurs:kurs-list')
+STATS_URL = reverse('kurs:kurs-stats')
+REPRICE_URL = reverse('kurs:kurs-reprice')
+CLONE_URL = reverse('kurs:kurs-clone-many')
 
 
 def detail_url(kurs_id):
@@ -23,6 +28,16 @@ def detail_url(kurs_id):
     return reverse('kurs:kurs-detail', args=[kurs_id])
 
 
+def related_url(kurs_id):
+    """Create and return a related kurses URL."""
+    return reverse('kurs:kurs-related', args=[kurs_id])
+
+
+def clone_url(kurs_id):
+    """Create and return a kurs clone URL."""
+    return reverse('kurs:kurs-clone', args=[kurs_id])
+
+
 def create_kurs(user, **params):
     """Create and return a sample kurs."""
     defaults = {
@@ -59,9 +74,12 @@ class PublicKursAPITests(TestCase):
 class PrivateKursApiTests(TestCase):
     """Test authenticated API requests."""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(email='user@example.com', password='test123')
+
     def setUp(self):
         self.client = APIClient()
-        self.user = create_user(email='user@example.com', password='test123')
         self.client.force_authenticate(self.user)
 
     def test_retrieve_kurses(self):
@@ -280,3 +298,178 @@ class PrivateKursApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(kurs.materials.count(), 0)
+
+    def test_material_totals_on_update(self):
+        """Test material counters follow kurs material changes."""
+        kurs = create_kurs(user=self.user)
+
+        payload = {'materials': [
+            {'name': 'Intro', 'duration': 60},
+            {'name': 'Setup', 'duration': 120},
+        ]}
+        res = self.client.patch(detail_url(kurs.id), payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['material_count'], 2)
+        self.assertEqual(res.data['video_duration'], 180)
+
+    def test_author_stats(self):
+        """Test price statistics are grouped by author."""
+        create_kurs(user=self.user, author='Ann', price=Decimal('2.00'))
+        create_kurs(user=self.user, author='Ann', price=Decimal('5.00'))
+        create_kurs(user=self.user, author='Bob', price=Decimal('3.50'))
+        other_user = create_user(email='other@example.com', password='test123')
+        create_kurs(user=other_user, author='Ann', price=Decimal('100.00'))
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), [
+            {
+                'author': 'Ann',
+                'count': 2,
+                'min_price': '2.00',
+                'max_price': '5.00',
+                'avg_price': '3.50',
+            },
+            {
+                'author': 'Bob',
+                'count': 1,
+                'min_price': '3.50',
+                'max_price': '3.50',
+                'avg_price': '3.50',
+            },
+        ])
+
+    def test_reprice_kurses(self):
+        """Test pricing rules are applied to the user's kurses only."""
+        kurs = create_kurs(user=self.user, price=Decimal('10.00'))
+        other_user = create_user(email='other@example.com', password='test123')
+        other_kurs = create_kurs(user=other_user, price=Decimal('10.00'))
+        payload = {'rules': ['discount=15', 'tax=18']}
+
+        res = self.client.post(REPRICE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'updated': 1})
+        kurs.refresh_from_db()
+        other_kurs.refresh_from_db()
+        self.assertEqual(kurs.price, Decimal('10.03'))
+        self.assertEqual(other_kurs.price, Decimal('10.00'))
+
+    def test_reprice_invalid_rule(self):
+        """Test unknown pricing rules are rejected."""
+        payload = {'rules': ['bonus=5']}
+
+        res = self.client.post(REPRICE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reprice_out_of_range(self):
+        """Test rules out of range or overflowing prices are rejected."""
+        kurs = create_kurs(user=self.user, price=Decimal('99999999.99'))
+
+        for rules in [['convert=1E-19'], ['discount=150'], ['tax=18']]:
+            res = self.client.post(
+                REPRICE_URL, {'rules': rules}, format='json',
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        kurs.refresh_from_db()
+        self.assertEqual(kurs.price, Decimal('99999999.99'))
+
+    def test_retrieve_kurses_msgpack(self):
+        """Test kurses are rendered as MessagePack when accepted."""
+        create_kurs(user=self.user)
+
+        res = self.client.get(KURSES_URl, HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+        json_res = self.client.get(KURSES_URl)
+        self.assertEqual(msgpack.unpackb(res.content), json_res.json())
+
+    def test_create_kurs_msgpack(self):
+        """Test creating a kurs from a MessagePack body."""
+        payload = {
+            'author': 'Sample author',
+            'title': 'Sample kurs',
+            'price': '5.99',
+            'materials': [{'name': 'Intro'}],
+        }
+
+        res = self.client.post(KURSES_URl, payload, format='msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        kurs = Kurs.objects.get(id=res.data['id'])
+        self.assertEqual(kurs.price, Decimal('5.99'))
+        self.assertEqual(kurs.materials.get().name, 'Intro')
+
+    def test_related_kurses(self):
+        """Test related kurses are listed by shared materials."""
+        shared = Material.objects.create(user=self.user, name='Shared')
+        other = Material.objects.create(user=self.user, name='Other')
+        with self.captureOnCommitCallbacks(execute=True):
+            kurs = create_kurs(user=self.user)
+            kurs.materials.add(shared)
+            related = create_kurs(user=self.user, title='Related')
+            related.materials.add(shared, other)
+            create_kurs(user=self.user, title='Unrelated').materials.add(
+                other,
+            )
+
+        res = self.client.get(related_url(kurs.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['id'], related.id)
+        self.assertEqual(res.data[0]['title'], 'Related')
+        self.assertEqual(res.data[0]['score'], 0.5)
+
+    def test_clone_kurs(self):
+        """Test cloning a kurs under a new title."""
+        material = Material.objects.create(user=self.user, name='Intro')
+        kurs = create_kurs(user=self.user)
+        kurs.materials.add(material)
+
+        res = self.client.post(
+            clone_url(kurs.id), {'title': 'Next term'}, format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        clone = Kurs.objects.get(id=res.data['id'])
+        self.assertEqual(res.data, KursDetailSerializer(clone).data)
+        self.assertEqual(res.data['title'], 'Next term')
+        self.assertEqual(res.data['cloned_from'], kurs.id)
+        self.assertEqual(list(clone.materials.all()), [material])
+
+    def test_clone_other_users_kurs_error(self):
+        """Test kurses of other users cannot be cloned."""
+        other_user = create_user(email='other@example.com', password='test123')
+        kurs = create_kurs(user=other_user)
+
+        res = self.client.post(clone_url(kurs.id))
+        bulk_res = self.client.post(
+            CLONE_URL, {'ids': [kurs.id]}, format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(bulk_res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Kurs.objects.count(), 1)
+
+    def test_clone_kurses(self):
+        """Test cloning several kurses at once."""
+        kurses = [create_kurs(user=self.user) for _ in range(3)]
+
+        res = self.client.post(
+            CLONE_URL, {'ids': [k.id for k in kurses]}, format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [c['cloned_from'] for c in res.data['clones']],
+            [k.id for k in kurses],
+        )
+        for clone in res.data['clones']:
+            kurs = Kurs.objects.get(id=clone['id'])
+            self.assertEqual(kurs.cloned_from_id, clone['cloned_from'])
@@ -7,7 +7,7 @@ from rest_framework.test import APIClient
 
 from django.contrib.auth import get_user_model
 
-from course.models import Material
+from course.models import Kurs, Material
 from kurs.serializers import MaterialSerializer
 
 MATERIALS_URL = reverse('kurs:material-list')
@@ -25,8 +25,11 @@ def create_user(email='user@example.com', password='testpass123'):
 class PrivateMaterialsApiTests(TestCase):
     """Test authenticated API requests."""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
     def setUp(self):
-        self.user = create_user()
         self.client = APIClient()
         self.client.force_authenticate(self.user)
 
@@ -94,6 +97,22 @@ class PrivateMaterialsApiTests(TestCase):
         material.refresh_from_db()
         self.assertEqual(material.name, payload['name'])
 
+    def test_update_material_duration(self):
+        """Test updating a duration updates the kurs totals."""
+        material = Material.objects.create(
+            user=self.user, name='Intro', duration=60,
+        )
+        kurs = Kurs.objects.create(
+            user=self.user, author='Author', title='Kurs', price='1.00',
+        )
+        kurs.materials.add(material)
+
+        res = self.client.patch(detail_url(material.id), {'duration': 90})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        kurs.refresh_from_db()
+        self.assertEqual(kurs.video_duration, 90)
+
     def test_delete_material(self):
         """Test deleting a material."""
         material = Material.objects.create(user=self.user, name='Breakfast')
@@ -0,0 +1,124 @@
+"""
+Tests for the progress API.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from course.models import Kurs, Material, Progress
+from course.progress import buffer
+
+
+def kurs_progress_url(kurs_id):
+    """Create and return a kurs progress URL."""
+    return reverse('kurs:kurs-progress', args=[kurs_id])
+
+
+class ProgressApiTests(TestCase):
+    """Test recording and reading progress."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.addCleanup(buffer.take)
+        self.material = Material.objects.create(
+            user=self.user,
+            name='Intro',
+            duration=60,
+        )
+        self.kurs = Kurs.objects.create(
+            user=self.user,
+            author='Author',
+            title='Kurs',
+            price=Decimal('5.00'),
+        )
+        self.kurs.materials.add(self.material)
+        self.url = kurs_progress_url(self.kurs.id)
+
+    def test_heartbeat_buffered(self):
+        """Test heartbeats are accepted before they are written."""
+        payload = {'material': self.material.id, 'position': 12}
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Progress.objects.exists())
+        buffer.flush()
+        self.assertEqual(Progress.objects.get().position, 12)
+
+    def test_heartbeat_list(self):
+        """Test several heartbeats are accepted in one request."""
+        payload = [
+            {'material': self.material.id, 'position': 12},
+            {'material': self.material.id, 'position': 60, 'completed': True},
+        ]
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        buffer.flush()
+        self.assertTrue(Progress.objects.get().completed)
+
+    def test_invalid_heartbeat(self):
+        """Test heartbeats with a negative position are rejected."""
+        payload = {'material': self.material.id, 'position': -1}
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_kurs_progress(self):
+        """Test the kurs completion includes buffered heartbeats."""
+        payload = {'material': self.material.id, 'position': 60}
+        self.client.post(self.url, payload, format='json')
+
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'material_count': 1,
+            'completed': 1,
+            'percent': 100.0,
+            'watched': 60,
+        })
+
+    def test_student_heartbeat(self):
+        """Test heartbeats of users who don't own the kurs are recorded."""
+        student = get_user_model().objects.create_user(
+            email='student@example.com',
+            password='testpass123',
+        )
+        self.client.force_authenticate(student)
+        payload = {'material': self.material.id, 'position': 60}
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        res = self.client.get(self.url)
+        self.assertEqual(res.data['completed'], 1)
+        self.assertEqual(Progress.objects.get().user, student)
+
+    def test_material_outside_kurs_rejected(self):
+        """Test heartbeats for materials of another kurs are rejected."""
+        other = Material.objects.create(user=self.user, name='Other')
+        payload = [
+            {'material': self.material.id, 'position': 12},
+            {'material': other.id, 'position': 12},
+        ]
+
+        res = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(buffer.pending, {})
@@ -14,9 +14,11 @@ from kurs import views
 router = DefaultRouter()
 router.register('kurses', views.KursViewSet)
 router.register('materials', views.MaterialViewSet)
+router.register('catalog', views.CatalogViewSet, basename='catalog')
 
 app_name = 'kurs'
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('changes/', views.ChangesView.as_view(), name='changes'),
 ]
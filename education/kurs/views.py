@@ -1,35 +1,81 @@
 """
 Views for the kurs APIs
 """
+import itertools
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min
+from django.utils import timezone
+
 from rest_framework import (
     viewsets,
     mixins,
+    status,
 )
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 
 from course.models import (
+    CatalogEntry,
+    Change,
     Kurs,
     Material,
 )
+from course.throttling import (
+    IPTokenBucketThrottle,
+    UserTokenBucketThrottle,
+)
+from course.cloning import clone_kurses
+from course.idempotency import IdempotencyMixin
+from course.progress import buffer as progress_buffer, kurs_completion
+from course.repricing import reprice_kurses
+from course.tracing import TracingMixin
 from kurs import serializers
 
 
-class KursViewSet(viewsets.ModelViewSet):
+class KursViewSet(TracingMixin, IdempotencyMixin, viewsets.ModelViewSet):
     """View for manage recipe APIs."""
     serializer_class = serializers.KursDetailSerializer
     queryset = Kurs.objects.all()
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle]
+    idempotent_actions = [
+        'create', 'update', 'partial_update', 'reprice', 'clone',
+        'clone_many',
+    ]
 
     def get_queryset(self):
         """Retrieve kurses for authenticated user."""
+        if self.action == 'progress':
+            # Students follow kurses of the public catalog, not their own.
+            return self.queryset.order_by('-id')
         return self.queryset.filter(user=self.request.user).order_by('-id')
 
     def get_serializer_class(self):
         """Return the serializer class for request."""
         if self.action == 'list':
             return serializers.KursSerializer
+        elif self.action == 'stats':
+            return serializers.AuthorStatsSerializer
+        elif self.action == 'reprice':
+            return serializers.RepriceSerializer
+        elif self.action == 'progress':
+            if self.request.method == 'POST':
+                return serializers.HeartbeatSerializer
+            return serializers.CompletionSerializer
+        elif self.action == 'related':
+            return serializers.RelatedKursSerializer
+        elif self.action == 'clone':
+            return serializers.CloneSerializer
+        elif self.action == 'clone_many':
+            return serializers.BulkCloneSerializer
 
         return self.serializer_class
 
@@ -37,8 +83,151 @@ class KursViewSet(viewsets.ModelViewSet):
         """Create a new kurs."""
         serializer.save(user=self.request.user)
 
+    @action(detail=False)
+    def stats(self, request):
+        """Return kurs price statistics grouped by author."""
+        stats = self.get_queryset().order_by('author').values(
+            'author',
+        ).annotate(
+            count=Count('id'),
+            min_price=Min('price'),
+            max_price=Max('price'),
+            avg_price=Avg('price'),
+        )
+        serializer = self.get_serializer(stats, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def reprice(self, request):
+        """Apply pricing rules to all kurses of the user."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            updated = reprice_kurses(
+                self.get_queryset(),
+                serializer.validated_data['rules'],
+            )
+        except ValueError as e:
+            raise ValidationError({'rules': [str(e)]})
+        return Response({'updated': updated})
+
+    @action(detail=True, methods=['post'])
+    def clone(self, request, pk=None):
+        """Copy a kurs with its materials, optionally under a new title."""
+        kurs = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        clones = clone_kurses(
+            self.get_queryset().filter(pk=kurs.pk),
+            title=serializer.validated_data.get('title'),
+        )
+        clone = self.get_queryset().get(pk=next(iter(clones)))
+        serializer = serializers.KursDetailSerializer(
+            clone,
+            context=self.get_serializer_context(),
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='clone')
+    def clone_many(self, request):
+        """Copy several kurses with their materials."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+        queryset = self.get_queryset().filter(pk__in=ids)
+        missing = ids - set(queryset.values_list('pk', flat=True))
+        if missing:
+            raise ValidationError({
+                'ids': [f'Kurs {pk} not found.' for pk in sorted(missing)],
+            })
+
+        clones = clone_kurses(queryset)
+        return Response(
+            {
+                'clones': [
+                    {'id': clone, 'cloned_from': source}
+                    for clone, source in sorted(
+                        clones.items(), key=lambda item: item[1],
+                    )
+                ],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=['get', 'post'])
+    def progress(self, request, pk=None):
+        """Record playback heartbeats or return the kurs completion.
+
+        Heartbeats are buffered per worker and written in batches, so they
+        are accepted before they are stored. The completion includes the
+        heartbeats this worker buffered, those buffered by other workers
+        show up once flushed, at most PROGRESS_FLUSH_INTERVAL later.
+        """
+        kurs = self.get_object()
+        if request.method == 'POST':
+            return self.record_heartbeats(request, kurs)
+
+        progress_buffer.flush()
+        serializer = self.get_serializer(kurs_completion(request.user, kurs))
+        return Response(serializer.data)
+
+    def record_heartbeats(self, request, kurs):
+        """Buffer one heartbeat or a list of heartbeats for the kurs."""
+        serializer = self.get_serializer(
+            data=request.data,
+            many=isinstance(request.data, list),
+        )
+        serializer.is_valid(raise_exception=True)
+        heartbeats = serializer.validated_data
+        if not isinstance(heartbeats, list):
+            heartbeats = [heartbeats]
+
+        material_ids = {heartbeat['material'] for heartbeat in heartbeats}
+        unknown = material_ids - set(
+            kurs.materials.filter(pk__in=material_ids).values_list(
+                'pk', flat=True,
+            )
+        )
+        if unknown:
+            raise ValidationError({'material': [
+                f'Material {pk} is not part of this kurs.'
+                for pk in sorted(unknown)
+            ]})
+
+        for heartbeat in heartbeats:
+            progress_buffer.add(
+                request.user.id,
+                heartbeat['material'],
+                heartbeat['position'],
+                heartbeat['completed'],
+            )
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True)
+    def related(self, request, pk=None):
+        """Return the catalog entries of the most similar kurses."""
+        kurs = self.get_object()
+        similarities = list(
+            kurs.similarities.order_by('-score', 'related_id')[
+                :settings.SIMILARITY_TOP_N
+            ]
+        )
+        entries = CatalogEntry.objects.in_bulk(
+            [similarity.related_id for similarity in similarities],
+        )
+        related = []
+        for similarity in similarities:
+            entry = entries.get(similarity.related_id)
+            if entry is not None:
+                entry.score = similarity.score
+                related.append(entry)
+        serializer = self.get_serializer(related, many=True)
+        return Response(serializer.data)
+
 
-class MaterialViewSet(mixins.DestroyModelMixin,
+class MaterialViewSet(TracingMixin,
+                      IdempotencyMixin,
+                      mixins.DestroyModelMixin,
                       mixins.UpdateModelMixin,
                       mixins.ListModelMixin,
                       viewsets.GenericViewSet):
@@ -47,7 +236,107 @@ class MaterialViewSet(mixins.DestroyModelMixin,
     queryset = Material.objects.all()
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle]
 
     def get_queryset(self):
         """Filter queryset to authenticated user."""
         return self.queryset.filter(user=self.request.user).order_by('-name')
+
+
+class CatalogPagination(CursorPagination):
+    """Paginate the catalog by kurs id, newest first."""
+    ordering = '-kurs_id'
+    page_size = 50
+
+
+class CatalogViewSet(viewsets.ReadOnlyModelViewSet):
+    """Browse the public catalog of all kurses."""
+    serializer_class = serializers.CatalogEntrySerializer
+    queryset = CatalogEntry.objects.all()
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = [IPTokenBucketThrottle]
+    pagination_class = CatalogPagination
+
+
+class ChangesView(APIView):
+    """List kurses and materials changed since a cursor."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle]
+    page_size = 500
+
+    def _int_param(self, name, default, minimum=0):
+        """Return an integer query parameter of at least minimum."""
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            value = minimum - 1
+        if value < minimum:
+            raise ValidationError({
+                name: f'Must be an integer of at least {minimum}.',
+            })
+
+        return value
+
+    def get(self, request):
+        """Return the changes after the `since` cursor.
+
+        Change ids are taken when a row is written, not when it commits, so
+        a recent id may still be followed by a lower one from a transaction
+        that commits later. The page therefore stops at the first change
+        younger than ``CHANGES_SETTLE_SECONDS`` and the cursor never passes
+        it. Transactions running longer than that between logging a change
+        and committing can still be skipped.
+        """
+        since = self._int_param('since', 0)
+        limit = min(
+            self._int_param('limit', self.page_size, minimum=1),
+            self.page_size,
+        )
+        settled = timezone.now() - timedelta(
+            seconds=settings.CHANGES_SETTLE_SECONDS,
+        )
+        changes = list(itertools.takewhile(
+            lambda change: change.created_at <= settled,
+            Change.objects.filter(
+                user=request.user,
+                id__gt=since,
+            ).order_by('id')[:limit + 1],
+        ))
+        more = len(changes) > limit
+        changes = changes[:limit]
+
+        updated = {Change.KURS: [], Change.MATERIAL: []}
+        deleted = {Change.KURS: [], Change.MATERIAL: []}
+        for change in changes:
+            ids = deleted if change.deleted else updated
+            ids[change.model].append(change.object_id)
+
+        kurses = Kurs.objects.filter(
+            user=request.user,
+            pk__in=updated[Change.KURS],
+        ).prefetch_related('materials').order_by('id')
+        materials = Material.objects.filter(
+            user=request.user,
+            pk__in=updated[Change.MATERIAL],
+        ).order_by('id')
+        context = {'request': request}
+
+        return Response({
+            'cursor': changes[-1].id if changes else since,
+            'more': more,
+            'kurses': {
+                'updated': serializers.KursDetailSerializer(
+                    kurses, many=True, context=context,
+                ).data,
+                'deleted': deleted[Change.KURS],
+            },
+            'materials': {
+                'updated': serializers.MaterialSerializer(
+                    materials, many=True, context=context,
+                ).data,
+                'deleted': deleted[Change.MATERIAL],
+            },
+        })
@@ -12,7 +12,22 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = ['email', 'password', 'name']
-        extra_kwargs = {'password': {'write_only': True, 'min_length': 5}}
+        extra_kwargs = {
+            'email': {'validators': []},
+            'password': {'write_only': True, 'min_length': 5},
+        }
+
+    def validate_email(self, value):
+        """Reject emails registered in any case."""
+        users = get_user_model().objects.filter_email(value)
+        if self.instance is not None:
+            users = users.exclude(pk=self.instance.pk)
+        if users.exists():
+            raise serializers.ValidationError(
+                _('User with this email already exists.'),
+                code='unique',
+            )
+        return value
 
     def create(self, validated_data):
         """Create and return a user with encrypted password."""
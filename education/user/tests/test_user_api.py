@@ -1,6 +1,8 @@
 """
 Tests for the user API.
 """
+import msgpack
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -51,6 +53,19 @@ class PublicUserApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_user_with_email_in_other_case_exists_error(self):
+        """Test emails registered in another case are rejected."""
+        create_user(email='test@example.com', password='testpass123')
+        payload = {
+            'email': 'Test@Example.com',
+            'password': 'testpass123',
+            'name': 'Test Name',
+        }
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['email'][0].code, 'unique')
+
     def test_password_too_short_error(self):
         """Test an error is returned if password less than 5 chars."""
         payload = {
@@ -84,6 +99,31 @@ class PublicUserApiTests(TestCase):
         self.assertIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_create_token_email_in_other_case(self):
+        """Test the email of the credentials is matched in any case."""
+        create_user(email='test@example.com', password='test-pass123')
+        payload = {'email': 'TEST@example.com', 'password': 'test-pass123'}
+
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', res.data)
+
+    def test_create_token_msgpack(self):
+        """Test token is created from a MessagePack body."""
+        create_user(email='test@example.com', password='test-pass123')
+        payload = {'email': 'test@example.com', 'password': 'test-pass123'}
+
+        res = self.client.post(
+            TOKEN_URL,
+            payload,
+            format='msgpack',
+            HTTP_ACCEPT='application/msgpack',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', msgpack.unpackb(res.content))
+
     def test_create_token_bad_credentials(self):
         """Test returns error if credentials invalid."""
         create_user(email='test@example.com', password='goodpass')
@@ -120,12 +160,15 @@ class PublicUserApiTests(TestCase):
 class PrivateUserApiTests(TestCase):
     """Test API requests that require authentication."""
 
-    def setUp(self):
-        self.user = create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email='test@example.com',
             password='testpass123',
             name='Test Name',
         )
+
+    def setUp(self):
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
@@ -5,28 +5,37 @@ from rest_framework import generics, authentication, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
+from course.throttling import (
+    IPTokenBucketThrottle,
+    UserTokenBucketThrottle,
+)
+from course.tracing import TracingMixin
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
 )
 
 
-class CreateUserView(generics.CreateAPIView):
+class CreateUserView(TracingMixin, generics.CreateAPIView):
     """Create a new user in the system."""
     serializer_class = UserSerializer
+    throttle_classes = [IPTokenBucketThrottle]
 
 
-class CreateTokenView(ObtainAuthToken):
+class CreateTokenView(TracingMixin, ObtainAuthToken):
     """Create a new auth token for user."""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    throttle_classes = [IPTokenBucketThrottle]
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(TracingMixin, generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
     authentication_classes = [authentication.TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle]
 
     def get_object(self):
         """Retrieve and return the authenticated user."""